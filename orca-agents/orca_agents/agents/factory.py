@@ -1,11 +1,17 @@
 """Ollama Agent Factory for creating smolagents powered by dual Ollama instances."""
 
 import logging
+from pathlib import Path
 from typing import List, Optional
 
-from smolagents import CodeAgent, ToolCallingAgent, LiteLLMModel
+import httpx
+from smolagents import CodeAgent, ToolCallingAgent, LiteLLMModel, Tool
 
 from ..config import Config
+from ..tools.docs import DocsIndex, DocsSearchTool, OllamaEmbedder
+from ..tools.profiles import ProfileIndex, ProfileLookupTool
+from ..tools.web_cache import CachedTool, WebCache, normalize_query, normalize_url
+from ..tools.wrappers import TimeoutTool
 
 
 class OllamaAgentFactory:
@@ -19,6 +25,9 @@ class OllamaAgentFactory:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self._profile_index: Optional[ProfileIndex] = None
+        self._docs_index: Optional[DocsIndex] = None
+        self._web_cache: Optional[WebCache] = None
 
     def create_model(self, model_id: str, use_reasoning: bool = False) -> LiteLLMModel:
         """Create a LiteLLMModel instance for the appropriate Ollama service.
@@ -48,6 +57,121 @@ class OllamaAgentFactory:
             api_base=api_base,
         )
 
+    def create_profile_tools(self) -> List[Tool]:
+        """Create tools backed by OrcaSlicer's bundled profiles.
+
+        The profile index is loaded (and built if missing or stale) once and
+        shared by all tools created by this factory.
+
+        Returns:
+            List with the profile lookup tool, or empty if no profiles
+            directory is configured.
+        """
+        if not self.config.profiles_dir:
+            return []
+
+        profiles_dir = Path(self.config.profiles_dir)
+        if not profiles_dir.is_dir():
+            self.logger.warning(f"Profiles directory not found: {profiles_dir}")
+            return []
+
+        if self._profile_index is None:
+            self._profile_index = ProfileIndex.load_or_build(
+                profiles_dir, Path(self.config.profile_index_path)
+            )
+            self.logger.info(
+                f"Loaded profile index with {len(self._profile_index)} profiles"
+            )
+
+        return [ProfileLookupTool(self._profile_index)]
+
+    def create_docs_tools(self) -> List[Tool]:
+        """Create tools searching the local OrcaSlicer documentation.
+
+        The documentation index is loaded (and built if missing or stale) once
+        and shared by all tools created by this factory. If the embedding model
+        is unreachable while building, the index falls back to BM25 only.
+
+        Returns:
+            List with the docs search tool, or empty if no documentation paths
+            are configured.
+        """
+        paths = [Path(path) for path in self.config.docs_paths if Path(path).exists()]
+        if not paths:
+            return []
+
+        if self._docs_index is None:
+            index_path = Path(self.config.docs_index_path)
+            embedder = None
+            if self.config.docs_embedding_model:
+                embedder = OllamaEmbedder(
+                    self.config.ollama_chat_url, self.config.docs_embedding_model
+                )
+            try:
+                self._docs_index = DocsIndex.load_or_build(paths, index_path, embedder)
+            except httpx.HTTPError as e:
+                self.logger.warning(f"Embeddings unavailable, using BM25 only: {e}")
+                self._docs_index = DocsIndex.load_or_build(paths, index_path)
+            self.logger.info(
+                f"Loaded docs index with {len(self._docs_index)} chunks"
+            )
+
+        return [DocsSearchTool(self._docs_index)]
+
+    def create_web_tools(self) -> List[Tool]:
+        """Create the web search and page visiting tools.
+
+        If a web cache directory is configured, both tools are wrapped so that
+        repeated queries and pages are served from one shared on-disk cache.
+
+        Returns:
+            List of web tools, or empty if they are not available.
+        """
+        # Import tools here to avoid circular imports
+        try:
+            from smolagents import DuckDuckGoSearchTool, VisitWebpageTool
+            search_tool = DuckDuckGoSearchTool()
+            visit_tool = VisitWebpageTool()
+        except ImportError:
+            self.logger.warning("Web search tools not available, creating agent without tools")
+            return []
+
+        if not self.config.web_cache_dir:
+            return [search_tool, visit_tool]
+
+        if self._web_cache is None:
+            self._web_cache = WebCache(
+                Path(self.config.web_cache_dir),
+                max_bytes=self.config.web_cache_max_mb * 1024 * 1024,
+                offline=self.config.web_cache_offline,
+            )
+
+        return [
+            CachedTool(
+                search_tool,
+                self._web_cache,
+                ttl_seconds=self.config.web_cache_search_ttl_hours * 3600,
+                normalize=normalize_query,
+            ),
+            CachedTool(
+                visit_tool,
+                self._web_cache,
+                ttl_seconds=self.config.web_cache_page_ttl_hours * 3600,
+                normalize=normalize_url,
+            ),
+        ]
+
+    def _with_timeouts(self, tools: Optional[List[Tool]]) -> List[Tool]:
+        """Wrap tools so that each call fails after the configured timeout."""
+        if not self.config.tool_timeout_seconds:
+            return list(tools or [])
+        return [
+            TimeoutTool(tool, self.config.tool_timeout_seconds)
+            if isinstance(tool, Tool)
+            else tool
+            for tool in tools or []
+        ]
+
     def create_manager_agent(
         self,
         system_prompt: Optional[str] = None,
@@ -68,7 +192,7 @@ class OllamaAgentFactory:
 
         # Note: CodeAgent in current smolagents version uses prompt_templates, not system_prompt
         return CodeAgent(
-            tools=tools or [],
+            tools=self._with_timeouts(tools),
             model=model,
         )
 
@@ -86,21 +210,15 @@ class OllamaAgentFactory:
         Returns:
             Configured ToolCallingAgent for web browsing tasks.
         """
-        # Import tools here to avoid circular imports
-        try:
-            from smolagents.tools import DuckDuckGoSearchTool
-            from smolagents.tools.web_search import VisitWebpageTool
-            tools = [DuckDuckGoSearchTool(), VisitWebpageTool()]
-        except ImportError:
-            self.logger.warning("Web search tools not available, creating agent without tools")
-            tools = []
-
+        tools = self.create_web_tools()
         model = self.create_model(self.config.chat_model, use_reasoning=False)
 
         # Note: ToolCallingAgent in current smolagents version uses prompt_templates, not system_prompt
+        # Tool calls issued in the same step (e.g. several pages to visit) run in parallel
         return ToolCallingAgent(
-            tools=tools,
+            tools=self._with_timeouts(tools),
             model=model,
+            max_tool_threads=self.config.max_tool_threads,
         )
 
     def create_managed_web_agent(self) -> ToolCallingAgent:
@@ -135,6 +253,6 @@ class OllamaAgentFactory:
 
         # Note: CodeAgent in current smolagents version uses prompt_templates, not system_prompt
         return CodeAgent(
-            tools=tools or [],
+            tools=self._with_timeouts(tools),
             model=model,
         ) 
\ No newline at end of file
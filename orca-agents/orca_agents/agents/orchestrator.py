@@ -2,10 +2,13 @@
 
 import asyncio
 import logging
+import threading
+import weakref
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 
-from smolagents import ActionStep, CodeAgent
+from smolagents import ActionStep, CodeAgent, FinalAnswerStep
 
 from ..config import Config
 from .factory import OllamaAgentFactory
@@ -28,6 +31,17 @@ class MultiAgentOrchestrator:
         self._conversations: dict[str, dict[str, Any]] = {}
         self._cache_lock = asyncio.Lock()
 
+        # Only one run may use an agent (and its memory) at a time: the manager
+        # agent is shared by all conversations and jobs, and job workers can
+        # run several messages of the same conversation concurrently.
+        self._agent_locks: weakref.WeakKeyDictionary[CodeAgent, threading.Lock] = (
+            weakref.WeakKeyDictionary()
+        )
+
+        # Docs tools are built once and shared by the manager and chat agents;
+        # an empty list records that they could not be built
+        self._docs_tools: list | None = None
+
         # Initialize manager agent
         self._manager_agent: CodeAgent | None = None
         self._setup_manager()
@@ -37,7 +51,10 @@ class MultiAgentOrchestrator:
         try:
             # For Phase 1, use a simple manager agent
             # Phase 3 will implement full multi-agent delegation
-            self._manager_agent = self.factory.create_manager_agent()
+            self._manager_agent = self.factory.create_manager_agent(
+                tools=self._create_tools("profile", self.factory.create_profile_tools)
+                + self._get_docs_tools()
+            )
 
             # Add memory management callback
             self._manager_agent.step_callbacks = [self._create_memory_callback()]
@@ -49,6 +66,26 @@ class MultiAgentOrchestrator:
             # Fallback to simple chat agent
             self._manager_agent = self.factory.create_chat_agent()
 
+    def _create_tools(self, kind: str, create: Callable[[], list]) -> list:
+        """Create optional manager tools, or none if they cannot be set up.
+
+        Building a tool's index can fail (e.g. an unwritable index path or a
+        broken profile file); the manager agent then runs without that tool.
+        """
+        try:
+            return create()
+        except Exception as e:
+            self.logger.error(f"Failed to create {kind} tools: {e}", exc_info=True)
+            return []
+
+    def _get_docs_tools(self) -> list:
+        """Get the docs tools, building them on first use only."""
+        if self._docs_tools is None:
+            self._docs_tools = self._create_tools(
+                "docs", self.factory.create_docs_tools
+            )
+        return list(self._docs_tools)
+
     def _create_memory_callback(self):
         """Create a callback for managing agent memory and logging."""
 
@@ -116,27 +153,21 @@ class MultiAgentOrchestrator:
         """
         try:
             conversation = await self.get_conversation(conversation_id)
-
-            # Determine which agent to use
-            if use_manager and self._manager_agent:
-                agent = self._manager_agent
-                agent_type = "manager"
-            else:
-                # Use or create simple chat agent for this conversation
-                if conversation["agent_instance"] is None or reset_context:
-                    conversation["agent_instance"] = self.factory.create_chat_agent()
-                agent = conversation["agent_instance"]
-                agent_type = "chat"
-
-            self.logger.info(
-                f"Processing message in {conversation_id} with {agent_type} agent"
+            agent = self._select_agent(
+                conversation_id, conversation, use_manager, reset_context
             )
 
             # Process message with appropriate reset behavior
             # Reset on first message or when explicitly requested
             should_reset = conversation["message_count"] == 0 or reset_context
 
-            response = agent.run(message, reset=should_reset)
+            response = await asyncio.to_thread(
+                self._run_exclusive,
+                self._agent_lock(agent),
+                agent.run,
+                message,
+                reset=should_reset,
+            )
 
             # Update conversation stats
             conversation["message_count"] += 1
@@ -148,6 +179,105 @@ class MultiAgentOrchestrator:
             self.logger.error(f"Error processing message: {e}", exc_info=True)
             return f"I encountered an error: {str(e)}"
 
+    async def process_message_steps(
+        self,
+        conversation_id: str,
+        message: str,
+        use_manager: bool = True,
+        reset_context: bool = False,
+        on_step: Callable[[ActionStep], None] | None = None,
+        should_cancel: Callable[[], bool] | None = None,
+    ) -> str:
+        """Process a message in a worker thread, reporting every agent step.
+
+        Unlike ``process_message`` this does not block the event loop and lets
+        errors propagate, so background jobs can record why they failed.
+
+        Args:
+            conversation_id: Unique conversation identifier.
+            message: User message to process.
+            use_manager: Whether to use the manager agent (vs simple chat agent).
+            reset_context: Whether to reset conversation context.
+            on_step: Called from the worker thread after each ``ActionStep``.
+            should_cancel: Polled after each step; the agent is interrupted
+                as soon as it returns True.
+
+        Returns:
+            Agent response to the message.
+        """
+        conversation = await self.get_conversation(conversation_id)
+        agent = self._select_agent(
+            conversation_id, conversation, use_manager, reset_context
+        )
+        should_reset = conversation["message_count"] == 0 or reset_context
+
+        def run_steps() -> str:
+            output = None
+            for step in agent.run(message, reset=should_reset, stream=True):
+                if isinstance(step, ActionStep):
+                    if on_step:
+                        on_step(step)
+                    if should_cancel and should_cancel():
+                        agent.interrupt()
+                elif isinstance(step, FinalAnswerStep):
+                    output = step.output
+            return "" if output is None else str(output)
+
+        response = await asyncio.to_thread(
+            self._run_exclusive, self._agent_lock(agent), run_steps
+        )
+        conversation["message_count"] += 1
+
+        self.logger.info(f"Generated response for {conversation_id}")
+        return response
+
+    def _agent_lock(self, agent: CodeAgent) -> threading.Lock:
+        """Get the lock serializing the runs of an agent.
+
+        Only called from the event loop, so the lock is created exactly once.
+        """
+        lock = self._agent_locks.get(agent)
+        if lock is None:
+            lock = self._agent_locks[agent] = threading.Lock()
+        return lock
+
+    @staticmethod
+    def _run_exclusive(
+        lock: threading.Lock, run: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Call ``run`` while holding an agent's lock.
+
+        Called in a worker thread, so waiting for the lock never blocks the
+        event loop.
+        """
+        with lock:
+            return run(*args, **kwargs)
+
+    def _select_agent(
+        self,
+        conversation_id: str,
+        conversation: dict[str, Any],
+        use_manager: bool,
+        reset_context: bool,
+    ) -> CodeAgent:
+        """Pick the agent that should handle the next message of a conversation."""
+        if use_manager and self._manager_agent:
+            agent = self._manager_agent
+            agent_type = "manager"
+        else:
+            # Use or create simple chat agent for this conversation
+            if conversation["agent_instance"] is None or reset_context:
+                conversation["agent_instance"] = self.factory.create_chat_agent(
+                    tools=self._get_docs_tools()
+                )
+            agent = conversation["agent_instance"]
+            agent_type = "chat"
+
+        self.logger.info(
+            f"Processing message in {conversation_id} with {agent_type} agent"
+        )
+        return agent
+
     async def clear_conversation(self, conversation_id: str) -> bool:
         """Clear a conversation from memory.
 
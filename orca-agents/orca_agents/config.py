@@ -52,6 +52,12 @@ class Config(BaseSettings):
     web_surfer_max_tokens: int = Field(
         default=1024, description="Max tokens for web surfer agent"
     )
+    max_tool_threads: int = Field(
+        default=4, description="Maximum tool calls of one agent step run in parallel"
+    )
+    tool_timeout_seconds: float | None = Field(
+        default=60, description="Timeout for a single tool call (None disables)"
+    )
 
     # Conversation management
     session_timeout_minutes: int = Field(
@@ -64,6 +70,60 @@ class Config(BaseSettings):
         default=100, description="Memory pruning threshold"
     )
 
+    # Profile lookup configuration
+    profiles_dir: str | None = Field(
+        default=None,
+        description="OrcaSlicer resources/profiles directory for the profile tool",
+    )
+    profile_index_path: str = Field(
+        default="data/profile_index.bin",
+        description="Prebuilt profile index, rebuilt when the profiles change",
+    )
+
+    # Documentation search configuration
+    docs_paths: list[str] = Field(
+        default=[],
+        description="Documentation directories and hints.ini files to index",
+    )
+    docs_index_path: str = Field(
+        default="data/docs_index.bin",
+        description="Prebuilt documentation index, rebuilt when the docs change",
+    )
+    docs_embedding_model: str | None = Field(
+        default=None,
+        description="Ollama embedding model for hybrid docs search (BM25 only if unset)",
+    )
+
+    # Web tool cache configuration
+    web_cache_dir: str | None = Field(
+        default="data/web_cache",
+        description="Cache directory for web search results and pages (None disables)",
+    )
+    web_cache_search_ttl_hours: float = Field(
+        default=24, description="Hours a cached web search result stays fresh"
+    )
+    web_cache_page_ttl_hours: float = Field(
+        default=168, description="Hours a cached web page stays fresh"
+    )
+    web_cache_max_mb: int = Field(
+        default=256, description="Maximum size of the web cache in megabytes"
+    )
+    web_cache_offline: bool = Field(
+        default=False,
+        description="Serve web tools from the cache only, without network access",
+    )
+
+    # Background job configuration
+    jobs_db_path: str = Field(
+        default="data/jobs.db", description="SQLite file for persisted agent jobs"
+    )
+    job_workers: int = Field(
+        default=1, description="Number of jobs processed concurrently"
+    )
+    job_retention_hours: int = Field(
+        default=24, description="Hours to keep finished jobs before cleanup"
+    )
+
     # CORS configuration
     cors_origins: list[str] = Field(
         default=["http://localhost:3000", "http://localhost:8080"],
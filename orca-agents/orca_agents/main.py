@@ -1,25 +1,43 @@
 """Main FastAPI application for Orca Agents backend."""
 
+import json
 import time
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from .agents import MultiAgentOrchestrator
 from .config import get_settings
-from .models import ChatRequest, ChatResponse, ModelsResponse
+from .models import ChatRequest, ChatResponse, JobResponse, ModelsResponse
+from .services.jobs import Job, JobManager
 
 settings = get_settings()
 
 # Initialize the multi-agent orchestrator
 orchestrator = MultiAgentOrchestrator(settings)
 
+# Background jobs for long-running agent tasks
+job_manager = JobManager(settings, orchestrator)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start and stop the background job workers with the application."""
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+
+
 app = FastAPI(
     title=settings.app_name,
     description="AI Assistant Backend for OrcaSlicer",
     version=settings.app_version,
+    lifespan=lifespan,
 )
 
 # Configure CORS for the OrcaSlicer frontend
@@ -143,3 +161,75 @@ async def get_conversation_stats(conversation_id: str) -> dict:
         raise HTTPException(
             status_code=404, detail=f"Conversation {conversation_id} not found"
         )
+
+
+def _get_job(job_id: str) -> Job:
+    """Look up a job or raise a 404 error."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: ChatRequest) -> JobResponse:
+    """Submit a chat message to be processed in the background."""
+    conversation_id = request.conversation_id or str(uuid.uuid4())
+    use_manager = request.model == settings.reasoning_model or request.use_manager
+
+    job = await job_manager.submit(
+        message=request.message,
+        conversation_id=conversation_id,
+        model=request.model
+        or (settings.reasoning_model if use_manager else settings.chat_model),
+        use_manager=use_manager,
+        reset_context=request.reset_context,
+    )
+    return job.to_response()
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str) -> JobResponse:
+    """Get the status and progress of a background job."""
+    return _get_job(job_id).to_response()
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str) -> StreamingResponse:
+    """Stream the progress of a background job as server-sent events."""
+    _get_job(job_id)
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event in job_manager.stream(job_id):
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/api/jobs/{job_id}/result", response_model=ChatResponse)
+async def get_job_result(job_id: str) -> ChatResponse:
+    """Get the answer of a successfully finished background job."""
+    job = _get_job(job_id)
+    if job.status != "succeeded":
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} is {job.status}, no result"
+        )
+
+    return ChatResponse(
+        message=job.result or "",
+        conversation_id=job.conversation_id,
+        model=job.model,
+        timestamp=job.updated_at,
+        processing_time_ms=job.processing_time_ms or 0,
+    )
+
+
+@app.delete("/api/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str) -> JobResponse:
+    """Cancel a queued or running background job."""
+    job = _get_job(job_id)
+    if not job_manager.cancel(job_id):
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} already {job.status}"
+        )
+    return job.to_response()
@@ -45,6 +45,34 @@ class ChatResponse(BaseModel):
     )
 
 
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+class JobStep(BaseModel):
+    """Progress record for a single agent step of a background job."""
+
+    step_number: int
+    tool_calls: list[str] = Field(
+        default_factory=list, description="Names of the tools called in this step"
+    )
+    observations: str | None = None
+    error: str | None = None
+    duration_seconds: float | None = None
+
+
+class JobResponse(BaseModel):
+    """Response model describing the state of a background job."""
+
+    job_id: str
+    status: JobStatus
+    conversation_id: str
+    model: str
+    created_at: datetime
+    updated_at: datetime
+    steps: list[JobStep] = Field(default_factory=list)
+    error: str | None = None
+
+
 class ModelsResponse(BaseModel):
     """Response model for the models endpoint."""
 
@@ -0,0 +1,429 @@
+"""Background job queue for long-running agent tasks.
+
+Jobs are executed by a small pool of asyncio workers and persisted to SQLite so
+that queued work and finished results survive an API restart.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from smolagents import ActionStep
+
+from ..agents import MultiAgentOrchestrator
+from ..config import Config
+from ..models import JobResponse, JobStatus, JobStep
+
+FINISHED_STATUSES: frozenset[str] = frozenset({"succeeded", "failed", "cancelled"})
+
+# Observations can contain whole web pages; keep persisted progress compact.
+MAX_OBSERVATION_CHARS = 2000
+
+
+class Job:
+    """In-memory state of a single background job."""
+
+    def __init__(
+        self,
+        job_id: str,
+        message: str,
+        conversation_id: str,
+        model: str,
+        use_manager: bool,
+        reset_context: bool,
+        status: JobStatus = "queued",
+        created_at: datetime | None = None,
+        updated_at: datetime | None = None,
+        steps: list[JobStep] | None = None,
+        result: str | None = None,
+        error: str | None = None,
+        processing_time_ms: int | None = None,
+    ):
+        """Initialize the job.
+
+        Args:
+            job_id: Unique job identifier.
+            message: User message the agent should answer.
+            conversation_id: Conversation the message belongs to.
+            model: Model reported back to the client.
+            use_manager: Whether the manager agent handles the message.
+            reset_context: Whether to reset the conversation context first.
+            status: Current job status.
+            created_at: Submission time, defaults to now.
+            updated_at: Time of the last state change, defaults to now.
+            steps: Agent steps recorded so far.
+            result: Final agent answer once the job succeeded.
+            error: Failure reason once the job failed.
+            processing_time_ms: Run time of the agent once the job finished.
+        """
+        now = datetime.now(UTC)
+        self.job_id = job_id
+        self.message = message
+        self.conversation_id = conversation_id
+        self.model = model
+        self.use_manager = use_manager
+        self.reset_context = reset_context
+        self.status: JobStatus = status
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+        self.steps: list[JobStep] = steps or []
+        self.result = result
+        self.error = error
+        self.processing_time_ms = processing_time_ms
+        self.cancel_requested = False
+        self.changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a terminal status."""
+        return self.status in FINISHED_STATUSES
+
+    def to_response(self) -> JobResponse:
+        """Convert the job to its API representation."""
+        return JobResponse(
+            job_id=self.job_id,
+            status=self.status,
+            conversation_id=self.conversation_id,
+            model=self.model,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+            steps=list(self.steps),
+            error=self.error,
+        )
+
+    def notify(self) -> None:
+        """Wake up every stream waiting for a change of this job."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class JobStore:
+    """SQLite persistence for background jobs."""
+
+    def __init__(self, db_path: str):
+        """Open (and create if needed) the job database.
+
+        Args:
+            db_path: Path of the SQLite file, or ``:memory:``.
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                message TEXT NOT NULL,
+                conversation_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                use_manager INTEGER NOT NULL,
+                reset_context INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                steps TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                processing_time_ms INTEGER
+            )
+            """
+        )
+        self._conn.commit()
+
+    def save(self, job: Job) -> None:
+        """Insert or update a job."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                job.job_id,
+                job.message,
+                job.conversation_id,
+                job.model,
+                int(job.use_manager),
+                int(job.reset_context),
+                job.status,
+                job.created_at.isoformat(),
+                job.updated_at.isoformat(),
+                json.dumps([step.model_dump() for step in job.steps]),
+                job.result,
+                job.error,
+                job.processing_time_ms,
+            ),
+        )
+        self._conn.commit()
+
+    def load_all(self) -> list[Job]:
+        """Load every persisted job, oldest first."""
+        rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [
+            Job(
+                job_id=row[0],
+                message=row[1],
+                conversation_id=row[2],
+                model=row[3],
+                use_manager=bool(row[4]),
+                reset_context=bool(row[5]),
+                status=row[6],
+                created_at=datetime.fromisoformat(row[7]),
+                updated_at=datetime.fromisoformat(row[8]),
+                steps=[JobStep(**step) for step in json.loads(row[9])],
+                result=row[10],
+                error=row[11],
+                processing_time_ms=row[12],
+            )
+            for row in rows
+        ]
+
+    def delete(self, job_ids: list[str]) -> None:
+        """Delete jobs by ID."""
+        self._conn.executemany(
+            "DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids]
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+def step_to_model(step: ActionStep) -> JobStep:
+    """Summarize a smolagents ``ActionStep`` as a ``JobStep``."""
+    observations = step.observations
+    if observations and len(observations) > MAX_OBSERVATION_CHARS:
+        observations = observations[:MAX_OBSERVATION_CHARS] + "..."
+    return JobStep(
+        step_number=step.step_number,
+        tool_calls=[call.name for call in step.tool_calls or []],
+        observations=observations,
+        error=str(step.error) if step.error else None,
+        duration_seconds=step.timing.duration if step.timing else None,
+    )
+
+
+class JobManager:
+    """In-process job queue that runs agent tasks in the background."""
+
+    def __init__(self, config: Config, orchestrator: MultiAgentOrchestrator):
+        """Initialize the job manager.
+
+        Args:
+            config: Application configuration.
+            orchestrator: Orchestrator used to run the agents.
+        """
+        self.config = config
+        self.orchestrator = orchestrator
+        self.logger = logging.getLogger(__name__)
+
+        self._store: JobStore | None = None
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[str] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Open the job store, restore persisted jobs and start the workers."""
+        self._store = JobStore(self.config.jobs_db_path)
+        self._queue = asyncio.Queue()
+
+        for job in self._store.load_all():
+            if not job.finished:
+                # Jobs interrupted by a restart are run again from scratch
+                job.status = "queued"
+                job.steps = []
+                self._store.save(job)
+                self._queue.put_nowait(job.job_id)
+            self._jobs[job.job_id] = job
+        self._prune()
+
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(max(1, self.config.job_workers))
+        ]
+        self.logger.info(
+            f"Job manager started with {len(self._workers)} workers, "
+            f"{self._queue.qsize()} jobs queued"
+        )
+
+    async def stop(self) -> None:
+        """Stop the workers and close the job store."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._store:
+            self._store.close()
+            self._store = None
+
+    async def submit(
+        self,
+        message: str,
+        conversation_id: str,
+        model: str,
+        use_manager: bool,
+        reset_context: bool = False,
+    ) -> Job:
+        """Queue a new job.
+
+        Args:
+            message: User message the agent should answer.
+            conversation_id: Conversation the message belongs to.
+            model: Model reported back to the client.
+            use_manager: Whether the manager agent handles the message.
+            reset_context: Whether to reset the conversation context first.
+
+        Returns:
+            The queued job.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+
+        job = Job(
+            job_id=str(uuid.uuid4()),
+            message=message,
+            conversation_id=conversation_id,
+            model=model,
+            use_manager=use_manager,
+            reset_context=reset_context,
+        )
+        self._prune()
+        self._jobs[job.job_id] = job
+        self._save(job)
+        self._queue.put_nowait(job.job_id)
+        self.logger.info(f"Queued job {job.job_id} for {conversation_id}")
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.
+
+        Queued jobs are cancelled immediately; running jobs are interrupted
+        after their current agent step.
+
+        Args:
+            job_id: Job to cancel.
+
+        Returns:
+            True if cancellation was requested, False if the job already finished.
+        """
+        job = self._jobs[job_id]
+        if job.finished:
+            return False
+
+        job.cancel_requested = True
+        if job.status == "queued":
+            job.status = "cancelled"
+            self._save(job)
+            job.notify()
+        self.logger.info(f"Cancellation requested for job {job_id}")
+        return True
+
+    async def stream(self, job_id: str) -> AsyncIterator[dict]:
+        """Stream the progress of a job until it finishes.
+
+        Yields one ``step`` event per recorded agent step followed by a final
+        ``status`` event with the terminal job state.
+
+        Args:
+            job_id: Job to follow.
+        """
+        job = self._jobs[job_id]
+        sent = 0
+        while True:
+            changed = job.changed
+            for step in job.steps[sent:]:
+                yield {"event": "step", "data": step.model_dump()}
+            sent = len(job.steps)
+            if job.finished:
+                break
+            await changed.wait()
+
+        yield {"event": "status", "data": job.to_response().model_dump(mode="json")}
+
+    async def _worker(self) -> None:
+        """Run queued jobs one at a time."""
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = self._jobs.get(job_id)
+                if job is not None and job.status == "queued":
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        """Run a single job and record its outcome."""
+        loop = asyncio.get_running_loop()
+
+        def record_step(step: ActionStep) -> None:
+            # Called from the agent's worker thread
+            loop.call_soon_threadsafe(self._add_step, job, step_to_model(step))
+
+        job.status = "running"
+        self._save(job)
+        job.notify()
+
+        start_time = loop.time()
+        status: JobStatus = "succeeded"
+        try:
+            job.result = await self.orchestrator.process_message_steps(
+                conversation_id=job.conversation_id,
+                message=job.message,
+                use_manager=job.use_manager,
+                reset_context=job.reset_context,
+                on_step=record_step,
+                should_cancel=lambda: job.cancel_requested,
+            )
+        except Exception as e:
+            if job.cancel_requested:
+                status = "cancelled"
+            else:
+                self.logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+                status = "failed"
+                job.error = str(e)
+
+        # Let pending step callbacks land before the job is marked finished
+        await asyncio.sleep(0)
+        job.status = status
+        job.processing_time_ms = int((loop.time() - start_time) * 1000)
+        self._save(job)
+        job.notify()
+        self.logger.info(f"Job {job.job_id} {job.status}")
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period.
+
+        Runs at startup and on every submission, so a long-running server
+        does not keep every job it ever ran.
+        """
+        cutoff = datetime.now(UTC) - timedelta(hours=self.config.job_retention_hours)
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished and job.updated_at < cutoff
+        ]
+        if not expired:
+            return
+        for job_id in expired:
+            del self._jobs[job_id]
+        if self._store:
+            self._store.delete(expired)
+        self.logger.info(f"Removed {len(expired)} expired jobs")
+
+    def _add_step(self, job: Job, step: JobStep) -> None:
+        """Record a finished agent step."""
+        job.steps.append(step)
+        self._save(job)
+        job.notify()
+
+    def _save(self, job: Job) -> None:
+        """Touch and persist a job if the store is open."""
+        job.updated_at = datetime.now(UTC)
+        if self._store:
+            self._store.save(job)
@@ -0,0 +1,16 @@
+"""Agent tools for the Orca Agents backend."""
+
+__all__ = [
+    "CachedTool",
+    "DocsIndex",
+    "DocsSearchTool",
+    "ProfileIndex",
+    "ProfileLookupTool",
+    "TimeoutTool",
+    "WebCache",
+]
+
+from .docs import DocsIndex, DocsSearchTool
+from .profiles import ProfileIndex, ProfileLookupTool
+from .web_cache import CachedTool, WebCache
+from .wrappers import TimeoutTool
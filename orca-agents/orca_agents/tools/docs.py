@@ -0,0 +1,398 @@
+"""Offline search over the OrcaSlicer documentation and in-app hints.
+
+Markdown files (``doc/``, ``SoftFever_doc/``) are split into sections and
+``hints.ini`` into one chunk per hint. Chunks are ranked with BM25 and,
+optionally, with embeddings from a local Ollama model combined by reciprocal
+rank fusion. Everything is stored in one index file: the header holds the chunk
+table and BM25 postings, the body holds chunk texts followed by the normalized
+float32 embedding vectors.
+"""
+
+import configparser
+import logging
+import math
+import re
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+from smolagents import Tool
+
+from .index_file import IndexFile, fingerprint_files, tokenize, write_index_file
+
+INDEX_MAGIC = b"ORCADOC1"
+
+MAX_CHUNK_CHARS = 1200
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Reciprocal rank fusion constant for combining BM25 and embedding rankings
+RRF_K = 60
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+LINK_PATTERN = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    """Anything that turns texts into embedding vectors."""
+
+    model: str
+
+    def embed(self, texts: list[str]) -> list[list[float]]: ...
+
+
+class OllamaEmbedder:
+    """Embedding client for a local Ollama service."""
+
+    def __init__(self, base_url: str, model: str, timeout: float = 60.0):
+        """Initialize the embedder.
+
+        Args:
+            base_url: Ollama server URL.
+            model: Embedding model, e.g. ``nomic-embed-text``.
+            timeout: Request timeout in seconds.
+        """
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+
+    def embed(self, texts: list[str], batch_size: int = 32) -> list[list[float]]:
+        """Embed texts with the Ollama ``/api/embed`` endpoint."""
+        embeddings = []
+        with httpx.Client(timeout=self.timeout) as client:
+            for start in range(0, len(texts), batch_size):
+                response = client.post(
+                    f"{self.base_url}/api/embed",
+                    json={
+                        "model": self.model,
+                        "input": texts[start : start + batch_size],
+                    },
+                )
+                response.raise_for_status()
+                embeddings.extend(response.json()["embeddings"])
+        return embeddings
+
+
+def clean_markdown(text: str) -> str:
+    """Strip images, link targets and HTML tags from markdown text."""
+    text = IMAGE_PATTERN.sub("", text)
+    text = LINK_PATTERN.sub(r"\1", text)
+    text = HTML_TAG_PATTERN.sub("", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def split_text(text: str, max_chars: int = MAX_CHUNK_CHARS) -> list[str]:
+    """Split text into chunks of whole paragraphs of at most ``max_chars``.
+
+    Paragraphs longer than ``max_chars`` are kept as a single chunk.
+    """
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_markdown(text: str, source: str) -> list[tuple[str, str, str]]:
+    """Split a markdown document into (source, title, text) chunks per section.
+
+    Titles are the heading path of the section, e.g. "Calibration > Flow rate".
+    Headings inside fenced code blocks are ignored.
+    """
+    sections: list[tuple[list[str], list[str]]] = [([], [])]
+    headings: list[str] = []
+    in_code = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING_PATTERN.match(line)
+        if match:
+            level = len(match.group(1))
+            headings = headings[: level - 1] + [clean_markdown(match.group(2))]
+            sections.append((list(headings), []))
+        else:
+            sections[-1][1].append(line)
+
+    default_title = Path(source).stem.replace("-", " ").replace("_", " ")
+    chunks = []
+    for section_headings, lines in sections:
+        body = clean_markdown("\n".join(lines))
+        if not body:
+            continue
+        title = " > ".join(h for h in section_headings if h) or default_title
+        chunks.extend((source, title, part) for part in split_text(body))
+    return chunks
+
+
+def chunk_hints(text: str, source: str) -> list[tuple[str, str, str]]:
+    """Split ``hints.ini`` into one (source, title, text) chunk per hint."""
+    parser = configparser.ConfigParser(interpolation=None, strict=False)
+    parser.read_string(text)
+
+    chunks = []
+    for section in parser.sections():
+        if not section.startswith("hint:") or "text" not in parser[section]:
+            continue
+        headline, _, body = parser[section]["text"].partition("\\n")
+        body = HTML_TAG_PATTERN.sub("", body.replace("\\n", "\n").replace('\\"', '"'))
+        link = parser[section].get("documentation_link")
+        hint_source = f"{source} ({link})" if link else source
+        chunks.append((hint_source, headline.strip(), body.strip()))
+    return chunks
+
+
+def collect_source_files(paths: Iterable[Path]) -> list[tuple[Path, str]]:
+    """List documentation files with the source name shown to the agent.
+
+    Directories contribute all markdown files below them, named relative to
+    the directory's parent (e.g. ``doc/calibration/temp-calib.md``).
+    """
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(
+                (file, file.relative_to(path.parent).as_posix())
+                for file in sorted(path.rglob("*.md"))
+            )
+        elif path.is_file():
+            files.append((path, path.name))
+    return files
+
+
+def build_docs_index(
+    paths: list[Path], index_path: Path, embedder: Embedder | None = None
+) -> None:
+    """Chunk the documentation and write the search index.
+
+    Args:
+        paths: Documentation directories and ``hints.ini`` files.
+        index_path: File the index is written to.
+        embedder: Optional embedder for hybrid search.
+    """
+    files = collect_source_files(paths)
+    chunks: list[tuple[str, str, str]] = []
+    for file, source in files:
+        text = file.read_text(encoding="utf-8", errors="replace")
+        if file.suffix == ".ini":
+            chunks.extend(chunk_hints(text, source))
+        else:
+            chunks.extend(chunk_markdown(text, source))
+
+    entries = []
+    postings: dict[str, list[list[int]]] = defaultdict(list)
+    body = bytearray()
+    total_length = 0
+    for chunk_id, (source, title, text) in enumerate(chunks):
+        tokens = tokenize(f"{title} {text}")
+        for token, count in Counter(tokens).items():
+            postings[token].append([chunk_id, count])
+
+        encoded = text.encode("utf-8")
+        entries.append([source, title, len(body), len(encoded), len(tokens)])
+        body += encoded
+        total_length += len(tokens)
+
+    header: dict[str, Any] = {
+        "fingerprint": docs_fingerprint(files, embedder),
+        "chunks": entries,
+        "postings": postings,
+        "average_length": total_length / len(entries) if entries else 0.0,
+        "embedding_offset": None,
+        "embedding_dim": 0,
+    }
+
+    if embedder and chunks:
+        vectors = embedder.embed([f"{title}\n{text}" for _, title, text in chunks])
+        header["embedding_offset"] = len(body)
+        header["embedding_dim"] = len(vectors[0])
+        body += array(
+            "f", [v for vector in vectors for v in normalize(vector)]
+        ).tobytes()
+
+    write_index_file(index_path, INDEX_MAGIC, header, bytes(body))
+
+
+def docs_fingerprint(files: list[tuple[Path, str]], embedder: Embedder | None) -> str:
+    """Fingerprint the source files together with the embedding model."""
+    model = embedder.model if embedder else ""
+    return f"{model}:{fingerprint_files(file for file, _ in files)}"
+
+
+def normalize(vector: list[float]) -> list[float]:
+    """Scale a vector to unit length."""
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class DocsIndex:
+    """Read-only, memory-mapped documentation search index."""
+
+    def __init__(self, index_path: Path, embedder: Embedder | None = None):
+        """Open an index file.
+
+        Args:
+            index_path: File written by ``build_docs_index``.
+            embedder: Embedder for queries; only used if the index has vectors.
+
+        Raises:
+            ValueError: If the file is not a documentation index.
+        """
+        self._file = IndexFile(index_path, INDEX_MAGIC)
+        self.fingerprint: str = self._file.header["fingerprint"]
+        self._chunks: list[list] = self._file.header["chunks"]
+        self._postings: dict[str, list[list[int]]] = self._file.header["postings"]
+        self._average_length: float = self._file.header["average_length"]
+        self._embedder = embedder if self._file.header["embedding_offset"] else None
+        self._vectors: array | None = None
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    @classmethod
+    def load_or_build(
+        cls, paths: list[Path], index_path: Path, embedder: Embedder | None = None
+    ) -> "DocsIndex":
+        """Open the index, rebuilding it first if it is missing or stale."""
+        if index_path.exists():
+            try:
+                index = cls(index_path, embedder)
+                files = collect_source_files(paths)
+                if index.fingerprint == docs_fingerprint(files, embedder):
+                    return index
+                index.close()
+            except ValueError:
+                pass
+
+        build_docs_index(paths, index_path, embedder)
+        return cls(index_path, embedder)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._file.close()
+
+    def search(self, query: str, limit: int = 4) -> list[tuple[str, str, str]]:
+        """Find the chunks most relevant to a query.
+
+        Args:
+            query: Free-text question or keywords.
+            limit: Maximum number of chunks.
+
+        Returns:
+            List of (source, title, text) tuples, best match first.
+        """
+        rankings = [self._bm25_ranking(query)]
+        if self._embedder:
+            try:
+                rankings.append(self._embedding_ranking(query))
+            except httpx.HTTPError as e:
+                logger.warning(f"Embedding search unavailable, using BM25 only: {e}")
+
+        scores: dict[int, float] = defaultdict(float)
+        for ranking in rankings:
+            for rank, chunk_id in enumerate(ranking[: limit * 5]):
+                scores[chunk_id] += 1.0 / (RRF_K + rank)
+
+        best = sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))
+        return [self._load(chunk_id) for chunk_id in best[:limit]]
+
+    def _bm25_ranking(self, query: str) -> list[int]:
+        """Rank chunks containing any query token by BM25 score."""
+        scores: dict[int, float] = defaultdict(float)
+        chunk_count = len(self._chunks)
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for chunk_id, count in postings:
+                length = self._chunks[chunk_id][4]
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self._average_length)
+                scores[chunk_id] += idf * count * (BM25_K1 + 1) / (count + norm)
+        return sorted(scores, key=lambda chunk_id: (-scores[chunk_id], chunk_id))
+
+    def _embedding_ranking(self, query: str) -> list[int]:
+        """Rank all chunks by cosine similarity to the query embedding."""
+        dim = self._file.header["embedding_dim"]
+        if self._vectors is None:
+            self._vectors = array("f")
+            self._vectors.frombytes(
+                self._file.read(
+                    self._file.header["embedding_offset"], len(self._chunks) * dim * 4
+                )
+            )
+
+        query_vector = normalize(self._embedder.embed([query])[0])
+        similarities = [
+            sum(
+                a * b
+                for a, b in zip(
+                    query_vector, self._vectors[i * dim : (i + 1) * dim], strict=True
+                )
+            )
+            for i in range(len(self._chunks))
+        ]
+        return sorted(range(len(self._chunks)), key=lambda i: -similarities[i])
+
+    def _load(self, chunk_id: int) -> tuple[str, str, str]:
+        """Read a chunk from the memory-mapped body."""
+        source, title, offset, size, _ = self._chunks[chunk_id]
+        return source, title, self._file.read(offset, size).decode("utf-8")
+
+
+class DocsSearchTool(Tool):
+    """smolagents tool searching the local OrcaSlicer documentation."""
+
+    name = "docs_search"
+    description = (
+        "Searches the offline OrcaSlicer documentation (wiki pages, calibration "
+        "guides and in-app hints). Use it for questions about OrcaSlicer "
+        "features, settings and calibration before searching the web. Returns "
+        "the most relevant documentation excerpts with their source files."
+    )
+    inputs = {
+        "query": {
+            "type": "string",
+            "description": (
+                "Question or keywords, e.g. 'how to calibrate pressure advance' "
+                "or 'precise wall'."
+            ),
+        },
+    }
+    output_type = "string"
+
+    def __init__(self, index: DocsIndex):
+        """Initialize the tool.
+
+        Args:
+            index: Documentation index to search.
+        """
+        super().__init__()
+        self.index = index
+
+    def forward(self, query: str) -> str:
+        results = self.index.search(query)
+        if not results:
+            raise ValueError(
+                f"No documentation matches '{query}'. Try other keywords, "
+                "e.g. the name of the setting or feature."
+            )
+        logger.debug(f"Docs search '{query}': {len(results)} excerpts")
+
+        return "\n\n".join(
+            f"[{number}] {title} ({source})\n{text}"
+            for number, (source, title, text) in enumerate(results, start=1)
+        )
@@ -0,0 +1,102 @@
+"""Shared on-disk format for the prebuilt indexes used by agent tools.
+
+An index file is laid out as:
+
+    MAGIC (8 bytes) | header length (uint64) | header (JSON) | body
+
+The header is small and decoded when the file is opened; the body is
+memory-mapped and only the byte ranges a lookup needs are read.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+INDEX_PREAMBLE = struct.Struct("<8sQ")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case search tokens.
+
+    Decimal numbers such as nozzle sizes ("0.2") are kept as single tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def fingerprint_files(paths: Iterable[Path]) -> str:
+    """Hash the paths, sizes and modification times of source files."""
+    stats = []
+    for path in paths:
+        stat = os.stat(path)
+        stats.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1("\n".join(sorted(stats)).encode()).hexdigest()
+
+
+def write_index_file(
+    index_path: Path, magic: bytes, header: dict[str, Any], body: bytes
+) -> None:
+    """Atomically write an index file.
+
+    Args:
+        index_path: Destination file.
+        magic: 8-byte format identifier.
+        header: JSON-serializable header.
+        body: Raw body bytes, addressed by offsets stored in the header.
+    """
+    encoded = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode()
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(INDEX_PREAMBLE.pack(magic, len(encoded)))
+        f.write(encoded)
+        f.write(body)
+    os.replace(tmp_path, index_path)
+
+
+class IndexFile:
+    """Memory-mapped index file with a decoded header."""
+
+    def __init__(self, index_path: Path, magic: bytes):
+        """Open an index file.
+
+        Args:
+            index_path: File written by ``write_index_file``.
+            magic: Expected 8-byte format identifier.
+
+        Raises:
+            ValueError: If the file is not an index of the expected format.
+        """
+        with open(index_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            file_magic, header_size = INDEX_PREAMBLE.unpack_from(self._mmap)
+        except struct.error as e:
+            self._mmap.close()
+            raise ValueError(f"{index_path} is not a valid index file") from e
+        if file_magic != magic:
+            self._mmap.close()
+            raise ValueError(f"{index_path} is not a {magic.decode()} index file")
+
+        self._body_offset = INDEX_PREAMBLE.size + header_size
+        self.header: dict[str, Any] = json.loads(
+            self._mmap[INDEX_PREAMBLE.size : self._body_offset]
+        )
+
+    def read(self, offset: int, size: int) -> bytes:
+        """Read a byte range of the body."""
+        start = self._body_offset + offset
+        return self._mmap[start : start + size]
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._mmap.close()
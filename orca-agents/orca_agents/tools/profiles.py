@@ -0,0 +1,328 @@
+"""Lookup tool over OrcaSlicer's bundled printer, filament and process profiles.
+
+The profiles in ``resources/profiles`` are resolved once (following their
+``inherits`` chains) and written to a single index file. Its header holds the
+profile table (name, vendor, type, byte range) and an inverted index from name
+tokens to profile IDs; the body holds the resolved profiles as JSON. At startup
+only the header is decoded; the body is memory-mapped and each profile is
+decoded on first access, so lookups take microseconds instead of a web search.
+"""
+
+import heapq
+import json
+import logging
+import os
+from collections import Counter, defaultdict
+from itertools import chain
+from pathlib import Path
+from typing import Any
+
+from smolagents import Tool
+
+from .index_file import IndexFile, fingerprint_files, tokenize, write_index_file
+
+INDEX_MAGIC = b"ORCAPIX1"
+
+# Vendor whose profiles can be inherited by every other vendor
+LIBRARY_VENDOR = "OrcaFilamentLibrary"
+PROFILE_TYPES = ("machine", "filament", "process")
+
+logger = logging.getLogger(__name__)
+
+
+def profiles_fingerprint(profiles_dir: Path) -> str:
+    """Hash the paths, sizes and modification times of all profile files."""
+    return fingerprint_files(
+        Path(root, file)
+        for root, _, files in os.walk(profiles_dir)
+        for file in files
+        if file.endswith(".json")
+    )
+
+
+def load_vendor_profiles(profiles_dir: Path) -> dict[str, dict[str, dict[str, Any]]]:
+    """Load the raw profiles of every vendor, keyed by vendor and profile name.
+
+    The profile type is taken from the ``type`` key, or from the sub-directory
+    for profiles that omit it.
+    """
+    vendors: dict[str, dict[str, dict[str, Any]]] = {}
+    for vendor_dir in sorted(p for p in profiles_dir.iterdir() if p.is_dir()):
+        profiles: dict[str, dict[str, Any]] = {}
+        for profile_type in PROFILE_TYPES:
+            for path in sorted((vendor_dir / profile_type).rglob("*.json")):
+                try:
+                    data = json.loads(path.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(data, dict) or "name" not in data:
+                    continue
+                data.setdefault("type", profile_type)
+                profiles[data["name"]] = data
+        vendors[vendor_dir.name] = profiles
+    return vendors
+
+
+def resolve_profile(
+    vendors: dict[str, dict[str, dict[str, Any]]],
+    vendor: str,
+    name: str,
+    cache: dict[tuple[str, str], dict[str, Any]],
+) -> dict[str, Any]:
+    """Flatten a profile by merging it over its ``inherits`` chain.
+
+    Parents are looked up in the profile's own vendor first and then in the
+    shared filament library. Missing parents and cycles end the chain.
+    """
+    key = (vendor, name)
+    if key in cache:
+        return cache[key]
+
+    lineage = []
+    seen = set()
+    while key not in cache and key not in seen:
+        seen.add(key)
+        profile = vendors[key[0]][key[1]]
+        lineage.append((key, profile))
+        parent = profile.get("inherits")
+        if not parent:
+            break
+        if parent in vendors[key[0]]:
+            key = (key[0], parent)
+        elif parent in vendors.get(LIBRARY_VENDOR, {}):
+            key = (LIBRARY_VENDOR, parent)
+        else:
+            break
+
+    resolved = dict(cache.get(key, {}))
+    for chain_key, profile in reversed(lineage):
+        resolved = {**resolved, **profile}
+        cache[chain_key] = resolved
+    return cache[(vendor, name)]
+
+
+def build_profile_index(profiles_dir: Path, index_path: Path) -> None:
+    """Resolve all profiles and write the lookup index.
+
+    Args:
+        profiles_dir: OrcaSlicer ``resources/profiles`` directory.
+        index_path: File the index is written to.
+    """
+    vendors = load_vendor_profiles(profiles_dir)
+    cache: dict[tuple[str, str], dict[str, Any]] = {}
+
+    entries = []
+    postings: dict[str, list[int]] = defaultdict(list)
+    body = bytearray()
+    for vendor, profiles in vendors.items():
+        for name in sorted(profiles):
+            resolved = resolve_profile(vendors, vendor, name, cache)
+            data = json.dumps(resolved, ensure_ascii=False, separators=(",", ":"))
+            encoded = data.encode("utf-8")
+
+            profile_id = len(entries)
+            instantiable = str(resolved.get("instantiation", "")).lower() == "true"
+            entries.append(
+                [
+                    name,
+                    vendor,
+                    resolved["type"],
+                    instantiable,
+                    len(tokenize(name)),
+                    len(body),
+                    len(encoded),
+                ]
+            )
+            body += encoded
+            for token in set(tokenize(f"{name} {vendor} {resolved['type']}")):
+                postings[token].append(profile_id)
+
+    write_index_file(
+        index_path,
+        INDEX_MAGIC,
+        {
+            "fingerprint": profiles_fingerprint(profiles_dir),
+            "profiles": entries,
+            "postings": postings,
+        },
+        bytes(body),
+    )
+
+
+class ProfileIndex:
+    """Read-only, memory-mapped view of a profile index file."""
+
+    def __init__(self, index_path: Path):
+        """Open an index file.
+
+        Args:
+            index_path: File written by ``build_profile_index``.
+
+        Raises:
+            ValueError: If the file is not a profile index.
+        """
+        self._file = IndexFile(index_path, INDEX_MAGIC)
+        self.fingerprint: str = self._file.header["fingerprint"]
+        self._entries: list[list] = self._file.header["profiles"]
+        self._postings: dict[str, list[int]] = self._file.header["postings"]
+        self._resolved: dict[int, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def load_or_build(cls, profiles_dir: Path, index_path: Path) -> "ProfileIndex":
+        """Open the index, rebuilding it first if it is missing or stale."""
+        if index_path.exists():
+            try:
+                index = cls(index_path)
+                if index.fingerprint == profiles_fingerprint(profiles_dir):
+                    return index
+                index.close()
+            except ValueError:
+                pass
+
+        build_profile_index(profiles_dir, index_path)
+        return cls(index_path)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._file.close()
+
+    def search(
+        self, query: str, profile_type: str | None = None, limit: int = 5
+    ) -> list[tuple[str, str, str]]:
+        """Find profiles whose names best match a query.
+
+        Profiles are ranked by the number of query tokens in their name, then
+        instantiable profiles first, then by the fewest unmatched name tokens.
+
+        Args:
+            query: Free-text query, e.g. "Bambu PC A1 0.2".
+            profile_type: Optional filter: machine, filament or process.
+            limit: Maximum number of results.
+
+        Returns:
+            List of (name, vendor, type) tuples, best match first.
+        """
+        hits = Counter(
+            chain.from_iterable(
+                self._postings.get(token, ()) for token in set(tokenize(query))
+            )
+        )
+
+        def rank(profile_id: int) -> tuple:
+            name, vendor, _, instantiable, token_count = self._entries[profile_id][:5]
+            extra = token_count - hits[profile_id]
+            return (-hits[profile_id], not instantiable, extra, name, vendor)
+
+        candidates = [
+            profile_id
+            for profile_id in hits
+            if profile_type is None or self._entries[profile_id][2] == profile_type
+        ]
+        best = heapq.nsmallest(limit, candidates, key=rank)
+        return [tuple(self._entries[profile_id][:3]) for profile_id in best]
+
+    def get(self, name: str, vendor: str | None = None) -> dict[str, Any] | None:
+        """Get the fully resolved settings of a profile by exact name."""
+        for profile_id in self._postings.get(next(iter(tokenize(name)), ""), ()):
+            entry = self._entries[profile_id]
+            if entry[0] == name and (vendor is None or entry[1] == vendor):
+                return self._load(profile_id)
+        return None
+
+    def _load(self, profile_id: int) -> dict[str, Any]:
+        """Decode a resolved profile from the memory-mapped body."""
+        if profile_id not in self._resolved:
+            offset, size = self._entries[profile_id][5:7]
+            self._resolved[profile_id] = json.loads(self._file.read(offset, size))
+        return self._resolved[profile_id]
+
+
+class ProfileLookupTool(Tool):
+    """smolagents tool answering questions about OrcaSlicer system profiles."""
+
+    name = "profile_lookup"
+    description = (
+        "Looks up OrcaSlicer's bundled printer (machine), filament and process "
+        "profiles, with all inherited settings resolved. Use it for questions "
+        "like the nozzle temperature of a filament on a given printer and "
+        "nozzle size, instead of searching the web. Returns the best matching "
+        "profile names and, if a setting is given, the matching setting values "
+        "of the best match."
+    )
+    inputs = {
+        "query": {
+            "type": "string",
+            "description": (
+                "Words of the profile name, e.g. 'Bambu PC A1 0.2' or "
+                "'Prusa MK4 0.4 nozzle'."
+            ),
+        },
+        "setting": {
+            "type": "string",
+            "description": (
+                "Optional setting key or part of it, e.g. 'nozzle_temperature' "
+                "or 'temperature'. Leave empty to list matching profiles."
+            ),
+            "nullable": True,
+        },
+        "profile_type": {
+            "type": "string",
+            "description": "Optional profile type: 'machine', 'filament' or 'process'.",
+            "nullable": True,
+        },
+    }
+    output_type = "string"
+
+    def __init__(self, index: ProfileIndex):
+        """Initialize the tool.
+
+        Args:
+            index: Profile index to answer lookups from.
+        """
+        super().__init__()
+        self.index = index
+
+    def forward(
+        self,
+        query: str,
+        setting: str | None = None,
+        profile_type: str | None = None,
+    ) -> str:
+        if profile_type and profile_type not in PROFILE_TYPES:
+            raise ValueError(
+                f"Unknown profile_type '{profile_type}', "
+                f"use one of: {', '.join(PROFILE_TYPES)}"
+            )
+
+        matches = self.index.search(query, profile_type=profile_type)
+        if not matches:
+            raise ValueError(
+                f"No profile matches '{query}'. Try fewer or different words "
+                "from the printer, filament or process name."
+            )
+        logger.debug(f"Profile lookup '{query}': {len(matches)} matches")
+
+        lines = [f"Best match: {matches[0][0]} ({matches[0][2]}, {matches[0][1]})"]
+        if len(matches) > 1:
+            lines.append("Other matches:")
+            lines.extend(
+                f"- {name} ({ptype}, {vendor})" for name, vendor, ptype in matches[1:]
+            )
+
+        if setting:
+            profile = self.index.get(matches[0][0], vendor=matches[0][1])
+            needle = setting.strip().lower().replace(" ", "_")
+            values = {key: value for key, value in profile.items() if needle in key}
+            if not values:
+                raise ValueError(
+                    f"Profile '{matches[0][0]}' has no setting matching '{setting}'"
+                )
+            lines.append("Settings:")
+            lines.extend(
+                f"- {key}: {json.dumps(value)}" for key, value in sorted(values.items())
+            )
+
+        return "\n".join(lines)
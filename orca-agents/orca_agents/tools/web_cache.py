@@ -0,0 +1,254 @@
+"""On-disk result cache for the web surfer's search and page tools.
+
+Tool results are stored content-addressed: each distinct result is written
+once, zlib-compressed, to ``blobs/<sha256>``, and a SQLite table maps the tool
+name and normalized arguments to the content hash. Entries expire after a
+per-tool TTL; when the blobs exceed the size cap, the least recently used
+entries are evicted. In offline mode every lookup is served from the cache,
+regardless of age, and misses fail instead of reaching the network, so agents
+can be replayed in tests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urldefrag
+
+from smolagents import Tool
+
+from .wrappers import ToolWrapper
+
+# Results that VisitWebpageTool returns instead of raising on network errors
+UNCACHEABLE_PREFIXES = (
+    "Error fetching the webpage",
+    "The request timed out",
+    "An unexpected error occurred",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share results."""
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Strip whitespace and the fragment, which never changes the fetched page."""
+    return urldefrag(url.strip()).url
+
+
+class WebCache:
+    """Content-addressed, size-capped cache of web tool results."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int, offline: bool = False):
+        """Initialize the cache. Files are created on first use.
+
+        Args:
+            cache_dir: Directory holding the SQLite index and the blobs.
+            max_bytes: Maximum total size of the stored blobs.
+            offline: Serve every lookup from the cache, ignoring TTLs.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict[str, Any]) -> str:
+        """Hash a tool name and its arguments into a cache key."""
+        encoded = json.dumps([tool_name, arguments], sort_keys=True)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, key: str, ttl_seconds: float) -> str | None:
+        """Look up a cached result.
+
+        Args:
+            key: Cache key from ``make_key``.
+            ttl_seconds: Maximum age of the entry, ignored in offline mode.
+
+        Returns:
+            The cached result, or None if missing or expired.
+        """
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT content_hash, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content_hash, created_at = row
+            now = time.time()
+            if not self.offline and now - created_at > ttl_seconds:
+                return None
+            try:
+                content = zlib.decompress(self._blob_path(content_hash).read_bytes())
+            except (OSError, zlib.error):
+                logger.warning(f"Dropping unreadable web cache blob {content_hash}")
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return content.decode("utf-8")
+
+    def put(self, key: str, tool_name: str, content: str) -> None:
+        """Store a result, then evict entries until the size cap holds.
+
+        Args:
+            key: Cache key from ``make_key``.
+            tool_name: Name of the tool that produced the result.
+            content: Tool result.
+        """
+        encoded = content.encode("utf-8")
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        with self._lock:
+            conn = self._connect()
+            stored = conn.execute(
+                "SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if stored is None:
+                compressed = zlib.compress(encoded)
+                blob_path = self._blob_path(content_hash)
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = blob_path.with_suffix(".tmp")
+                tmp_path.write_bytes(compressed)
+                os.replace(tmp_path, blob_path)
+                conn.execute(
+                    "INSERT INTO blobs VALUES (?, ?)", (content_hash, len(compressed))
+                )
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, tool_name, content_hash, now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def size(self) -> int:
+        """Total size of the stored blobs in bytes."""
+        with self._lock:
+            return self._total_size(self._connect())
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open (and create if needed) the cache database."""
+        if self._conn is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.cache_dir / "cache.db", check_same_thread=False
+            )
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS entries_accessed_at
+                    ON entries (accessed_at);
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL
+                );
+                """
+            )
+        return self._conn
+
+    @staticmethod
+    def _total_size(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, content_hash: str) -> Path:
+        return self.cache_dir / "blobs" / content_hash[:2] / content_hash
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used entries and orphaned blobs over the size cap."""
+        total = self._total_size(conn)
+        if total <= self.max_bytes:
+            return
+
+        oldest = conn.execute(
+            "SELECT key, content_hash FROM entries ORDER BY accessed_at"
+        ).fetchall()
+        for key, content_hash in oldest:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            if conn.execute(
+                "SELECT 1 FROM entries WHERE content_hash = ?", (content_hash,)
+            ).fetchone():
+                continue
+            total -= conn.execute(
+                "SELECT size FROM blobs WHERE content_hash = ?", (content_hash,)
+            ).fetchone()[0]
+            conn.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+            self._blob_path(content_hash).unlink(missing_ok=True)
+
+
+class CachedTool(ToolWrapper):
+    """smolagents tool serving another tool's results through a ``WebCache``."""
+
+    def __init__(
+        self,
+        tool: Tool,
+        cache: WebCache,
+        ttl_seconds: float,
+        normalize: Callable[[str], str] | None = None,
+    ):
+        """Initialize the tool.
+
+        Args:
+            tool: Tool whose results are cached; its name, description and
+                inputs are reused unchanged.
+            cache: Cache to store results in.
+            ttl_seconds: Maximum age of a cached result.
+            normalize: Optional normalization applied to string arguments
+                before they are used as a cache key.
+        """
+        super().__init__(tool)
+        self.cache = cache
+        self.ttl_seconds = ttl_seconds
+        self.normalize = normalize
+
+    def forward(self, *args, **kwargs) -> Any:
+        arguments = self.bind_arguments(args, kwargs)
+        key_arguments = {
+            name: self.normalize(value)
+            if self.normalize and isinstance(value, str)
+            else value
+            for name, value in arguments.items()
+        }
+        key = self.cache.make_key(self.name, key_arguments)
+
+        cached = self.cache.get(key, self.ttl_seconds)
+        if cached is not None:
+            logger.debug(f"Web cache hit for {self.name}")
+            return cached
+        if self.cache.offline:
+            raise ValueError(
+                f"No cached result for {self.name} with {arguments} "
+                "(web cache is in offline mode)"
+            )
+
+        result = self.tool(**arguments)
+        if isinstance(result, str) and not result.startswith(UNCACHEABLE_PREFIXES):
+            self.cache.put(key, self.name, result)
+        return result
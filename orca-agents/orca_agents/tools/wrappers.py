@@ -0,0 +1,70 @@
+"""Tools that wrap another smolagents tool and change how it is executed."""
+
+import threading
+from typing import Any
+
+from smolagents import Tool
+
+
+class ToolWrapper(Tool):
+    """Base class for tools exposing another tool's interface unchanged."""
+
+    # forward() takes the wrapped tool's inputs, which differ per instance
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool: Tool):
+        """Initialize the wrapper.
+
+        Args:
+            tool: Tool whose name, description, inputs and output type are
+                reused unchanged.
+        """
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        super().__init__()
+        self.tool = tool
+
+    def bind_arguments(self, args: tuple, kwargs: dict[str, Any]) -> dict[str, Any]:
+        """Map positional and keyword arguments to the wrapped tool's inputs."""
+        return dict(zip(self.inputs, args, strict=False), **kwargs)
+
+
+class TimeoutTool(ToolWrapper):
+    """Tool failing calls of another tool that do not finish within a timeout."""
+
+    def __init__(self, tool: Tool, timeout_seconds: float):
+        """Initialize the tool.
+
+        Args:
+            tool: Tool to run with a timeout.
+            timeout_seconds: Maximum run time of a single call.
+        """
+        super().__init__(tool)
+        self.timeout_seconds = timeout_seconds
+
+    def forward(self, *args, **kwargs) -> Any:
+        arguments = self.bind_arguments(args, kwargs)
+        outcome: dict[str, Any] = {}
+
+        def call() -> None:
+            try:
+                outcome["result"] = self.tool(**arguments)
+            except Exception as e:
+                outcome["error"] = e
+
+        # A daemon thread per call: a call that hangs past its timeout is
+        # abandoned without blocking later calls or interpreter shutdown.
+        thread = threading.Thread(target=call, name=f"tool-{self.name}", daemon=True)
+        thread.start()
+        thread.join(self.timeout_seconds)
+
+        if thread.is_alive():
+            raise TimeoutError(
+                f"Tool {self.name} did not finish within {self.timeout_seconds:g} "
+                "seconds. Try again with a different input."
+            )
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
@@ -1,12 +1,23 @@
 """Tests for the OllamaAgentFactory."""
 
+import threading
 from unittest.mock import Mock, patch
 
+import httpx
 import pytest
-from smolagents import LiteLLMModel, ToolCallingAgent
+from smolagents import FinalAnswerTool, LiteLLMModel, Tool, ToolCallingAgent
+from smolagents.models import (
+    ChatMessage,
+    ChatMessageToolCall,
+    ChatMessageToolCallFunction,
+)
 
 from orca_agents.agents.factory import OllamaAgentFactory
 from orca_agents.config import Config
+from orca_agents.tools.docs import DocsSearchTool
+from orca_agents.tools.profiles import ProfileLookupTool
+from orca_agents.tools.web_cache import CachedTool
+from orca_agents.tools.wrappers import TimeoutTool
 
 
 class TestOllamaAgentFactory:
@@ -229,3 +240,165 @@ class TestOllamaAgentFactory:
         """Test various model naming scenarios for prefix handling."""
         model = factory.create_model(model_input)
         assert model.model_id == expected_output
+
+    def test_create_profile_tools_disabled_by_default(self, factory):
+        """Test that no profile tools are created without a profiles directory."""
+        assert factory.create_profile_tools() == []
+
+    def test_create_profile_tools_missing_directory(self, config, tmp_path):
+        """Test that a missing profiles directory is logged and skipped."""
+        config.profiles_dir = str(tmp_path / "missing")
+        factory = OllamaAgentFactory(config)
+
+        with patch.object(factory.logger, "warning") as mock_warning:
+            assert factory.create_profile_tools() == []
+            mock_warning.assert_called_once()
+
+    def test_create_profile_tools_shares_index(self, config, tmp_path):
+        """Test that the profile index is loaded once and shared by tools."""
+        profile = tmp_path / "profiles" / "Test" / "machine" / "Test Printer.json"
+        profile.parent.mkdir(parents=True)
+        profile.write_text('{"type": "machine", "name": "Test Printer"}')
+        config.profiles_dir = str(tmp_path / "profiles")
+        config.profile_index_path = str(tmp_path / "index.bin")
+        factory = OllamaAgentFactory(config)
+
+        first = factory.create_profile_tools()
+        second = factory.create_profile_tools()
+
+        assert isinstance(first[0], ProfileLookupTool)
+        assert first[0].index is second[0].index
+
+    def test_create_docs_tools_disabled_by_default(self, factory):
+        """Test that no docs tools are created without documentation paths."""
+        assert factory.create_docs_tools() == []
+
+    def test_create_docs_tools_shares_index(self, config, tmp_path):
+        """Test that the docs index is loaded once and shared by tools."""
+        (tmp_path / "doc").mkdir()
+        (tmp_path / "doc" / "Home.md").write_text("# Home\n\nWelcome to the wiki.")
+        config.docs_paths = [str(tmp_path / "doc"), str(tmp_path / "missing.ini")]
+        config.docs_index_path = str(tmp_path / "docs.bin")
+        factory = OllamaAgentFactory(config)
+
+        first = factory.create_docs_tools()
+        second = factory.create_docs_tools()
+
+        assert isinstance(first[0], DocsSearchTool)
+        assert first[0].index is second[0].index
+
+    def test_create_docs_tools_without_embedding_service(self, config, tmp_path):
+        """Test that an unreachable embedding model falls back to BM25."""
+        (tmp_path / "doc").mkdir()
+        (tmp_path / "doc" / "Home.md").write_text("# Home\n\nWelcome to the wiki.")
+        config.docs_paths = [str(tmp_path / "doc")]
+        config.docs_index_path = str(tmp_path / "docs.bin")
+        config.docs_embedding_model = "nomic-embed-text"
+        factory = OllamaAgentFactory(config)
+
+        with patch(
+            "orca_agents.agents.factory.OllamaEmbedder.embed",
+            side_effect=httpx.ConnectError("Ollama down"),
+        ):
+            tools = factory.create_docs_tools()
+
+        assert tools[0].index.search("welcome")[0][1] == "Home"
+
+    def test_create_web_tools_wraps_tools_in_cache(self, config, tmp_path):
+        """Test that web tools share one cache when a cache dir is set."""
+        config.web_cache_dir = str(tmp_path / "web_cache")
+        factory = OllamaAgentFactory(config)
+
+        with (
+            patch("smolagents.DuckDuckGoSearchTool", FinalAnswerTool),
+            patch("smolagents.VisitWebpageTool", FinalAnswerTool),
+        ):
+            tools = factory.create_web_tools()
+
+        assert [type(tool) for tool in tools] == [CachedTool, CachedTool]
+        assert tools[0].cache is tools[1].cache
+        assert tools[0].ttl_seconds == config.web_cache_search_ttl_hours * 3600
+
+    def test_create_web_tools_without_cache(self, config):
+        """Test that web tools are used directly when caching is disabled."""
+        config.web_cache_dir = None
+        factory = OllamaAgentFactory(config)
+        search_tool, visit_tool = Mock(), Mock()
+
+        with (
+            patch("smolagents.DuckDuckGoSearchTool", return_value=search_tool),
+            patch("smolagents.VisitWebpageTool", return_value=visit_tool),
+        ):
+            assert factory.create_web_tools() == [search_tool, visit_tool]
+
+    def test_agent_tools_have_timeouts(self, factory):
+        """Test that tools passed to agents are wrapped with the call timeout."""
+        with patch("orca_agents.agents.factory.CodeAgent") as mock_code_agent:
+            factory.create_chat_agent(tools=[FinalAnswerTool()])
+
+        tools = mock_code_agent.call_args[1]["tools"]
+        assert isinstance(tools[0], TimeoutTool)
+        assert tools[0].timeout_seconds == factory.config.tool_timeout_seconds
+
+    def test_agent_tools_without_timeout(self, config):
+        """Test that tools are passed unchanged when timeouts are disabled."""
+        config.tool_timeout_seconds = None
+        factory = OllamaAgentFactory(config)
+        tool = FinalAnswerTool()
+
+        with patch("orca_agents.agents.factory.CodeAgent") as mock_code_agent:
+            factory.create_chat_agent(tools=[tool])
+
+        assert mock_code_agent.call_args[1]["tools"] == [tool]
+
+    def test_web_surfer_runs_step_tool_calls_in_parallel(self, config):
+        """Test that tool calls issued in one step run concurrently."""
+        config.web_cache_dir = None
+        factory = OllamaAgentFactory(config)
+        # Every visit waits for all three: sequential calls would break the barrier
+        barrier = threading.Barrier(3, timeout=5)
+        urls = [f"https://example.com/{i}" for i in range(3)]
+
+        class VisitTool(Tool):
+            name = "visit_webpage"
+            description = "Visits a webpage."
+            inputs = {"url": {"type": "string", "description": "The URL."}}
+            output_type = "string"
+
+            def forward(self, url: str) -> str:
+                barrier.wait()
+                return f"Content of {url}"
+
+        def tool_call(call_id, name, arguments):
+            return ChatMessageToolCall(
+                id=call_id,
+                type="function",
+                function=ChatMessageToolCallFunction(name=name, arguments=arguments),
+            )
+
+        model = Mock()
+        model.generate.side_effect = [
+            ChatMessage(
+                role="assistant",
+                content="",
+                tool_calls=[
+                    tool_call(f"call_{i}", "visit_webpage", {"url": url})
+                    for i, url in enumerate(urls)
+                ],
+            ),
+            ChatMessage(
+                role="assistant",
+                content="",
+                tool_calls=[tool_call("call_3", "final_answer", {"answer": "done"})],
+            ),
+        ]
+
+        with (
+            patch.object(factory, "create_web_tools", return_value=[VisitTool()]),
+            patch.object(factory, "create_model", return_value=model),
+        ):
+            agent = factory.create_web_surfer_agent()
+
+        assert agent.run("Summarize the pages") == "done"
+        observations = agent.memory.steps[1].observations
+        assert all(f"Content of {url}" in observations for url in urls)
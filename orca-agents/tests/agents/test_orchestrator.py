@@ -1,10 +1,12 @@
 """Tests for the MultiAgentOrchestrator."""
 
+import asyncio
+import time
 from datetime import UTC, datetime, timedelta
 from unittest.mock import Mock, patch
 
 import pytest
-from smolagents import ActionStep
+from smolagents import ActionStep, FinalAnswerStep
 
 from orca_agents.agents.orchestrator import MultiAgentOrchestrator
 from orca_agents.config import Config
@@ -71,6 +73,47 @@ class TestMultiAgentOrchestrator:
             # may not call it. Let's verify the manager agent is still created
             assert orchestrator._manager_agent is not None
 
+    def test_manager_agent_setup_without_failing_tools(self, config):
+        """Test that tools failing to build are left out of the manager agent."""
+        with patch(
+            "orca_agents.agents.orchestrator.OllamaAgentFactory"
+        ) as mock_factory:
+            factory = mock_factory.return_value
+            factory.create_profile_tools.side_effect = OSError("Read-only index")
+            factory.create_docs_tools.return_value = ["docs_tool"]
+
+            orchestrator = MultiAgentOrchestrator(config)
+
+            factory.create_manager_agent.assert_called_once_with(tools=["docs_tool"])
+            factory.create_chat_agent.assert_not_called()
+            assert (
+                orchestrator._manager_agent == factory.create_manager_agent.return_value
+            )
+
+    @pytest.mark.asyncio
+    async def test_chat_agents_without_failing_docs_tools(self, config):
+        """Test that chat agents run without docs tools that fail to build."""
+        with patch(
+            "orca_agents.agents.orchestrator.OllamaAgentFactory"
+        ) as mock_factory:
+            factory = mock_factory.return_value
+            factory.create_docs_tools.side_effect = OSError("Read-only index")
+            factory.create_chat_agent.return_value.run.return_value = "Chat response"
+
+            orchestrator = MultiAgentOrchestrator(config)
+            responses = [
+                await orchestrator.process_message(
+                    conversation_id=conversation_id,
+                    message="Hello",
+                    use_manager=False,
+                )
+                for conversation_id in ("conv-1", "conv-2")
+            ]
+
+            assert responses == ["Chat response", "Chat response"]
+            factory.create_chat_agent.assert_called_with(tools=[])
+            factory.create_docs_tools.assert_called_once()
+
     @pytest.mark.asyncio
     async def test_get_conversation_new(self, orchestrator):
         """Test getting a new conversation."""
@@ -213,6 +256,135 @@ class TestMultiAgentOrchestrator:
         assert "I encountered an error" in response
         assert "Processing failed" in response
 
+    @pytest.mark.asyncio
+    async def test_process_message_steps_reports_steps(self, orchestrator):
+        """Test that streamed agent steps are reported and the answer returned."""
+        steps = [
+            ActionStep(step_number=1, timing=Mock()),
+            ActionStep(step_number=2, timing=Mock()),
+            FinalAnswerStep(output="Final answer"),
+        ]
+        mock_manager = Mock()
+        mock_manager.run.return_value = iter(steps)
+        orchestrator._manager_agent = mock_manager
+        reported = []
+
+        response = await orchestrator.process_message_steps(
+            conversation_id="steps-conv",
+            message="Long question",
+            use_manager=True,
+            on_step=reported.append,
+        )
+
+        assert response == "Final answer"
+        assert reported == steps[:2]
+        mock_manager.run.assert_called_once_with(
+            "Long question", reset=True, stream=True
+        )
+        assert orchestrator._conversations["steps-conv"]["message_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_process_message_steps_cancellation(self, orchestrator):
+        """Test that the agent is interrupted once cancellation is requested."""
+        mock_manager = Mock()
+        mock_manager.run.return_value = iter(
+            [ActionStep(step_number=1, timing=Mock()), FinalAnswerStep(output="")]
+        )
+        orchestrator._manager_agent = mock_manager
+
+        await orchestrator.process_message_steps(
+            conversation_id="cancel-conv",
+            message="Long question",
+            should_cancel=lambda: True,
+        )
+
+        mock_manager.interrupt.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_process_message_steps_propagates_errors(self, orchestrator):
+        """Test that errors are raised instead of returned as text."""
+        mock_manager = Mock()
+        mock_manager.run.side_effect = Exception("Processing failed")
+        orchestrator._manager_agent = mock_manager
+
+        with pytest.raises(Exception, match="Processing failed"):
+            await orchestrator.process_message_steps(
+                conversation_id="error-conv", message="Test message"
+            )
+
+    @pytest.mark.asyncio
+    async def test_manager_agent_runs_are_serialized(self, orchestrator):
+        """Test that a job and a chat call never run the manager agent at once."""
+        active = []
+        overlaps = []
+
+        def run(message, reset, stream=False):
+            def work():
+                active.append(message)
+                overlaps.append(len(active) > 1)
+                time.sleep(0.05)
+                active.remove(message)
+
+            if not stream:
+                work()
+                return "Chat response"
+
+            def steps():
+                work()
+                yield ActionStep(step_number=1, timing=Mock())
+                work()
+                yield FinalAnswerStep(output="Job response")
+
+            return steps()
+
+        mock_manager = Mock()
+        mock_manager.run.side_effect = run
+        orchestrator._manager_agent = mock_manager
+
+        job_response, chat_response = await asyncio.gather(
+            orchestrator.process_message_steps(
+                conversation_id="job-conv", message="Job question"
+            ),
+            orchestrator.process_message(
+                conversation_id="chat-conv", message="Chat question"
+            ),
+        )
+
+        assert job_response == "Job response"
+        assert chat_response == "Chat response"
+        assert len(overlaps) == 3
+        assert not any(overlaps)
+
+    @pytest.mark.asyncio
+    async def test_conversation_agent_runs_are_serialized(self, orchestrator):
+        """Test that two jobs of one conversation never run its agent at once."""
+        active = []
+        overlaps = []
+
+        def run(message, reset, stream=False):
+            active.append(message)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.05)
+            active.remove(message)
+            yield FinalAnswerStep(output=f"Answer to {message}")
+
+        chat_agent = Mock()
+        chat_agent.run.side_effect = run
+        conversation = await orchestrator.get_conversation("chat-conv")
+        conversation["agent_instance"] = chat_agent
+
+        responses = await asyncio.gather(
+            *(
+                orchestrator.process_message_steps(
+                    conversation_id="chat-conv", message=message, use_manager=False
+                )
+                for message in ("First", "Second")
+            )
+        )
+
+        assert responses == ["Answer to First", "Answer to Second"]
+        assert overlaps == [False, False]
+
     @pytest.mark.asyncio
     async def test_clear_conversation_existing(self, orchestrator):
         """Test clearing an existing conversation."""
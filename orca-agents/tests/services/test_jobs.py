@@ -0,0 +1,198 @@
+"""Tests for the background job queue."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from smolagents import ActionStep
+from smolagents.memory import ToolCall
+from smolagents.monitoring import Timing
+
+from orca_agents.config import Config
+from orca_agents.services.jobs import Job, JobManager, JobStore, step_to_model
+
+
+def make_step(step_number: int, observations: str = "ok") -> ActionStep:
+    """Create a finished ActionStep with a single tool call."""
+    return ActionStep(
+        step_number=step_number,
+        timing=Timing(start_time=0.0, end_time=1.5),
+        tool_calls=[ToolCall(name="web_search", arguments={}, id="call_1")],
+        observations=observations,
+    )
+
+
+async def wait_finished(manager: JobManager, job_id: str) -> None:
+    """Wait until a job reaches a terminal status."""
+    for _ in range(200):
+        if manager.get(job_id).finished:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestJobManager:
+    """Test cases for the JobManager class."""
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Create a test configuration with a temporary job database."""
+        return Config(jobs_db_path=str(tmp_path / "jobs.db"))
+
+    @pytest.fixture
+    def orchestrator(self):
+        """Create a mock orchestrator that reports two steps."""
+        orchestrator = Mock()
+
+        async def process_message_steps(**kwargs):
+            kwargs["on_step"](make_step(1))
+            kwargs["on_step"](make_step(2))
+            return f"Answer to {kwargs['message']}"
+
+        orchestrator.process_message_steps = AsyncMock(
+            side_effect=process_message_steps
+        )
+        return orchestrator
+
+    @pytest.fixture
+    async def manager(self, config, orchestrator):
+        """Create a started job manager."""
+        manager = JobManager(config, orchestrator)
+        await manager.start()
+        yield manager
+        await manager.stop()
+
+    async def test_submit_and_complete(self, manager, orchestrator):
+        """Test that a submitted job runs and records steps and result."""
+        job = await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+        assert job.status == "queued"
+
+        await wait_finished(manager, job.job_id)
+
+        assert job.status == "succeeded"
+        assert job.result == "Answer to Hello"
+        assert [step.step_number for step in job.steps] == [1, 2]
+        assert job.steps[0].tool_calls == ["web_search"]
+        assert job.processing_time_ms is not None
+
+        call_kwargs = orchestrator.process_message_steps.call_args[1]
+        assert call_kwargs["conversation_id"] == "conv-1"
+        assert call_kwargs["use_manager"] is True
+
+    async def test_failed_job_records_error(self, manager, orchestrator):
+        """Test that agent errors mark the job as failed."""
+        orchestrator.process_message_steps.side_effect = Exception("Model down")
+
+        job = await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+        await wait_finished(manager, job.job_id)
+
+        assert job.status == "failed"
+        assert job.error == "Model down"
+
+    async def test_cancel_running_job(self, manager, orchestrator):
+        """Test that a running job is interrupted via should_cancel."""
+        started = asyncio.Event()
+
+        async def process_message_steps(**kwargs):
+            started.set()
+            while not kwargs["should_cancel"]():
+                await asyncio.sleep(0.01)
+            raise Exception("Agent interrupted.")
+
+        orchestrator.process_message_steps.side_effect = process_message_steps
+
+        job = await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+        await started.wait()
+
+        assert manager.cancel(job.job_id) is True
+        await wait_finished(manager, job.job_id)
+
+        assert job.status == "cancelled"
+        assert job.error is None
+
+    async def test_cancel_finished_job(self, manager):
+        """Test that finished jobs cannot be cancelled."""
+        job = await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+        await wait_finished(manager, job.job_id)
+
+        assert manager.cancel(job.job_id) is False
+        assert job.status == "succeeded"
+
+    async def test_stream_yields_steps_then_status(self, manager):
+        """Test that streaming replays steps and ends with the final status."""
+        job = await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+
+        events = [event async for event in manager.stream(job.job_id)]
+
+        assert [event["event"] for event in events] == ["step", "step", "status"]
+        assert events[-1]["data"]["status"] == "succeeded"
+
+    async def test_submit_requires_start(self, config, orchestrator):
+        """Test that submitting before start raises an error."""
+        manager = JobManager(config, orchestrator)
+
+        with pytest.raises(RuntimeError):
+            await manager.submit("Hello", "conv-1", "qwen3:8b", use_manager=True)
+
+    async def test_jobs_survive_restart(self, config, orchestrator):
+        """Test that finished jobs are restored and pending jobs re-run."""
+        manager = JobManager(config, orchestrator)
+        await manager.start()
+        done = await manager.submit("First", "conv-1", "qwen3:8b", use_manager=True)
+        await wait_finished(manager, done.job_id)
+        await manager.stop()
+
+        # Persist a job that was still running when the process stopped
+        store = JobStore(config.jobs_db_path)
+        store.save(
+            Job(
+                job_id="pending-job",
+                message="Second",
+                conversation_id="conv-1",
+                model="qwen3:8b",
+                use_manager=True,
+                reset_context=False,
+                status="running",
+            )
+        )
+        store.close()
+
+        restarted = JobManager(config, orchestrator)
+        await restarted.start()
+        try:
+            restored = restarted.get(done.job_id)
+            assert restored.status == "succeeded"
+            assert restored.result == "Answer to First"
+            assert len(restored.steps) == 2
+
+            await wait_finished(restarted, "pending-job")
+            assert restarted.get("pending-job").result == "Answer to Second"
+        finally:
+            await restarted.stop()
+
+    async def test_submit_prunes_expired_jobs(self, config, manager):
+        """Test that finished jobs past the retention period are dropped."""
+        old = await manager.submit("Old", "conv-1", "qwen3:8b", use_manager=True)
+        await wait_finished(manager, old.job_id)
+        old.updated_at -= timedelta(hours=config.job_retention_hours + 1)
+
+        new = await manager.submit("New", "conv-1", "qwen3:8b", use_manager=True)
+
+        assert manager.get(old.job_id) is None
+        assert manager.get(new.job_id) is new
+        store = JobStore(config.jobs_db_path)
+        try:
+            assert [job.job_id for job in store.load_all()] == [new.job_id]
+        finally:
+            store.close()
+
+
+def test_step_to_model_truncates_observations():
+    """Test that long observations are truncated in job progress."""
+    step = step_to_model(make_step(3, observations="x" * 5000))
+
+    assert step.step_number == 3
+    assert step.duration_seconds == 1.5
+    assert len(step.observations) < 5000
+    assert step.observations.endswith("...")
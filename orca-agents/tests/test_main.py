@@ -1,10 +1,13 @@
 """Tests for the main FastAPI application."""
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 from fastapi.testclient import TestClient
 
+from orca_agents.config import Config
 from orca_agents.main import app
+from orca_agents.services.jobs import Job, JobManager
 
 client = TestClient(app)
 
@@ -299,3 +302,86 @@ class TestEndpointSecurity:
         # Health endpoints should not accept POST
         response = client.post("/health")
         assert response.status_code == 405
+
+
+class TestJobEndpoints:
+    """Test the background job endpoints."""
+
+    @patch("orca_agents.main.job_manager.submit")
+    def test_submit_job(self, mock_submit):
+        """Test submitting a job returns 202 with the queued job."""
+        mock_submit.return_value = Job(
+            job_id="job-1",
+            message="Analyze this",
+            conversation_id="conv-1",
+            model="qwen3:8b",
+            use_manager=True,
+            reset_context=False,
+        )
+
+        response = client.post(
+            "/api/jobs", json={"message": "Analyze this", "use_manager": True}
+        )
+        assert response.status_code == 202
+
+        data = response.json()
+        assert data["job_id"] == "job-1"
+        assert data["status"] == "queued"
+        assert mock_submit.call_args[1]["use_manager"] is True
+
+    def test_job_not_found(self):
+        """Test that unknown jobs return 404 on every job endpoint."""
+        assert client.get("/api/jobs/missing").status_code == 404
+        assert client.get("/api/jobs/missing/result").status_code == 404
+        assert client.get("/api/jobs/missing/events").status_code == 404
+        assert client.delete("/api/jobs/missing").status_code == 404
+
+    def test_job_lifecycle(self, tmp_path):
+        """Test polling, streaming and result retrieval for a finished job."""
+        manager = JobManager(Config(jobs_db_path=str(tmp_path / "jobs.db")), Mock())
+        manager.orchestrator.process_message_steps = AsyncMock(
+            return_value="Long answer"
+        )
+
+        with (
+            patch("orca_agents.main.job_manager", manager),
+            TestClient(app) as job_client,
+        ):
+            job_id = job_client.post(
+                "/api/jobs", json={"message": "Long question"}
+            ).json()["job_id"]
+
+            events = job_client.get(f"/api/jobs/{job_id}/events").text
+            assert "event: status" in events
+            assert job_client.get(f"/api/jobs/{job_id}").json()["status"] == (
+                "succeeded"
+            )
+
+            result = job_client.get(f"/api/jobs/{job_id}/result")
+            assert result.status_code == 200
+            assert result.json()["message"] == "Long answer"
+
+            # Finished jobs can no longer be cancelled
+            assert job_client.delete(f"/api/jobs/{job_id}").status_code == 409
+
+    def test_job_result_not_ready(self, tmp_path):
+        """Test that results of unfinished jobs return 409."""
+        manager = JobManager(Config(jobs_db_path=str(tmp_path / "jobs.db")), Mock())
+
+        async def never_finish(**kwargs):
+            await asyncio.Event().wait()
+
+        manager.orchestrator.process_message_steps = never_finish
+
+        with (
+            patch("orca_agents.main.job_manager", manager),
+            TestClient(app) as job_client,
+        ):
+            job_id = job_client.post(
+                "/api/jobs", json={"message": "Long question"}
+            ).json()["job_id"]
+
+            assert job_client.get(f"/api/jobs/{job_id}/result").status_code == 409
+
+            response = job_client.delete(f"/api/jobs/{job_id}")
+            assert response.status_code == 200
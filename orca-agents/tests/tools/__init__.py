@@ -0,0 +1 @@
+"""Tests for the tools module."""
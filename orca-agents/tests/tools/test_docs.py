@@ -0,0 +1,197 @@
+"""Tests for the documentation search tool and its index."""
+
+import httpx
+import pytest
+
+from orca_agents.tools.docs import (
+    DocsIndex,
+    DocsSearchTool,
+    build_docs_index,
+    chunk_hints,
+    chunk_markdown,
+    split_text,
+)
+
+MARKDOWN = """# Calibration
+
+Calibrating your printer improves print quality.
+
+## Pressure advance
+
+![PA pattern](images/pa.png)
+Print the [pressure advance](https://example.com/pa) pattern and pick the
+sharpest corner.
+
+```
+# not a heading
+```
+
+## Flow rate
+
+Print the flow rate test and compare the top surfaces.
+"""
+
+HINTS = """# comment line
+[hint:Precise wall]
+text = Precise wall\\nDid you know that turning on <b>precise wall</b> improves precision?
+documentation_link = https://example.com/precise-wall
+
+[hint:Cut Tool]
+text = Cut Tool\\nDid you know that you can cut a model at any angle?
+"""
+
+
+class FakeEmbedder:
+    """Embedder mapping texts to two dimensions: pressure vs. everything else."""
+
+    model = "fake-embed"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, texts):
+        self.calls += 1
+        return [[1.0, 0.0] if "pressure" in t.lower() else [0.0, 1.0] for t in texts]
+
+
+@pytest.fixture
+def docs_paths(tmp_path):
+    """Create a documentation directory and a hints file."""
+    doc_dir = tmp_path / "doc"
+    (doc_dir / "calibration").mkdir(parents=True)
+    (doc_dir / "calibration" / "calibration.md").write_text(MARKDOWN)
+    hints = tmp_path / "hints.ini"
+    hints.write_text(HINTS)
+    return [doc_dir, hints]
+
+
+@pytest.fixture
+def index(docs_paths, tmp_path):
+    """Build and open a BM25-only index."""
+    index = DocsIndex.load_or_build(docs_paths, tmp_path / "docs.bin")
+    yield index
+    index.close()
+
+
+def test_chunk_markdown_sections():
+    """Test that markdown is split per section with heading paths as titles."""
+    chunks = chunk_markdown(MARKDOWN, "doc/calibration.md")
+    titles = [title for _, title, _ in chunks]
+
+    assert titles == [
+        "Calibration",
+        "Calibration > Pressure advance",
+        "Calibration > Flow rate",
+    ]
+    pressure_text = chunks[1][2]
+    assert "images/pa.png" not in pressure_text
+    assert "https://example.com" not in pressure_text
+    assert "# not a heading" in pressure_text
+
+
+def test_chunk_hints():
+    """Test that every hint becomes a chunk with its documentation link."""
+    chunks = chunk_hints(HINTS, "hints.ini")
+
+    assert chunks[0] == (
+        "hints.ini (https://example.com/precise-wall)",
+        "Precise wall",
+        "Did you know that turning on precise wall improves precision?",
+    )
+    assert chunks[1][0] == "hints.ini"
+
+
+def test_split_text_respects_paragraphs():
+    """Test that long sections are split on paragraph boundaries."""
+    text = "\n\n".join(["a" * 50] * 5)
+
+    chunks = split_text(text, max_chars=120)
+
+    assert len(chunks) == 3
+    assert all(len(chunk) <= 120 for chunk in chunks)
+
+
+def test_bm25_search(index):
+    """Test that BM25 ranks the most relevant section first."""
+    source, title, text = index.search("how to calibrate pressure advance")[0]
+
+    assert source == "doc/calibration/calibration.md"
+    assert title == "Calibration > Pressure advance"
+    assert "sharpest corner" in text
+
+
+def test_search_hints(index):
+    """Test that hints are searchable."""
+    results = index.search("precise wall")
+
+    assert results[0][1] == "Precise wall"
+
+
+def test_index_rebuilt_when_docs_change(docs_paths, tmp_path, index):
+    """Test that a stale index is rebuilt on load."""
+    (docs_paths[0] / "new.md").write_text("# Ironing\n\nIroning smooths top layers.")
+
+    rebuilt = DocsIndex.load_or_build(docs_paths, tmp_path / "docs.bin")
+    try:
+        assert len(rebuilt) == len(index) + 1
+        assert rebuilt.search("ironing")[0][1] == "Ironing"
+    finally:
+        rebuilt.close()
+
+
+def test_hybrid_search_with_embeddings(docs_paths, tmp_path):
+    """Test that embedding rankings are fused with BM25 rankings."""
+    embedder = FakeEmbedder()
+    build_docs_index(docs_paths, tmp_path / "docs.bin", embedder)
+
+    index = DocsIndex(tmp_path / "docs.bin", embedder)
+    try:
+        # No keyword overlap, only the embedding ranking finds the section
+        results = index.search("pressure")
+        assert results[0][1] == "Calibration > Pressure advance"
+        assert embedder.calls == 2
+    finally:
+        index.close()
+
+
+def test_hybrid_search_falls_back_to_bm25(docs_paths, tmp_path):
+    """Test that failing query embeddings fall back to BM25."""
+    embedder = FakeEmbedder()
+    build_docs_index(docs_paths, tmp_path / "docs.bin", embedder)
+
+    def fail(texts):
+        raise httpx.ConnectError("Ollama down")
+
+    embedder.embed = fail
+    index = DocsIndex(tmp_path / "docs.bin", embedder)
+    try:
+        assert index.search("flow rate")[0][1] == "Calibration > Flow rate"
+    finally:
+        index.close()
+
+
+def test_embedding_model_change_rebuilds_index(docs_paths, tmp_path, index):
+    """Test that switching the embedding model invalidates the index."""
+    rebuilt = DocsIndex.load_or_build(docs_paths, tmp_path / "docs.bin", FakeEmbedder())
+    try:
+        assert rebuilt.fingerprint.startswith("fake-embed:")
+        assert rebuilt.fingerprint != index.fingerprint
+    finally:
+        rebuilt.close()
+
+
+class TestDocsSearchTool:
+    """Test cases for the DocsSearchTool class."""
+
+    def test_search_returns_excerpts(self, index):
+        """Test that the tool returns numbered excerpts with sources."""
+        output = DocsSearchTool(index).forward("flow rate test")
+
+        assert output.startswith(
+            "[1] Calibration > Flow rate (doc/calibration/calibration.md)"
+        )
+
+    def test_no_match_raises_value_error(self, index):
+        """Test that queries without matches raise a descriptive ValueError."""
+        with pytest.raises(ValueError, match="No documentation matches"):
+            DocsSearchTool(index).forward("xyzzy")
@@ -0,0 +1,201 @@
+"""Tests for the profile lookup tool and its index."""
+
+import json
+import os
+
+import pytest
+
+from orca_agents.tools.profiles import (
+    ProfileIndex,
+    ProfileLookupTool,
+    build_profile_index,
+    tokenize,
+)
+
+
+def write_profile(profiles_dir, vendor, profile_type, data):
+    """Write a profile JSON file into a vendor directory."""
+    path = profiles_dir / vendor / profile_type / f"{data['name']}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def profiles_dir(tmp_path):
+    """Create a small profile tree with inheritance across vendors."""
+    profiles_dir = tmp_path / "profiles"
+    write_profile(
+        profiles_dir,
+        "OrcaFilamentLibrary",
+        "filament",
+        {
+            "type": "filament",
+            "name": "fdm_filament_pc",
+            "nozzle_temperature": ["270"],
+            "hot_plate_temp": ["110"],
+        },
+    )
+    write_profile(
+        profiles_dir,
+        "BBL",
+        "filament",
+        {
+            "name": "Bambu PC @base",
+            "inherits": "fdm_filament_pc",
+            "filament_id": "GFC00",
+        },
+    )
+    write_profile(
+        profiles_dir,
+        "BBL",
+        "filament",
+        {
+            "type": "filament",
+            "name": "Bambu PC @BBL A1 0.2 nozzle",
+            "inherits": "Bambu PC @base",
+            "instantiation": "true",
+            "nozzle_temperature": ["260"],
+        },
+    )
+    write_profile(
+        profiles_dir,
+        "BBL",
+        "machine",
+        {
+            "type": "machine",
+            "name": "Bambu Lab A1 0.2 nozzle",
+            "instantiation": "true",
+            "nozzle_diameter": ["0.2"],
+        },
+    )
+    return profiles_dir
+
+
+@pytest.fixture
+def index(profiles_dir, tmp_path):
+    """Build and open an index over the test profiles."""
+    index = ProfileIndex.load_or_build(profiles_dir, tmp_path / "index.bin")
+    yield index
+    index.close()
+
+
+def test_tokenize_keeps_decimal_numbers():
+    """Test that nozzle sizes stay single tokens."""
+    assert tokenize("Bambu PC @BBL A1 0.2 nozzle") == [
+        "bambu",
+        "pc",
+        "bbl",
+        "a1",
+        "0.2",
+        "nozzle",
+    ]
+
+
+def test_index_resolves_inheritance(index):
+    """Test that settings are inherited across the vendor and the library."""
+    profile = index.get("Bambu PC @BBL A1 0.2 nozzle")
+
+    assert profile["nozzle_temperature"] == ["260"]
+    assert profile["hot_plate_temp"] == ["110"]
+    assert profile["filament_id"] == "GFC00"
+    assert len(index) == 4
+
+
+def test_search_ranks_instantiable_best_match(index):
+    """Test that the most specific instantiable profile ranks first."""
+    results = index.search("nozzle temp for Bambu PC on A1 0.2")
+
+    assert results[0] == ("Bambu PC @BBL A1 0.2 nozzle", "BBL", "filament")
+    assert index.search("A1 0.2", profile_type="machine") == [
+        ("Bambu Lab A1 0.2 nozzle", "BBL", "machine")
+    ]
+
+
+def test_index_rebuilt_when_profiles_change(profiles_dir, tmp_path, index):
+    """Test that a stale index is rebuilt on load."""
+    path = write_profile(
+        profiles_dir,
+        "BBL",
+        "machine",
+        {
+            "type": "machine",
+            "name": "Bambu Lab A1 0.2 nozzle",
+            "nozzle_diameter": ["0.4"],
+        },
+    )
+    os.utime(path, ns=(0, 0))
+
+    rebuilt = ProfileIndex.load_or_build(profiles_dir, tmp_path / "index.bin")
+    try:
+        assert rebuilt.fingerprint != index.fingerprint
+        assert rebuilt.get("Bambu Lab A1 0.2 nozzle")["nozzle_diameter"] == ["0.4"]
+    finally:
+        rebuilt.close()
+
+
+def test_index_rejects_foreign_file(tmp_path):
+    """Test that opening a non-index file raises ValueError."""
+    path = tmp_path / "index.bin"
+    path.write_bytes(b"x" * 64)
+
+    with pytest.raises(ValueError):
+        ProfileIndex(path)
+
+
+def test_inheritance_cycle_does_not_recurse(tmp_path):
+    """Test that inheritance cycles end the chain instead of looping."""
+    profiles_dir = tmp_path / "profiles"
+    write_profile(
+        profiles_dir, "Loop", "process", {"name": "a", "inherits": "b", "x": "1"}
+    )
+    write_profile(
+        profiles_dir, "Loop", "process", {"name": "b", "inherits": "a", "y": "2"}
+    )
+    build_profile_index(profiles_dir, tmp_path / "index.bin")
+
+    index = ProfileIndex(tmp_path / "index.bin")
+    try:
+        assert index.get("a") == {
+            "name": "a",
+            "inherits": "b",
+            "x": "1",
+            "y": "2",
+            "type": "process",
+        }
+        assert index.get("b")["y"] == "2"
+    finally:
+        index.close()
+
+
+class TestProfileLookupTool:
+    """Test cases for the ProfileLookupTool class."""
+
+    def test_lookup_setting(self, index):
+        """Test looking up a setting of the best matching profile."""
+        output = ProfileLookupTool(index).forward("Bambu PC A1 0.2", "nozzle temp")
+
+        assert "Best match: Bambu PC @BBL A1 0.2 nozzle" in output
+        assert 'nozzle_temperature: ["260"]' in output
+
+    def test_lookup_without_setting_lists_matches(self, index):
+        """Test that omitting the setting only lists matching profiles."""
+        output = ProfileLookupTool(index).forward("Bambu A1 0.2")
+
+        assert "Other matches:" in output
+        assert "Settings:" not in output
+
+    def test_no_match_raises_value_error(self, index):
+        """Test that unknown profiles raise a descriptive ValueError."""
+        with pytest.raises(ValueError, match="No profile matches"):
+            ProfileLookupTool(index).forward("Creality Ender")
+
+    def test_unknown_setting_raises_value_error(self, index):
+        """Test that unknown settings raise a descriptive ValueError."""
+        with pytest.raises(ValueError, match="has no setting"):
+            ProfileLookupTool(index).forward("Bambu PC A1", "retraction_length")
+
+    def test_invalid_profile_type_raises_value_error(self, index):
+        """Test that invalid profile types raise a descriptive ValueError."""
+        with pytest.raises(ValueError, match="Unknown profile_type"):
+            ProfileLookupTool(index).forward("Bambu PC", profile_type="printer")
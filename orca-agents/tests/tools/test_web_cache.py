@@ -0,0 +1,177 @@
+"""Tests for the web tool result cache."""
+
+import random
+
+import pytest
+from smolagents import Tool
+
+from orca_agents.tools import web_cache
+from orca_agents.tools.web_cache import (
+    CachedTool,
+    WebCache,
+    normalize_query,
+    normalize_url,
+)
+
+
+class FakeSearchTool(Tool):
+    """Search tool returning canned results and counting calls."""
+
+    name = "web_search"
+    description = "Searches the web."
+    inputs = {"query": {"type": "string", "description": "The search query."}}
+    output_type = "string"
+
+    def __init__(self, results: dict[str, str] | None = None):
+        super().__init__()
+        self.results = results or {}
+        self.calls = []
+
+    def forward(self, query: str) -> str:
+        self.calls.append(query)
+        return self.results.get(query, f"Results for {query}")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a web cache with a generous size cap."""
+    cache = WebCache(tmp_path / "web_cache", max_bytes=1024 * 1024)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's clock with a controllable one."""
+    now = [1000.0]
+    monkeypatch.setattr(web_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_normalize_query():
+    """Test that case and whitespace differences are normalized."""
+    assert normalize_query("  Bambu  PLA\tTemperature ") == "bambu pla temperature"
+
+
+def test_normalize_url():
+    """Test that fragments are stripped from URLs."""
+    assert normalize_url(" https://example.com/page#section ") == (
+        "https://example.com/page"
+    )
+
+
+def test_cache_is_lazy(tmp_path):
+    """Test that no files are created until the cache is used."""
+    WebCache(tmp_path / "web_cache", max_bytes=1024)
+
+    assert not (tmp_path / "web_cache").exists()
+
+
+def test_identical_content_is_stored_once(cache):
+    """Test that entries with the same content share one blob."""
+    cache.put(cache.make_key("visit", {"url": "a"}), "visit", "same page")
+    cache.put(cache.make_key("visit", {"url": "b"}), "visit", "same page")
+
+    blobs = list((cache.cache_dir / "blobs").rglob("*"))
+    assert len([blob for blob in blobs if blob.is_file()]) == 1
+    assert cache.get(cache.make_key("visit", {"url": "b"}), 60) == "same page"
+
+
+def test_lru_eviction(tmp_path, clock):
+    """Test that the least recently used entries are evicted over the cap."""
+    cache = WebCache(tmp_path / "web_cache", max_bytes=2500)
+    # Random content so that zlib cannot shrink each blob below 1000 bytes
+    pages = {name: random.Random(name).randbytes(1000).hex() for name in "abc"}
+    try:
+        for name in "ab":
+            clock[0] += 1
+            cache.put(name, "visit", pages[name])
+        clock[0] += 1
+        assert cache.get("a", 60) is not None
+
+        clock[0] += 1
+        cache.put("c", "visit", pages["c"])
+
+        assert cache.get("b", 60) is None
+        assert cache.get("a", 60) == pages["a"]
+        assert cache.get("c", 60) == pages["c"]
+        assert cache.size() <= 2500
+    finally:
+        cache.close()
+
+
+class TestCachedTool:
+    """Test cases for the CachedTool class."""
+
+    def test_wraps_tool_interface(self, cache):
+        """Test that the wrapper exposes the wrapped tool's interface."""
+        tool = CachedTool(FakeSearchTool(), cache, ttl_seconds=60)
+
+        assert tool.name == "web_search"
+        assert tool.inputs == FakeSearchTool.inputs
+        assert tool.output_type == "string"
+
+    def test_repeated_queries_are_memoized(self, cache):
+        """Test that equivalent queries call the wrapped tool once."""
+        inner = FakeSearchTool()
+        tool = CachedTool(inner, cache, ttl_seconds=60, normalize=normalize_query)
+
+        first = tool(query="PLA temperature")
+        second = tool("pla   TEMPERATURE")
+
+        assert first == second == "Results for PLA temperature"
+        assert inner.calls == ["PLA temperature"]
+
+    def test_cache_is_persistent(self, tmp_path):
+        """Test that results survive reopening the cache."""
+        cache = WebCache(tmp_path / "web_cache", max_bytes=1024 * 1024)
+        CachedTool(FakeSearchTool(), cache, ttl_seconds=60)(query="PETG")
+        cache.close()
+
+        reopened = WebCache(tmp_path / "web_cache", max_bytes=1024 * 1024)
+        inner = FakeSearchTool()
+        try:
+            assert CachedTool(inner, reopened, 60)(query="PETG") == "Results for PETG"
+            assert inner.calls == []
+        finally:
+            reopened.close()
+
+    def test_expired_results_are_refetched(self, cache, clock):
+        """Test that results older than the TTL are fetched again."""
+        inner = FakeSearchTool()
+        tool = CachedTool(inner, cache, ttl_seconds=60)
+
+        tool(query="ABS")
+        clock[0] += 61
+        tool(query="ABS")
+
+        assert inner.calls == ["ABS", "ABS"]
+
+    def test_error_results_are_not_cached(self, cache):
+        """Test that fetch errors returned as text are not cached."""
+        inner = FakeSearchTool({"down": "Error fetching the webpage: 503"})
+        tool = CachedTool(inner, cache, ttl_seconds=60)
+
+        tool(query="down")
+        tool(query="down")
+
+        assert inner.calls == ["down", "down"]
+
+    def test_offline_mode_replays_expired_results(self, tmp_path, clock):
+        """Test that offline mode serves cached results regardless of age."""
+        cache_dir = tmp_path / "web_cache"
+        online = WebCache(cache_dir, max_bytes=1024 * 1024)
+        CachedTool(FakeSearchTool(), online, ttl_seconds=60)(query="TPU")
+        online.close()
+        clock[0] += 3600
+
+        offline = WebCache(cache_dir, max_bytes=1024 * 1024, offline=True)
+        inner = FakeSearchTool()
+        tool = CachedTool(inner, offline, ttl_seconds=60)
+        try:
+            assert tool(query="TPU") == "Results for TPU"
+            with pytest.raises(ValueError, match="offline mode"):
+                tool(query="Nylon")
+            assert inner.calls == []
+        finally:
+            offline.close()
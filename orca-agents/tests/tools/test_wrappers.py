@@ -0,0 +1,65 @@
+"""Tests for the tool wrappers."""
+
+import threading
+
+import pytest
+from smolagents import Tool
+
+from orca_agents.tools.wrappers import TimeoutTool
+
+
+class EchoTool(Tool):
+    """Tool echoing its input, optionally after waiting for an event."""
+
+    name = "echo"
+    description = "Echoes the text."
+    inputs = {"text": {"type": "string", "description": "Text to echo."}}
+    output_type = "string"
+
+    def __init__(self, release: threading.Event | None = None):
+        super().__init__()
+        self.release = release
+
+    def forward(self, text: str) -> str:
+        if self.release is not None:
+            self.release.wait()
+        if text == "fail":
+            raise RuntimeError("Echo failed")
+        return text
+
+
+class TestTimeoutTool:
+    """Test cases for the TimeoutTool class."""
+
+    def test_wraps_tool_interface(self):
+        """Test that the wrapper exposes the wrapped tool's interface."""
+        tool = TimeoutTool(EchoTool(), timeout_seconds=1)
+
+        assert tool.name == "echo"
+        assert tool.inputs == EchoTool.inputs
+        assert tool.output_type == "string"
+
+    def test_returns_result(self):
+        """Test that results of fast calls are returned."""
+        tool = TimeoutTool(EchoTool(), timeout_seconds=1)
+
+        assert tool("hello") == "hello"
+        assert tool(text="world") == "world"
+
+    def test_propagates_errors(self):
+        """Test that errors of the wrapped tool are raised unchanged."""
+        tool = TimeoutTool(EchoTool(), timeout_seconds=1)
+
+        with pytest.raises(RuntimeError, match="Echo failed"):
+            tool(text="fail")
+
+    def test_slow_call_times_out(self):
+        """Test that calls running past the timeout raise TimeoutError."""
+        release = threading.Event()
+        tool = TimeoutTool(EchoTool(release), timeout_seconds=0.05)
+
+        try:
+            with pytest.raises(TimeoutError, match="did not finish within 0.05"):
+                tool(text="slow")
+        finally:
+            release.set()
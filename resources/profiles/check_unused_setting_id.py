@@ -1,54 +1,186 @@
 import os
+import sys
 import json
+import time
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-setting_id_used=set()
-setting_id_all=set()
-root_dir=os.path.dirname(os.path.abspath(__file__))
+PROFILES_DIR = os.path.dirname(os.path.abspath(__file__))
+# Lists of <vendor>.json whose profiles are installed, and so whose setting_id is in use
+INDEX_LISTS = ('machine_model_list', 'machine_list', 'filament_list', 'process_list')
 
 
-def loadBlackList():
-    with open(root_dir+'/blacklist.json') as file:
-        data=json.load(file)
+def vendor_names(profiles_dir):
+    """
+    Vendors of a profiles directory: <vendor>.json next to a <vendor> directory.
+    """
+    return sorted(
+        entry[:-5] for entry in os.listdir(profiles_dir)
+        if entry.endswith('.json') and os.path.isdir(os.path.join(profiles_dir, entry[:-5]))
+    )
 
-    for key,val in data.items():
-        for item in val:
-            setting_id_used.add(item)
-            setting_id_all.add(item)
 
-def traverse_files(path):
-    for file in os.listdir(path):
-        file_path = os.path.join(path, file)
-        if os.path.isdir(file_path):
-            traverse_files(file_path)  # 递归遍历子文件夹
-        elif file_path.endswith('.json'):
-            # 解析 JSON 文件并提取 setting_id 的值
-            with open(file_path) as f:
-                data = json.load(f)
-                if 'setting_id' in data:
-                    setting_id_all.add(data['setting_id'])
+def load_blacklist(profiles_dir):
+    """
+    setting_ids of blacklist.json, which are reported as used even when no
+    vendor index lists them.
 
-def getUsedId(brand):
-    with open(root_dir+'/'+brand+'.json')as file:
-        data=json.load(file)
+    Returns:
+        set: The blacklisted setting_ids, empty if there is no blacklist.json
+    """
+    try:
+        with open(os.path.join(profiles_dir, 'blacklist.json'), 'r', encoding='UTF-8') as fp:
+            data = json.load(fp)
+    except FileNotFoundError:
+        return set()
+    return {setting_id for ids in data.values() for setting_id in ids}
 
-    key_list=["machine_model_list","machine_list","filament_list","process_list"]
 
-    for key in key_list:
-          for elem in data[key]:
-            path=elem['sub_path']
-            with open(root_dir+'/'+brand+'/'+path) as file:
-                file_data=json.load(file)
-            if 'setting_id' in file_data:
-                setting_id_used.add(file_data['setting_id'])
+def _setting_id(path):
+    with open(path, 'rb') as fp:
+        content = fp.read()
+    # Most files without a setting_id do not need to be parsed at all
+    if b'"setting_id"' not in content:
+        return None
+    setting_id = json.loads(content).get('setting_id')
+    return setting_id if isinstance(setting_id, str) and setting_id else None
 
 
-def getTotalId(brand):
-    traverse_files(root_dir+'/'+brand)
+def scan_vendor(profiles_dir, vendor):
+    """
+    Collect the setting_ids of one vendor.
 
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendor (str): Vendor name
 
-loadBlackList()
-getUsedId('BBL')
-getTotalId('BBL')
+    Returns:
+        dict: 'ids' ({setting_id: [relative path, ...]}, paths sorted),
+              'used' (sorted relative paths listed in <vendor>.json) and
+              'errors' ([(relative path, message), ...])
+    """
+    errors = []
+    vendor_dir = os.path.join(profiles_dir, vendor)
+    with open(os.path.join(profiles_dir, vendor + '.json'), 'r', encoding='UTF-8') as fp:
+        index = json.load(fp)
+    used = set()
+    for key in INDEX_LISTS:
+        for item in index.get(key, []):
+            path = os.path.normpath(os.path.join(vendor, item['sub_path']))
+            if not os.path.isfile(os.path.join(profiles_dir, path)):
+                errors.append((path.replace(os.sep, '/'), f"Listed in {vendor}.json {key} but not found"))
+            used.add(path.replace(os.sep, '/'))
 
-print("unused setting_id :")
-print(setting_id_all.difference(setting_id_used))
+    ids = defaultdict(list)
+    for root, dirs, files in os.walk(vendor_dir):
+        dirs.sort()
+        for file in sorted(files):
+            if not file.endswith('.json'):
+                continue
+            path = os.path.join(root, file)
+            relative_path = os.path.relpath(path, profiles_dir).replace(os.sep, '/')
+            try:
+                setting_id = _setting_id(path)
+            except (OSError, ValueError) as e:
+                errors.append((relative_path, str(e)))
+                continue
+            if setting_id is not None:
+                ids[setting_id].append(relative_path)
+    return {'ids': dict(ids), 'used': sorted(used), 'errors': errors}
+
+
+def _scan_vendor_args(args):
+    return scan_vendor(*args)
+
+
+def audit(profiles_dir, vendors, jobs=0):
+    """
+    Find unused, duplicate and colliding setting_ids in one parallel pass.
+
+    A setting_id is unused when none of the files carrying it is listed in
+    the vendor's index and it is not blacklisted. It is a duplicate when
+    several files of a vendor carry it, and a collision when several vendors
+    use it.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendors (list): Vendor names
+        jobs (int): Number of worker processes, 0 to use all cores
+
+    Returns:
+        dict: 'unused', 'duplicates', 'collisions' and 'errors' lists, sorted
+    """
+    blacklist = load_blacklist(profiles_dir)
+    with ProcessPoolExecutor(jobs or None) as pool:
+        scans = list(pool.map(_scan_vendor_args, [(profiles_dir, vendor) for vendor in vendors], chunksize=4))
+
+    report = {'unused': [], 'duplicates': [], 'collisions': [], 'errors': []}
+    vendors_by_id = defaultdict(list)
+    for vendor, scan in zip(vendors, scans):
+        used = set(scan['used'])
+        for setting_id, paths in sorted(scan['ids'].items()):
+            vendors_by_id[setting_id].append(vendor)
+            if setting_id not in blacklist and used.isdisjoint(paths):
+                report['unused'].append({'vendor': vendor, 'setting_id': setting_id, 'paths': paths})
+            if len(paths) > 1:
+                report['duplicates'].append({'vendor': vendor, 'setting_id': setting_id, 'paths': paths})
+        report['errors'].extend({'vendor': vendor, 'path': path, 'message': message}
+                                for path, message in scan['errors'])
+    for setting_id, id_vendors in sorted(vendors_by_id.items()):
+        if len(id_vendors) > 1:
+            report['collisions'].append({'setting_id': setting_id, 'vendors': id_vendors})
+    return report
+
+
+def print_report(report):
+    for item in report['errors']:
+        print(f"Error: {item['path']}: {item['message']}")
+    print(f"Unused setting_id: {len(report['unused'])}")
+    for item in report['unused']:
+        print(f"  {item['vendor']}: {item['setting_id']}: {', '.join(item['paths'])}")
+    print(f"Duplicate setting_id: {len(report['duplicates'])}")
+    for item in report['duplicates']:
+        print(f"  {item['vendor']}: {item['setting_id']}: {len(item['paths'])} files: {', '.join(item['paths'])}")
+    print(f"setting_id used by several vendors: {len(report['collisions'])}")
+    for item in report['collisions']:
+        print(f"  {item['setting_id']}: {', '.join(item['vendors'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Find unused, duplicate and colliding setting_ids of all vendor profiles'
+    )
+    parser.add_argument('-v', '--vendor', action='append', help='Only audit this vendor (repeatable, default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes, 0 to use all cores (default: 0)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--strict', action='store_true',
+                        help='Exit with an error on any finding, not only on unused setting_ids and errors')
+    args = parser.parse_args()
+
+    vendors = vendor_names(PROFILES_DIR)
+    if args.vendor:
+        unknown = sorted(set(args.vendor) - set(vendors))
+        if unknown:
+            print(f"Error: Unknown vendor(s): {', '.join(unknown)}")
+            sys.exit(-1)
+        vendors = [vendor for vendor in vendors if vendor in args.vendor]
+
+    start = time.perf_counter()
+    report = audit(PROFILES_DIR, vendors, args.jobs)
+    if args.json:
+        print(json.dumps(report, indent=4, ensure_ascii=False))
+    else:
+        print_report(report)
+    print(f"Audited {len(vendors)} vendor(s) in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    failed = report['unused'] or report['errors']
+    if args.strict:
+        failed = failed or report['duplicates'] or report['collisions']
+    if failed:
+        sys.exit(-1)
+
+
+if __name__ == '__main__':
+    main()
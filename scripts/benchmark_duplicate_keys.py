@@ -0,0 +1,71 @@
+import os
+import json
+import time
+import argparse
+
+from orca_extra_profile_check import no_duplicates_object_pairs_hook
+from orca_profile_corpus import ProfileCorpus, find_duplicate_keys, load_profile
+
+
+def record_duplicates_per_key(text):
+    # The per-key hook ProfileFile used before load_profile, kept as a reference
+    duplicate_keys = []
+
+    def record_duplicates(pairs):
+        obj = {}
+        for key, value in pairs:
+            if key in obj:
+                duplicate_keys.append(key)
+            obj[key] = value
+        return obj
+
+    return json.loads(text, object_pairs_hook=record_duplicates), duplicate_keys
+
+
+def strict_hook(text):
+    # What every check did before the corpus: a strict parse raising on duplicates
+    try:
+        return json.loads(text, object_pairs_hook=no_duplicates_object_pairs_hook)
+    except ValueError:
+        return None
+
+
+def measure(parse, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            parse(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark duplicate key detection on all profiles')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per parser, the best is reported (default: 3)')
+    args = parser.parse_args()
+
+    profiles_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+    corpus = ProfileCorpus(profiles_dir)
+    texts = []
+    for vendor in corpus.vendor_names():
+        for path in corpus.paths(vendor):
+            with open(path, 'r', encoding='UTF-8') as fp:
+                texts.append(fp.read())
+    with_duplicates = [text for text in texts if load_profile(text)[1]]
+
+    # Files are read up front, only parsing is timed
+    baseline = measure(json.loads, texts, args.repeat)
+    print(f"{len(texts)} profiles, {len(with_duplicates)} with duplicate keys")
+    print(f"{'json.loads without hook':<32} {baseline * 1000:8.1f} ms")
+    for label, parse in (
+        ('strict hook (check script)', strict_hook),
+        ('per-key recording hook', record_duplicates_per_key),
+        ('load_profile', load_profile),
+    ):
+        elapsed = measure(parse, texts, args.repeat)
+        print(f"{label:<32} {elapsed * 1000:8.1f} ms, "
+              f"duplicate detection {(elapsed - baseline) * 1000:7.1f} ms over json.loads")
+    elapsed = measure(find_duplicate_keys, with_duplicates, args.repeat)
+    print(f"{'locating duplicates':<32} {elapsed * 1000:8.1f} ms for the {len(with_duplicates)} files with duplicates")
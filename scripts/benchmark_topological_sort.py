@@ -0,0 +1,103 @@
+import time
+import random
+import argparse
+from collections import defaultdict
+
+from orca_filament_lib import topological_sort
+
+
+def legacy_topological_sort(filaments):
+    # The list based sort topological_sort replaced, kept as the reference for
+    # the output order and the timings
+    graph = defaultdict(list)
+    in_degree = defaultdict(int)
+    name_to_filament = {f['name']: f for f in filaments}
+    all_names = set(name_to_filament.keys())
+
+    processed_files = set()
+    for filament in filaments:
+        if 'inherits' in filament:
+            parent = filament['inherits']
+            child = filament['name']
+            if parent in all_names:
+                graph[parent].append(child)
+                in_degree[child] += 1
+                if parent not in in_degree:
+                    in_degree[parent] = 0
+                processed_files.add(child)
+                processed_files.add(parent)
+
+    queue = sorted([name for name, degree in in_degree.items() if degree == 0])
+    result = []
+    while queue:
+        current = queue.pop(0)
+        result.append(name_to_filament[current])
+        processed_files.add(current)
+        for child in sorted(graph[current]):
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                queue.append(child)
+
+    for name in sorted(all_names - processed_files):
+        result.append(name_to_filament[name])
+
+    return result
+
+
+def synthetic_library(count, seed=0):
+    """
+    Generate a filament library shaped like the real ones: a few base profiles
+    (@base), many printer specific children and some standalone profiles.
+
+    Parameters:
+        count (int): Number of profiles
+        seed (int): Random seed, the same seed gives the same library
+
+    Returns:
+        list: Dicts with 'name', 'sub_path' and optionally 'inherits'
+    """
+    rng = random.Random(seed)
+    filaments = []
+    for i in range(count):
+        name = f"Generic {rng.choice(['PLA', 'PETG', 'ABS', 'TPU', 'ASA'])} {i:06d}"
+        filament = {"name": name, "sub_path": f"filament/{name}.json"}
+        roll = rng.random()
+        if filaments and roll < 0.85:
+            # Prefer recent profiles as parents to get chains a few levels deep
+            parent = filaments[max(0, len(filaments) - 1 - int(rng.expovariate(0.01)))]
+            filament['inherits'] = parent['name']
+        elif roll < 0.9:
+            filament['inherits'] = "fdm_filament_common"
+        filaments.append(filament)
+    rng.shuffle(filaments)
+    return filaments
+
+
+def measure(sort, filaments, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = sort(filaments)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark topological_sort on synthetic filament libraries')
+    parser.add_argument('-n', '--profiles', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='Library sizes to benchmark (default: 1000 10000 50000)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per size, the best is reported (default: 3)')
+    parser.add_argument('--skip-legacy', action='store_true', help='Do not time the previous list based sort')
+    args = parser.parse_args()
+
+    for count in args.profiles:
+        filaments = synthetic_library(count)
+        elapsed, (result, cycles, orphans) = measure(topological_sort, filaments, args.repeat)
+        line = f"{count:>7} profiles: {elapsed * 1000:9.1f} ms"
+        if not args.skip_legacy:
+            legacy_elapsed, legacy_result = measure(legacy_topological_sort, filaments, args.repeat)
+            if [f['name'] for f in legacy_result] != [f['name'] for f in result]:
+                raise SystemExit(f"Order differs from the legacy sort for {count} profiles")
+            line += f", legacy {legacy_elapsed * 1000:9.1f} ms ({legacy_elapsed / elapsed:.1f}x)"
+        print(line + f", {len(orphans)} orphaned")
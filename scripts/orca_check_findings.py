@@ -0,0 +1,146 @@
+import json
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from urllib.parse import quote
+
+REPORT_VERSION = 1
+TOOL_NAME = "orca_extra_profile_check"
+# Finding paths are relative to this directory of the repository
+PROFILES_ROOT = "resources/profiles"
+
+
+class Finding(namedtuple("Finding", "vendor path line check level message")):
+    """
+    One error or warning reported by a profile check.
+
+    Findings sort by vendor, file, line, check, level and message, which is the
+    order of every report.
+
+    Attributes:
+        vendor (str): Checked vendor
+        path (str): File the finding is about, relative to resources/profiles
+            with forward slashes, or '' if it is not about one file
+        line (int): Line in that file, 0 if unknown
+        check (str): Name of the check function
+        level (str): 'error' or 'warning'
+        message (str): Message, without color codes
+    """
+
+    __slots__ = ()
+
+
+def deduplicate(findings):
+    """
+    Sorted distinct findings with the number of times each was reported.
+
+    Returns:
+        list: (Finding, count)
+    """
+    return sorted(Counter(findings).items())
+
+
+def write_json(findings, summary, fp):
+    """
+    Write findings as one JSON document.
+
+    Parameters:
+        findings (iterable): Finding objects
+        summary (dict): Run summary (checked vendors, error and warning counts)
+        fp (file): Text file to write to
+    """
+    report = {
+        'version': REPORT_VERSION,
+        'summary': summary,
+        'findings': [
+            {**finding._asdict(), 'count': count}
+            for finding, count in deduplicate(findings)
+        ],
+    }
+    fp.write(json.dumps(report, indent=4, ensure_ascii=False) + "\n")
+
+
+def write_sarif(findings, summary, fp, tool=TOOL_NAME):
+    """
+    Write findings as a SARIF 2.1.0 log, e.g. for GitHub code scanning.
+
+    Every check is a rule; findings about a file carry its location relative
+    to the repository root (%SRCROOT%). `tool` names the reporting script.
+    """
+    distinct = deduplicate(findings)
+    results = []
+    for finding, count in distinct:
+        result = {
+            'ruleId': finding.check,
+            'level': finding.level,
+            'message': {'text': finding.message},
+            'properties': {'vendor': finding.vendor},
+        }
+        if count > 1:
+            result['occurrenceCount'] = count
+        if finding.path:
+            location = {
+                'artifactLocation': {'uri': quote(f"{PROFILES_ROOT}/{finding.path}"), 'uriBaseId': '%SRCROOT%'},
+            }
+            if finding.line:
+                location['region'] = {'startLine': finding.line}
+            result['locations'] = [{'physicalLocation': location}]
+        results.append(result)
+
+    log = {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': tool,
+                'rules': [{'id': check} for check in sorted({finding.check for finding, _ in distinct})],
+            }},
+            'results': results,
+            'properties': summary,
+        }],
+    }
+    fp.write(json.dumps(log, indent=2, ensure_ascii=False) + "\n")
+
+
+def write_junit(findings, fp, vendors, checks):
+    """
+    Write findings as JUnit XML: one test suite per vendor and one test case
+    per check, failed if the check reported errors for the vendor. Warnings are
+    attached to the test case output.
+
+    Parameters:
+        findings (iterable): Finding objects
+        fp (file): Text file to write to
+        vendors (list): Checked vendors, in report order
+        checks (list): Names of the checks that ran, in run order
+    """
+    by_case = {}
+    for finding, count in deduplicate(findings):
+        by_case.setdefault((finding.vendor, finding.check), []).append((finding, count))
+
+    root = ET.Element('testsuites', name=TOOL_NAME)
+    total_failures = 0
+    for vendor in vendors:
+        suite = ET.SubElement(root, 'testsuite', name=vendor, tests=str(len(checks)))
+        failures = 0
+        for check in checks:
+            case = ET.SubElement(suite, 'testcase', classname=vendor, name=check)
+            case_findings = by_case.get((vendor, check), [])
+            lines = {'error': [], 'warning': []}
+            for finding, count in case_findings:
+                location = f"{finding.path}:{finding.line}: " if finding.line else (f"{finding.path}: " if finding.path else "")
+                repeat = f" ({count} times)" if count > 1 else ""
+                lines[finding.level].append(f"{location}{finding.message}{repeat}")
+            if lines['error']:
+                failures += 1
+                failure = ET.SubElement(case, 'failure', message=f"{len(lines['error'])} error(s)", type='error')
+                failure.text = "\n".join(lines['error'])
+            if lines['warning']:
+                ET.SubElement(case, 'system-out').text = "\n".join(f"warning: {line}" for line in lines['warning'])
+        suite.set('failures', str(failures))
+        suite.set('errors', '0')
+        total_failures += failures
+    root.set('tests', str(len(vendors) * len(checks)))
+    root.set('failures', str(total_failures))
+    root.set('errors', '0')
+    ET.indent(root)
+    fp.write(ET.tostring(root, encoding='unicode', xml_declaration=True) + "\n")
@@ -1,8 +1,24 @@
 import os
+import io
+import sys
 import json
+import time
+import cProfile
+import hashlib
 import argparse
+import platform
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from orca_profile_cache import ProfileCheckCache
+from orca_check_findings import Finding, write_json, write_junit, write_sarif
+from orca_name_index import NgramIndex
+from orca_profile_corpus import PROFILE_TYPES, ProfileCorpus
+from orca_profile_graph import ReferenceGraph
+from orca_profile_resolver import InheritanceError, ProfileResolver
+from orca_profile_watch import create_watcher
+
 OBSOLETE_KEYS = {
     "acceleration", "scale", "rotate", "duplicate", "duplicate_grid",
     "bed_size", "print_center", "g0", "wipe_tower_per_color_wipe",
@@ -20,11 +36,32 @@ OBSOLETE_KEYS = {
     "overhang_totally_speed", "silent_mode", "overhang_speed_classic"
 }
 
+# Files listed by --profile, and the version of its JSON report
+SLOWEST_FILES = 10
+PROFILE_REPORT_VERSION = 1
+
+# Findings of the vendor being checked, as (check, level, message, path, line),
+# and the running check; see run_checks_captured
+_findings = None
+_current_check = None
+# References between the profiles of all vendors when loaded (see main and
+# --watch), else (indexed vendors, graph) of those the checks needed so far;
+# see reference_graph
+_reference_graph = None
+_vendor_graph = None
+
+def _record(level, msg, path, line):
+    if _findings is not None:
+        _findings.append((_current_check, level, msg, path, line))
+
 # Utility functions for printing messages in different colors.
-def print_error(msg):
+# `path` and `line` locate the finding in structured reports.
+def print_error(msg, path=None, line=None):
+    _record('error', msg, path, line)
     print(f"\033[91m[ERROR]\033[0m {msg}")  # Red
 
-def print_warning(msg):
+def print_warning(msg, path=None, line=None):
+    _record('warning', msg, path, line)
     print(f"\033[93m[WARNING]\033[0m {msg}")  # Yellow
 
 def print_info(msg):
@@ -43,42 +80,82 @@ def no_duplicates_object_pairs_hook(pairs):
         seen[key] = value
     return seen
 
-def check_filament_compatible_printers(vendor_folder):
+def iter_strict_profiles(profile_files):
+    """
+    Yield (file_path, data) for files that parse without duplicate keys, and
+    report the others like a strict `json.load` with `no_duplicates_object_pairs_hook`.
+
+    Parameters:
+        profile_files (list): ProfileFile objects from the corpus
+        
+    Yields:
+        tuple: (file_path, data), or (file_path, None) for each reported error
+    """
+    for profile_file in profile_files:
+        error = profile_file.strict_error()
+        if isinstance(error, ValueError):
+            print_error(f"Duplicate key error in {profile_file.path}: {error}", profile_file.path)
+            yield profile_file.path, None
+        elif error is not None:
+            print_error(f"Error processing {profile_file.path}: {error}", profile_file.path)
+            yield profile_file.path, None
+        else:
+            yield profile_file.path, profile_file.data
+
+def reference_graph(corpus, vendors, profile_types):
     """
-    Checks JSON files in the vendor folder for missing or empty 'compatible_printers'
+    The ReferenceGraph a check looks references up in.
+
+    This is the graph of all vendors if one was loaded (see main and `--watch`).
+    Otherwise only the vendors and profile types the checks asked for are
+    indexed, on first use, so that no other files are parsed. Later checks
+    add their vendors to the same graph.
+
+    Parameters:
+        corpus (ProfileCorpus): Parsed profiles
+        vendors (tuple): Vendors the check needs
+        profile_types (tuple): Profile types the check needs
+
+    Returns:
+        ReferenceGraph
+    """
+    global _vendor_graph
+    if _reference_graph is not None:
+        return _reference_graph
+    indexed, graph = _vendor_graph or (set(), None)
+    if graph is None or not set(profile_types).issubset(graph.profile_types):
+        # Checks needing other profile types index their vendors again
+        types = tuple(t for t in PROFILE_TYPES if t in profile_types or (graph is not None and t in graph.profile_types))
+        indexed, graph = set(vendors), ReferenceGraph.build(corpus, vendors, types)
+        _vendor_graph = (indexed, graph)
+    elif not indexed.issuperset(vendors):
+        graph.update(corpus, set(vendors) - indexed)
+        indexed.update(vendors)
+    return graph
+
+def check_filament_compatible_printers(corpus, vendor_name):
+    """
+    Checks the vendor's filament profiles for missing or empty 'compatible_printers'
     when 'instantiation' is flagged as true.
 
     Parameters:
-        vendor_folder (str or Path): The directory to search for JSON profile files.
+        corpus (ProfileCorpus): Parsed profiles
+        vendor_name (str): The vendor name to check
 
     Returns:
         int: The number of profiles with missing or empty 'compatible_printers'.
     """
     error = 0
-    vendor_path = Path(vendor_folder)
-    if not vendor_path.exists():
-        return 0
-    
     profiles = {}
 
-    # Use rglob to recursively find .json files.
-    for file_path in vendor_path.rglob("*.json"):
-        try:
-            with open(file_path, 'r', encoding='UTF-8') as fp:
-                # Use custom hook to detect duplicates.
-                data = json.load(fp, object_pairs_hook=no_duplicates_object_pairs_hook)
-        except ValueError as ve:
-            print_error(f"Duplicate key error in {file_path}: {ve}")
-            error += 1
-            continue
-        except Exception as e:
-            print_error(f"Error processing {file_path}: {e}")
+    for file_path, data in iter_strict_profiles(corpus.files(vendor_name, "filament")):
+        if data is None:
             error += 1
             continue
 
         profile_name = data['name']
         if profile_name in profiles:
-            print_error(f"Duplicated profile {profile_name}: {file_path}")
+            print_error(f"Duplicated profile {profile_name}: {file_path}", file_path)
             error += 1
             continue
 
@@ -87,70 +164,49 @@ def check_filament_compatible_printers(vendor_folder):
             'content': data,
         }
     
-    def get_inherit_property(profile, key):
-        content = profile['content']
-        if key in content:
-            return content[key]
-
-        if 'inherits' in content:
-            inherits = content['inherits']
-            if inherits not in profiles:
-                raise ValueError(f"Parent profile not found: {inherits}, referrenced in {profile['file_path']}")
-            
-            return get_inherit_property(profiles[inherits], key)
-        
-        return None
+    resolver = ProfileResolver(
+        {name: profile['content'] for name, profile in profiles.items()},
+        paths={name: profile['file_path'] for name, profile in profiles.items()},
+    )
 
-    for profile in profiles.values():
+    for profile_name, profile in profiles.items():
         instantiation = str(profile['content'].get("instantiation", "")).lower() == "true"
         if instantiation:
             try:
-                compatible_printers = get_inherit_property(profile, "compatible_printers")
+                compatible_printers = resolver.get(profile_name, "compatible_printers")
                 if not compatible_printers or (isinstance(compatible_printers, list) and not compatible_printers):
-                    print_error(f"'compatible_printers' missing in {profile['file_path']}")
+                    print_error(f"'compatible_printers' missing in {profile['file_path']}", profile['file_path'])
                     error += 1
-            except ValueError as ve:
-                print_error(f"Unable to parse {profile['file_path']}: {ve}")
+            except InheritanceError as ie:
+                print_error(f"Unable to parse {profile['file_path']}: {ie}", profile['file_path'])
                 error += 1
                 continue
 
     return error
 
-def load_available_filament_profiles(profiles_dir, vendor_name):
+def report_filament_load_errors(corpus, graph, vendor_name):
     """
-    Load all available filament profiles from a vendor's directory.
-    
+    Report the vendor's filament profiles that cannot be loaded, and so
+    cannot be default materials.
+
     Parameters:
-        profiles_dir (Path): The directory containing vendor profile directories
+        corpus (ProfileCorpus): Parsed profiles
+        graph (ReferenceGraph): References of the vendor
         vendor_name (str): The name of the vendor directory
-        
-    Returns:
-        set: A set of filament profile names
     """
-    profiles = set()
-    vendor_path = profiles_dir / vendor_name / "filament"
-    
-    if not vendor_path.exists():
-        return profiles
-    
-    for file_path in vendor_path.rglob("*.json"):
-        try:
-            with open(file_path, 'r', encoding='UTF-8') as fp:
-                data = json.load(fp)
-                if "name" in data:
-                    profiles.add(data["name"])
-        except Exception as e:
-            print_error(f"Error loading filament profile {file_path}: {e}")
-    
-    return profiles
+    for node_id in graph.vendor_nodes(vendor_name, "filament"):
+        node = graph.nodes[node_id]
+        if node['error'] is not None:
+            path = corpus.profiles_dir / node['path']
+            print_error(f"Error loading filament profile {path}: {node['error']}", path)
 
-def check_machine_default_materials(profiles_dir, vendor_name):
+def check_machine_default_materials(corpus, vendor_name):
     """
     Checks if default materials referenced in machine profiles exist in 
     the vendor's filament library or in the global OrcaFilamentLibrary.
     
     Parameters:
-        profiles_dir (Path): The base profiles directory
+        corpus (ProfileCorpus): Parsed profiles
         vendor_name (str): The vendor name to check
         
     Returns:
@@ -158,63 +214,41 @@ def check_machine_default_materials(profiles_dir, vendor_name):
         int: the number of warnings found (0 or 1)
     """
     error_count = 0
+    profiles_dir = corpus.profiles_dir
     machine_dir = profiles_dir / vendor_name / "machine"
     
     if not machine_dir.exists():
         print_warning(f"No machine profiles found for vendor: {vendor_name}")
         return 0, 1
         
-    # Load available filament profiles
-    vendor_filaments = load_available_filament_profiles(profiles_dir, vendor_name)
-    global_filaments = load_available_filament_profiles(profiles_dir, "OrcaFilamentLibrary")
-    all_available_filaments = vendor_filaments.union(global_filaments)
-    
-    # Check each machine profile
-    for file_path in machine_dir.rglob("*.json"):
-        try:
-            with open(file_path, 'r', encoding='UTF-8') as fp:
-                data = json.load(fp)
-                
-            default_materials = None
-            if "default_materials" in data:
-                default_materials = data["default_materials"]
-            elif "default_filament_profile" in data:
-                default_materials = data["default_filament_profile"]
-                
-            if default_materials:
-                if isinstance(default_materials, list):
-                    for material in default_materials:
-                        if material not in all_available_filaments:
-                            print_error(f"Missing filament profile: '{material}' referenced in {file_path.relative_to(profiles_dir)}")
-                            error_count += 1
-                else:
-                    # Handle semicolon-separated list of materials in a string
-                    if ";" in default_materials:
-                        for material in default_materials.split(";"):
-                            material = material.strip()
-                            if material and material not in all_available_filaments:
-                                print_error(f"Missing filament profile: '{material}' referenced in {file_path.relative_to(profiles_dir)}")
-                                error_count += 1
-                    else:
-                        # Single material in a string
-                        if default_materials not in all_available_filaments:
-                            print_error(f"Missing filament profile: '{default_materials}' referenced in {file_path.relative_to(profiles_dir)}")
-                            error_count += 1
-                        
-        except Exception as e:
-            print_error(f"Error processing machine profile {file_path}: {e}")
+    graph = reference_graph(corpus, (vendor_name, "OrcaFilamentLibrary"), ("machine", "filament"))
+    report_filament_load_errors(corpus, graph, vendor_name)
+    report_filament_load_errors(corpus, graph, "OrcaFilamentLibrary")
+
+    # default_materials references that resolve neither to a vendor filament
+    # nor to an OrcaFilamentLibrary one
+    for node_id in graph.vendor_nodes(vendor_name, "machine"):
+        node = graph.nodes[node_id]
+        file_path = profiles_dir / node['path']
+        if node['error'] is not None:
+            print_error(f"Error processing machine profile {file_path}: {node['error']}", file_path)
             error_count += 1
-            
+            continue
+        for _, kind, target, material in graph.outgoing[node_id]:
+            if kind == "default_materials" and target is None:
+                print_error(f"Missing filament profile: '{material}' referenced in {node['path']}", file_path)
+                error_count += 1
+
     return error_count, 0
 
-def check_filament_name_consistency(profiles_dir, vendor_name):
+def check_filament_name_consistency(corpus, vendor_name):
     """
     Make sure filament profile names match in both vendor json and subpath files.
     Filament profiles work only if the name in <vendor>.json matches the name in sub_path file,
     or if it's one of the sub_path file's `renamed_from`.
 
     Parameters:
-        profiles_dir (Path): Base profiles directory
+        corpus (ProfileCorpus): Parsed profiles
         vendor_name (str): Vendor name
 
     Returns:
@@ -222,19 +256,19 @@ def check_filament_name_consistency(profiles_dir, vendor_name):
         int: Number of warnings found (0 or 1)
     """
     error_count = 0
+    profiles_dir = corpus.profiles_dir
     vendor_dir = profiles_dir / vendor_name
     vendor_file = profiles_dir / (vendor_name + ".json")
+    vendor_index = corpus.vendor_index(vendor_name)
     
-    if not vendor_file.exists():
-        print_warning(f"No profiles found for vendor: {vendor_name} at {vendor_file}")
+    if vendor_index is None:
+        print_warning(f"No profiles found for vendor: {vendor_name} at {vendor_file}", vendor_file)
         return 0, 1
     
-    try:
-        with open(vendor_file, 'r', encoding='UTF-8') as fp:
-            data = json.load(fp)
-    except Exception as e:
-        print_error(f"Error loading vendor profile {vendor_file}: {e}")
+    if vendor_index.error is not None:
+        print_error(f"Error loading vendor profile {vendor_file}: {vendor_index.error}", vendor_file)
         return 1, 0
+    data = vendor_index.data
 
     if 'filament_list' not in data:
         return 0, 0
@@ -243,19 +277,27 @@ def check_filament_name_consistency(profiles_dir, vendor_name):
         name_in_vendor = child['name']
         sub_path = child['sub_path']
         sub_file = vendor_dir / sub_path
+        sub_profile = corpus.get(sub_file)
 
-        if not sub_file.exists():
-            print_error(f"Missing sub profile: '{sub_path}' declared in {vendor_file.relative_to(profiles_dir)}")
-            error_count += 1
-            continue
-
-        try:
-            with open(sub_file, 'r', encoding='UTF-8') as fp:
-                sub_data = json.load(fp)
-        except Exception as e:
-            print_error(f"Error loading profile {sub_file}: {e}")
+        if sub_profile is None:
+            if not sub_file.exists():
+                print_error(f"Missing sub profile: '{sub_path}' declared in {vendor_file.relative_to(profiles_dir)}", vendor_file)
+                error_count += 1
+                continue
+            # Declared file outside the walked profile tree, e.g. "filament/../x.json"
+            try:
+                with open(sub_file, 'r', encoding='UTF-8') as fp:
+                    sub_data = json.load(fp)
+            except Exception as e:
+                print_error(f"Error loading profile {sub_file}: {e}", sub_file)
+                error_count += 1
+                continue
+        elif sub_profile.error is not None:
+            print_error(f"Error loading profile {sub_file}: {sub_profile.error}", sub_file)
             error_count += 1
             continue
+        else:
+            sub_data = sub_profile.data
 
         name_in_sub = sub_data['name']
 
@@ -267,12 +309,12 @@ def check_filament_name_consistency(profiles_dir, vendor_name):
             if name_in_vendor in renamed_from:
                 continue
 
-        print_error(f"Filament name mismatch: required '{name_in_vendor}' in {vendor_file.relative_to(profiles_dir)} but found '{name_in_sub}' in {sub_file.relative_to(profiles_dir)}, and none of its `renamed_from` matches the required name either")
+        print_error(f"Filament name mismatch: required '{name_in_vendor}' in {vendor_file.relative_to(profiles_dir)} but found '{name_in_sub}' in {sub_file.relative_to(profiles_dir)}, and none of its `renamed_from` matches the required name either", sub_file)
         error_count += 1
     
     return error_count, 0
 
-def check_filament_id(vendor, vendor_folder):
+def check_filament_id(corpus, vendor):
     """
     Make sure filament_id is not longer than 8 characters, otherwise AMS won't work properly
     """
@@ -280,22 +322,8 @@ def check_filament_id(vendor, vendor_folder):
         return 0
     
     error = 0
-    vendor_path = Path(vendor_folder)
-    if not vendor_path.exists():
-        return 0
-
-    # Use rglob to recursively find .json files.
-    for file_path in vendor_path.rglob("*.json"):
-        try:
-            with open(file_path, 'r', encoding='UTF-8') as fp:
-                # Use custom hook to detect duplicates.
-                data = json.load(fp, object_pairs_hook=no_duplicates_object_pairs_hook)
-        except ValueError as ve:
-            print_error(f"Duplicate key error in {file_path}: {ve}")
-            error += 1
-            continue
-        except Exception as e:
-            print_error(f"Error processing {file_path}: {e}")
+    for file_path, data in iter_strict_profiles(corpus.files(vendor, "filament")):
+        if data is None:
             error += 1
             continue
 
@@ -306,45 +334,409 @@ def check_filament_id(vendor, vendor_folder):
 
         if len(filament_id) > 8:
             error += 1
-            print_error(f"Filament id too long \"{filament_id}\": {file_path}")
+            print_error(f"Filament id too long \"{filament_id}\": {file_path}", file_path)
     
     return error
 
-def check_obsolete_keys(profiles_dir, vendor_name):
+def check_obsolete_keys(corpus, vendor_name):
     """
     Check for obsolete keys in all filament profiles for a vendor.
 
     Parameters:
-        profiles_dir (Path): Base profiles directory
+        corpus (ProfileCorpus): Parsed profiles
         vendor_name (str): Vendor name
-        obsolete_keys (set): Set of obsolete key names to check
 
     Returns:
         int: Number of obsolete keys found
     """
     error_count = 0
-    vendor_path = profiles_dir / vendor_name / "filament"
-
-    if not vendor_path.exists():
-        return 0
+    profiles_dir = corpus.profiles_dir
 
-    for file_path in vendor_path.rglob("*.json"):
-        try:
-            with open(file_path, "r", encoding="UTF-8") as fp:
-                data = json.load(fp)
-        except Exception as e:
-            print_warning(f"Error reading profile {file_path.relative_to(profiles_dir)}: {e}")
+    for profile_file in corpus.files(vendor_name, "filament"):
+        file_path = profile_file.path
+        if profile_file.error is not None:
+            print_warning(f"Error reading profile {file_path.relative_to(profiles_dir)}: {profile_file.error}", file_path)
             error_count += 1
             continue
+        data = profile_file.data
 
         for key in data.keys():
             if key in OBSOLETE_KEYS:
-                print_warning(f"Obsolete key: '{key}' found in {file_path.relative_to(profiles_dir)}")
+                print_warning(f"Obsolete key: '{key}' found in {file_path.relative_to(profiles_dir)}", file_path)
                 error_count += 1
 
     return error_count
 
+def check_duplicate_keys(corpus, vendor_name):
+    """
+    Check all profiles of a vendor (machine, filament and process) for keys that
+    appear more than once in one JSON object.
+
+    Parameters:
+        corpus (ProfileCorpus): Parsed profiles
+        vendor_name (str): Vendor name
+
+    Returns:
+        int: Number of duplicate keys found
+    """
+    error_count = 0
+    profiles_dir = corpus.profiles_dir
+
+    for profile_file in corpus.files(vendor_name):
+        for key, line, column in profile_file.duplicate_keys:
+            print_error(f"Duplicate key '{key}' at line {line}, column {column} in "
+                        f"{profile_file.path.relative_to(profiles_dir)}", profile_file.path, line)
+            error_count += 1
+
+    return error_count
+
+def check_compatible_printer_names(corpus, vendor_name):
+    """
+    Check that every printer listed in 'compatible_printers' of the vendor's
+    filament and process profiles is the name of one of its machine profiles,
+    and suggest the closest machine name for the ones that are not.
+
+    Lists are checked where they are written, which covers the resolved lists
+    of all profiles inheriting them. Unknown names are the unresolved
+    compatible_printers references of the reference graph, so a machine's
+    `renamed_from` names are accepted too.
+
+    Parameters:
+        corpus (ProfileCorpus): Parsed profiles
+        vendor_name (str): Vendor name
+
+    Returns:
+        int: Number of unknown printer names found
+    """
+    error_count = 0
+    graph = reference_graph(corpus, (vendor_name,), ("machine", "filament", "process"))
+    machines = NgramIndex(graph.nodes[node_id]['name'] for node_id in graph.vendor_nodes(vendor_name, "machine")
+                          if graph.nodes[node_id]['name'] is not None)
+
+    # Unreadable files have no references, they are reported by the other checks
+    unknown = []
+    for profile_type in ("filament", "process"):
+        for node_id in graph.vendor_nodes(vendor_name, profile_type):
+            unknown.extend((node_id, printer) for _, kind, target, printer in graph.outgoing[node_id]
+                           if kind == "compatible_printers" and target is None)
+
+    # Suggestions are looked up once per distinct name
+    suggestions = {printer: machines.suggest(printer) for printer in {printer for _, printer in unknown}}
+    for node_id, printer in unknown:
+        path = graph.nodes[node_id]['path']
+        hint = f", did you mean '{suggestions[printer][0]}'?" if suggestions[printer] else ""
+        print_error(f"Unknown printer '{printer}' in compatible_printers of {path}{hint}",
+                    corpus.profiles_dir / path)
+        error_count += 1
+
+    return error_count
+
+def enabled_checks(args):
+    """
+    The checks enabled by the command line, in run order.
+
+    Returns:
+        list: (check function, result kind); the kind is 'errors' or 'warnings'
+            for checks returning one count, 'both' for (errors, warnings)
+    """
+    checks = []
+    if args.check_filaments or not (args.check_materials and not args.check_filaments):
+        checks.append((check_filament_compatible_printers, 'errors'))
+    if args.check_materials:
+        checks.append((check_machine_default_materials, 'both'))
+    if args.check_obsolete_keys:
+        checks.append((check_obsolete_keys, 'warnings'))
+    if args.check_duplicate_keys:
+        checks.append((check_duplicate_keys, 'errors'))
+    if args.check_printer_names:
+        checks.append((check_compatible_printer_names, 'errors'))
+    checks.append((check_filament_name_consistency, 'both'))
+    checks.append((check_filament_id, 'errors'))
+    return checks
+
+def run_checks(corpus, vendor_name, args, timings=None):
+    """
+    Run all enabled checks for one vendor.
+
+    Parameters:
+        corpus (ProfileCorpus): Parsed profiles
+        vendor_name (str): Vendor name
+        args (argparse.Namespace): Parsed command line arguments
+        timings (dict, optional): Filled with the wall time and the number and
+            size of the files parsed by every check that ran, by check name.
+            `corpus.parse_log` must be a list.
+
+    Returns:
+        int: Number of errors found
+        int: Number of warnings found
+    """
+    global _current_check
+    errors_found = 0
+    warnings_found = 0
+
+    for check, kind in enabled_checks(args):
+        _current_check = check.__name__
+        if timings is None:
+            result = check(corpus, vendor_name)
+        else:
+            # Files are parsed lazily, so they count for the first check using them
+            parsed = len(corpus.parse_log)
+            start = time.perf_counter()
+            result = check(corpus, vendor_name)
+            timings[check.__name__] = {
+                'seconds': time.perf_counter() - start,
+                'files': len(corpus.parse_log) - parsed,
+                'bytes': sum(size for _, size, _ in corpus.parse_log[parsed:]),
+            }
+
+        if kind == 'both':
+            errors_found += result[0]
+            warnings_found += result[1]
+        elif kind == 'errors':
+            errors_found += result
+        else:
+            warnings_found += result
+
+    _current_check = None
+    return errors_found, warnings_found
+
+def run_checks_captured(corpus, vendor_name, args):
+    """
+    Run the checks of one vendor, capturing their output.
+
+    Returns:
+        str: Output of the checks
+        int: Number of errors found
+        int: Number of warnings found
+        list: Finding objects, in report order
+        float: Run time in seconds
+        dict or None: With --profile, the timings of the checks ('checks'), the
+            number and size of the files parsed ('files', 'bytes') and the
+            slowest of them ('slowest_files': (relative path, size, seconds))
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    timings = None
+    if args.profile:
+        if corpus.parse_log is None:
+            corpus.parse_log = []
+        parsed = len(corpus.parse_log)
+        timings = {}
+    global _findings
+    _findings = []
+    try:
+        with contextlib.redirect_stdout(output):
+            errors, warnings = run_checks(corpus, vendor_name, args, timings)
+        recorded = _findings
+    finally:
+        _findings = None
+    seconds = time.perf_counter() - start
+
+    findings = []
+    profiles_dir = str(corpus.profiles_dir) + os.sep
+    for check, level, message, path, line in recorded:
+        path = str(path) if path is not None else ''
+        if path.startswith(profiles_dir):
+            path = path[len(profiles_dir):]
+        findings.append(Finding(vendor_name, path.replace(os.sep, '/'), line or 0, check, level, message))
+    findings.sort()
+
+    profile = None
+    if timings is not None:
+        parse_log = corpus.parse_log[parsed:]
+        slowest = sorted(parse_log, key=lambda entry: entry[2], reverse=True)[:SLOWEST_FILES]
+        profile = {
+            'checks': timings,
+            'files': len(parse_log),
+            'bytes': sum(size for _, size, _ in parse_log),
+            'slowest_files': [(os.path.relpath(path, corpus.profiles_dir), size, parse_seconds)
+                              for path, size, parse_seconds in slowest],
+        }
+    return output.getvalue(), errors, warnings, findings, seconds, profile
+
+def profile_report(vendor_profiles, vendor_times, elapsed, jobs):
+    """
+    Combine the --profile data of the checked vendors into one report.
+
+    Parameters:
+        vendor_profiles (dict): Profile data of every checked vendor, from `run_checks_captured`
+        vendor_times (dict): Run time of every checked vendor
+        elapsed (float): Wall time of the whole run
+        jobs (int): Number of parallel jobs
+
+    Returns:
+        dict: The report, serializable as JSON
+    """
+    checks = {}
+    vendors = {}
+    slowest = []
+    for vendor_name, profile in vendor_profiles.items():
+        vendors[vendor_name] = {
+            'seconds': vendor_times[vendor_name],
+            'files': profile['files'],
+            'bytes': profile['bytes'],
+            'checks': profile['checks'],
+        }
+        for check_name, timing in profile['checks'].items():
+            total = checks.setdefault(check_name, {'seconds': 0.0, 'files': 0, 'bytes': 0})
+            for key in total:
+                total[key] += timing[key]
+        slowest.extend(profile['slowest_files'])
+    slowest.sort(key=lambda entry: entry[2], reverse=True)
+
+    by_time = lambda item: item[1]['seconds']
+    return {
+        'version': PROFILE_REPORT_VERSION,
+        'python': platform.python_version(),
+        'seconds': elapsed,
+        'jobs': jobs,
+        'checks': dict(sorted(checks.items(), key=by_time, reverse=True)),
+        'vendors': dict(sorted(vendors.items(), key=by_time, reverse=True)),
+        'slowest_files': [{'path': path, 'bytes': size, 'seconds': seconds} for path, size, seconds in slowest[:SLOWEST_FILES]],
+    }
+
+def print_profile_report(report, file=sys.stderr):
+    def size(count):
+        return f"{count / 1024:.0f} KB" if count < 1024 * 1024 else f"{count / (1024 * 1024):.1f} MB"
+
+    print(f"Profile: {report['seconds']:.2f}s wall time with {report['jobs']} job(s)", file=file)
+    print("Checks (wall time, files parsed, bytes parsed):", file=file)
+    for check_name, timing in report['checks'].items():
+        print(f"  {check_name:<40} {timing['seconds']:8.3f}s {timing['files']:6} files {size(timing['bytes']):>9}", file=file)
+    print("Vendors (wall time, files parsed, bytes parsed):", file=file)
+    for vendor_name, timing in report['vendors'].items():
+        print(f"  {vendor_name:<40} {timing['seconds']:8.3f}s {timing['files']:6} files {size(timing['bytes']):>9}", file=file)
+    print("Slowest files to parse:", file=file)
+    for entry in report['slowest_files']:
+        print(f"  {entry['seconds'] * 1000:8.2f} ms {size(entry['bytes']):>9}  {entry['path']}", file=file)
+
+# Per-process state of the --jobs worker pool
+_worker_corpus = None
+_worker_args = None
+
+def _init_worker(profiles_dir, args, graph):
+    global _worker_corpus, _worker_args, _reference_graph
+    _worker_corpus = ProfileCorpus(profiles_dir)
+    _worker_args = args
+    _reference_graph = graph
+
+def _run_checks_in_worker(vendor_name):
+    return run_checks_captured(_worker_corpus, vendor_name, _worker_args)
+
+def check_vendors(corpus, vendor_names, args, jobs):
+    """
+    Check vendors, serially or in a process pool.
+
+    Yields:
+        tuple: (vendor_name, output, errors, warnings, findings, seconds, profile) in the order of
+            `vendor_names`, whatever the number of jobs
+    """
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                 initargs=(corpus.profiles_dir, args, _reference_graph)) as pool:
+            for vendor_name, result in zip(vendor_names, pool.map(_run_checks_in_worker, vendor_names)):
+                yield (vendor_name, *result)
+    else:
+        for vendor_name in vendor_names:
+            yield (vendor_name, *run_checks_captured(corpus, vendor_name, args))
+
+def _changed_nodes(graph, relative_path):
+    # A changed file, or all files below a directory that was moved away
+    if relative_path in graph.by_path:
+        return [graph.by_path[relative_path]]
+    if relative_path.endswith('.json'):
+        return []
+    prefix = relative_path + '/'
+    return [node_id for path, node_id in graph.by_path.items() if path.startswith(prefix)]
+
+def _impacted_vendors(graph, relative_paths):
+    # Vendors of the profiles referencing changed files, directly or transitively
+    node_ids = [node_id for relative_path in relative_paths for node_id in _changed_nodes(graph, relative_path)]
+    return {graph.nodes[node_id]['vendor'] for node_id in graph.impact(node_ids)}
+
+def watch_profiles(corpus, vendor_names, vendor_results, args):
+    """
+    Re-check the vendors affected by every change of the profiles, until interrupted.
+
+    The corpus stays parsed in memory and only changed files are parsed again.
+    The reference graph is updated in place, for the vendors of the changed
+    files (see ReferenceGraph.update). A change affects these vendors and the
+    vendors of all profiles referencing the changed files, directly or
+    transitively (see ReferenceGraph.impact), before or after the change.
+
+    Parameters:
+        corpus (ProfileCorpus): Profiles, as checked by the initial run
+        vendor_names (list): Vendors to check
+        vendor_results (dict): [output, errors, warnings, findings] of every vendor, updated in place
+        args (argparse.Namespace): Parsed command line arguments
+    """
+    global _reference_graph
+    watcher = create_watcher(corpus.profiles_dir, polling=args.watch_polling)
+    # Changes can affect any vendor, so the graph of all vendors is kept
+    if _reference_graph is None:
+        _reference_graph = ReferenceGraph.build(corpus)
+    graph = _reference_graph
+    print_info(f"Watching {corpus.profiles_dir} for changes ({watcher.name}), press Ctrl+C to stop")
+    sys.stdout.flush()
+    try:
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            corpus.refresh(changed)
+
+            # Vendors of the changed files, whose nodes are indexed again
+            changed_vendors = set()
+            relative_paths = []
+            for path in changed:
+                relative_path = os.path.relpath(path, corpus.profiles_dir).replace(os.sep, '/')
+                first = relative_path.split('/', 1)[0]
+                changed_vendors.add(first[:-len('.json')] if first == relative_path and first.endswith('.json') else first)
+                relative_paths.append(relative_path)
+            affected = changed_vendors | _impacted_vendors(graph, relative_paths)
+            graph.update(corpus, changed_vendors)
+            affected.update(_impacted_vendors(graph, relative_paths))
+            # Every vendor reports the OrcaFilamentLibrary filaments it cannot load
+            if args.check_materials and "OrcaFilamentLibrary" in affected:
+                affected.update(vendor_names)
+
+            vendors_to_check = [vendor_name for vendor_name in vendor_names if vendor_name in affected]
+            names = ", ".join(sorted(os.path.relpath(path, corpus.profiles_dir) for path in changed)[:3])
+            more = f" and {len(changed) - 3} more" if len(changed) > 3 else ""
+            print(f"\n{time.strftime('%H:%M:%S')} Changed: {names}{more}")
+            for vendor_name, output, errors, warnings, findings, _, _ in check_vendors(corpus, vendors_to_check, args, 1):
+                vendor_results[vendor_name] = [output, errors, warnings, findings]
+                sys.stdout.write(output)
+            errors_found = sum(vendor_results[vendor_name][1] for vendor_name in vendor_names)
+            warnings_found = sum(vendor_results[vendor_name][2] for vendor_name in vendor_names)
+            checked = ", ".join(vendors_to_check) if vendors_to_check else "no checked vendor is affected"
+            summary = f"Re-checked {checked} in {time.perf_counter() - start:.2f}s; " \
+                      f"all vendors: {errors_found} error(s), {warnings_found} warning(s)"
+            if errors_found > 0:
+                print_error(summary)
+            else:
+                print_success(summary)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+def checker_cache_key(args):
+    """
+    Hash of the check options and checker sources that cached results depend on.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((args.check_filaments, args.check_materials, args.check_obsolete_keys,
+                        args.check_duplicate_keys, args.check_printer_names)).encode())
+    script_dir = Path(__file__).resolve().parent
+    for module in ("orca_extra_profile_check.py", "orca_profile_corpus.py", "orca_profile_resolver.py",
+                   "orca_profile_cache.py", "orca_name_index.py", "orca_check_findings.py",
+                   "orca_profile_graph.py"):
+        digest.update((script_dir / module).read_bytes())
+    return digest.hexdigest()
+
 def main():
+    global _reference_graph
     parser = argparse.ArgumentParser(
         description="Check 3D printer profiles for common issues",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -353,58 +745,168 @@ def main():
     parser.add_argument("--check-filaments", action="store_true", help="Check 'compatible_printers' in filament profiles")
     parser.add_argument("--check-materials", action="store_true", help="Check default materials in machine profiles")
     parser.add_argument("--check-obsolete-keys", action="store_true", help="Warn if obsolete keys are found in filament profiles")
+    parser.add_argument("--check-duplicate-keys", action="store_true",
+                        help="Check all machine, filament and process profiles for duplicate keys")
+    parser.add_argument("--check-printer-names", action="store_true",
+                        help="Check that 'compatible_printers' of filament and process profiles only lists existing machine profiles")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of vendors checked in parallel, 0 to use all cores")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-check vendors with changed profiles (or profiles inheriting from them) since the last incremental run")
+    parser.add_argument("--profile", action="store_true",
+                        help="Print the wall time, files and bytes parsed of every check and vendor, and the slowest files, to stderr")
+    parser.add_argument("--profile-json", type=Path, help="Write the --profile report as JSON to this file (implies --profile)")
+    parser.add_argument("--profile-dump", type=Path,
+                        help="Write cProfile statistics of the checks to this file, for pstats or snakeviz "
+                             "(implies --profile and checks serially)")
+    parser.add_argument("--format", choices=("text", "json", "sarif", "junit"), default="text",
+                        help="Output format; json, sarif and junit list every finding with its check, file and line")
+    parser.add_argument("--output", type=Path,
+                        help="Write the json, sarif or junit report to this file and keep the text output on stdout")
+    parser.add_argument("--watch", action="store_true",
+                        help="After checking, keep the profiles in memory and re-check the vendors affected by every change")
+    parser.add_argument("--watch-polling", action="store_true",
+                        help="With --watch, poll for changes instead of using inotify")
+    parser.add_argument("--cache-dir", type=Path, default=Path(__file__).resolve().parent / ".profile_check_cache",
+                        help="Cache directory for --incremental and of the reference graph saved by orca_profile_graph.py")
     args = parser.parse_args()
+    args.profile = args.profile or args.profile_json is not None or args.profile_dump is not None
+    if args.watch and args.format != "text":
+        parser.error("--watch only supports the text output")
+    # A structured report without --output replaces the text output on stdout
+    text_output = args.format == "text" or args.output is not None
 
-    print_info("Checking profiles ...")
+    if text_output:
+        print_info("Checking profiles ...")
 
     script_dir = Path(__file__).resolve().parent
     profiles_dir = script_dir.parent / "resources" / "profiles"
+    # Every profile file is parsed once and shared by all checks
+    corpus = ProfileCorpus(profiles_dir)
     checked_vendor_count = 0
     errors_found = 0
     warnings_found = 0
+    vendor_times = {}
+    vendor_profiles = {}
+    findings = []
 
-    def run_checks(vendor_name):
-        nonlocal errors_found, warnings_found, checked_vendor_count
-        vendor_path = profiles_dir / vendor_name
-
-        if args.check_filaments or not (args.check_materials and not args.check_filaments):
-            errors_found += check_filament_compatible_printers(vendor_path / "filament")
-
-        if args.check_materials:
-            new_errors, new_warnings = check_machine_default_materials(profiles_dir, vendor_name)
-            errors_found += new_errors
-            warnings_found += new_warnings
-
-        if args.check_obsolete_keys:
-            warnings_found += check_obsolete_keys(profiles_dir, vendor_name)
-
-        new_errors, new_warnings = check_filament_name_consistency(profiles_dir, vendor_name)
+    if args.vendor:
+        vendor_names = [args.vendor]
+    else:
+        vendor_names = [v for v in corpus.vendor_names() if v != "OrcaFilamentLibrary"]
+
+    start = time.perf_counter()
+    cache = None
+    vendor_results = {}
+    vendors_to_check = vendor_names
+    if args.incremental:
+        cache = ProfileCheckCache(args.cache_dir, checker_cache_key(args))
+        if not cache.load():
+            print("Profile check cache is missing or outdated, checking all vendors", file=sys.stderr)
+        changed, files = cache.changed_files(corpus, corpus.vendor_names())
+        affected = cache.affected_vendors(corpus, changed, library_dependents=args.check_materials)
+        vendor_results = {v: result for v, result in cache.vendors.items() if v not in affected}
+        vendors_to_check = [v for v in vendor_names if v not in vendor_results]
+        # Unchanged files of re-checked vendors are not parsed again
+        for vendor_name in sorted(affected.union(vendors_to_check)):
+            for profile_file in cache.load_parsed(vendor_name, files):
+                corpus.add(profile_file)
+
+    if (args.check_materials or args.check_printer_names) and len(vendors_to_check) > 1:
+        # When checking several vendors, an up to date graph persisted by
+        # orca_profile_graph.py saves parsing the files only needed for their
+        # references. It is never built here: without it, every vendor builds
+        # the graph of the vendors its checks need (see reference_graph).
+        saved_graph = ReferenceGraph.load(args.cache_dir / "reference_graph.json")
+        if saved_graph is not None and saved_graph.is_current(corpus):
+            _reference_graph = saved_graph
+
+    jobs = min(args.jobs or os.cpu_count() or 1, len(vendors_to_check))
+    profiler = None
+    if args.profile_dump is not None:
+        # cProfile only sees the current process
+        jobs = min(jobs, 1)
+        profiler = cProfile.Profile()
+        profiler.enable()
+    results = check_vendors(corpus, vendors_to_check, args, jobs)
+    for vendor_name in vendor_names:
+        if vendor_name not in vendor_results:
+            _, output, new_errors, new_warnings, new_findings, seconds, profile = next(results)
+            vendor_results[vendor_name] = [output, new_errors, new_warnings, new_findings]
+            vendor_times[vendor_name] = seconds
+            if profile is not None:
+                vendor_profiles[vendor_name] = profile
+        # Printing in vendor order keeps the output identical for any --jobs
+        # value and for cached results.
+        output, new_errors, new_warnings, new_findings = vendor_results[vendor_name]
+        if text_output:
+            sys.stdout.write(output)
+        # Cached findings come back from JSON as lists
+        findings.extend(Finding(*finding) for finding in new_findings)
         errors_found += new_errors
         warnings_found += new_warnings
-
-        errors_found += check_filament_id(vendor_name, vendor_path / "filament")
         checked_vendor_count += 1
 
-    if args.vendor:
-        run_checks(args.vendor)
-    else:
-        for vendor_dir in profiles_dir.iterdir():
-            if not vendor_dir.is_dir() or vendor_dir.name == "OrcaFilamentLibrary":
-                continue
-            run_checks(vendor_dir.name)
-
-    # ✨ Output finale in stile "compilatore"
-    print("\n==================== SUMMARY ====================")
-    print_info(f"Checked vendors     : {checked_vendor_count}")
-    if errors_found > 0:
-        print_error(f"Files with errors   : {errors_found}")
-    else:
-        print_success("Files with errors   : 0")
-    if warnings_found > 0:
-        print_warning(f"Files with warnings : {warnings_found}")
-    else:
-        print_success("Files with warnings : 0")
-    print("=================================================")
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.profile_dump)
+
+    if cache is not None:
+        cache.save(corpus, files, vendor_results, sorted(affected.union(vendors_to_check)))
+    elapsed = time.perf_counter() - start
+
+    if text_output:
+        # ✨ Output finale in stile "compilatore"
+        print("\n==================== SUMMARY ====================")
+        print_info(f"Checked vendors     : {checked_vendor_count}")
+        if errors_found > 0:
+            print_error(f"Files with errors   : {errors_found}")
+        else:
+            print_success("Files with errors   : 0")
+        if warnings_found > 0:
+            print_warning(f"Files with warnings : {warnings_found}")
+        else:
+            print_success("Files with warnings : 0")
+        print("=================================================")
+
+    if args.format != "text":
+        # The report is built in memory and written at once
+        report = io.StringIO()
+        summary = {'vendors': checked_vendor_count, 'errors': errors_found, 'warnings': warnings_found}
+        if args.format == "json":
+            write_json(findings, summary, report)
+        elif args.format == "sarif":
+            write_sarif(findings, summary, report)
+        else:
+            write_junit(findings, report, vendor_names, [check.__name__ for check, _ in enabled_checks(args)])
+        if args.output is not None:
+            with open(args.output, 'w', encoding='UTF-8') as fp:
+                fp.write(report.getvalue())
+        else:
+            sys.stdout.write(report.getvalue())
+
+    # Timings go to stderr so that stdout is identical for any --jobs value
+    sys.stdout.flush()
+    slowest = sorted(vendor_times.items(), key=lambda item: item[1], reverse=True)[:5]
+    print(f"Checked in {elapsed:.2f}s with {max(jobs, 1)} job(s), "
+          f"{sum(vendor_times.values()):.2f}s total vendor time", file=sys.stderr)
+    if cache is not None:
+        print(f"Re-checked {len(vendors_to_check)} vendor(s), "
+              f"{len(vendor_names) - len(vendors_to_check)} from cache", file=sys.stderr)
+    if slowest:
+        print("Slowest vendors: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in slowest),
+              file=sys.stderr)
+    if args.profile:
+        report = profile_report(vendor_profiles, vendor_times, elapsed, max(jobs, 1))
+        print_profile_report(report)
+        if args.profile_json is not None:
+            with open(args.profile_json, 'w', encoding='UTF-8') as fp:
+                json.dump(report, fp, indent=4)
+        if args.profile_dump is not None:
+            print(f"cProfile statistics written to {args.profile_dump}", file=sys.stderr)
+
+    if args.watch:
+        watch_profiles(corpus, vendor_names, vendor_results, args)
+        exit(0)
 
     exit(-1 if errors_found > 0 else 0)
 
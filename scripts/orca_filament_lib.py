@@ -1,65 +1,127 @@
+import io
 import os
+import sys
+import copy
 import json
+import difflib
+import time
 import argparse
-from collections import defaultdict
+import contextlib
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
-def topological_sort(filaments):
-    # Build a graph of dependencies
-    graph = defaultdict(list)
-    in_degree = defaultdict(int)
+from orca_profile_resolver import ProfileResolver
+
+# The resources/profiles directory relative to this script
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+LIBRARY_VENDOR = "OrcaFilamentLibrary"
+
+# <vendor>.json list -> (profile sub directory, profile type in that directory excluded from the list)
+PROFILE_LISTS = {
+    'filament_list': ('filament', None),
+    'machine_list': ('machine', 'machine_model'),
+    'process_list': ('process', None),
+}
+
+def topological_sort(filaments, external_parents=()):
+    """
+    Order filament profiles so that every profile comes after the profile it inherits from.
+
+    Roots of inheritance trees are processed in alphabetical order, then their
+    descendants breadth first with the children of each profile in alphabetical
+    order. Profiles outside any inheritance tree follow in alphabetical order,
+    and profiles stuck in an inheritance cycle come last. Runs in O(n log n).
+
+    Parameters:
+        filaments (list): Dicts with 'name' and optionally 'inherits'
+        external_parents (set, optional): Names of profiles outside the list that
+            may be inherited from, e.g. OrcaFilamentLibrary profiles for a vendor
+
+    Returns:
+        list: The filaments in inheritance order
+        list: Inheritance cycles, each a list of names starting with the smallest
+        list: (name, parent) of profiles whose parent exists neither in the list
+            nor in external_parents
+    """
     name_to_filament = {f['name']: f for f in filaments}
-    all_names = set(name_to_filament.keys())
-    
-    # Create the dependency graph
-    processed_files = set()
-    for filament in filaments:
-        if 'inherits' in filament:
-            parent = filament['inherits']
-            child = filament['name']
-            # Only create dependency if parent exists
-            if parent in all_names:
-                graph[parent].append(child)
-                in_degree[child] += 1
-                if parent not in in_degree:
-                    in_degree[parent] = 0
-                processed_files.add(child)
-                processed_files.add(parent)
-
-    # Initialize queue with nodes having no dependencies (now sorted)
-    queue = sorted([name for name, degree in in_degree.items() if degree == 0])
+    children = defaultdict(list)
+    parent_of = {}
+    orphans = []
+
+    for name, filament in name_to_filament.items():
+        parent = filament.get('inherits')
+        if not parent:
+            continue
+        if parent in name_to_filament:
+            children[parent].append(name)
+            parent_of[name] = parent
+        elif parent not in external_parents:
+            orphans.append((name, parent))
+
+    in_tree = set(parent_of).union(children)
+    queue = deque(sorted(name for name in in_tree if name not in parent_of))
     result = []
+    visited = set()
 
-    # Process the queue
+    # Every profile has at most one parent, so a child is ready as soon as its
+    # parent has been emitted.
     while queue:
-        current = queue.pop(0)
+        current = queue.popleft()
         result.append(name_to_filament[current])
-        processed_files.add(current)
-        
-        # Process children (now sorted)
-        children = sorted(graph[current])
-        for child in children:
-            in_degree[child] -= 1
-            if in_degree[child] == 0:
-                queue.append(child)
+        visited.add(current)
+        queue.extend(sorted(children[current]))
 
     # Add remaining files that weren't part of inheritance tree (now sorted)
-    remaining = sorted(all_names - processed_files)
-    for name in remaining:
+    for name in sorted(name_to_filament.keys() - in_tree):
         result.append(name_to_filament[name])
 
-    return result
+    # Whatever is left is in a cycle or descends from one
+    stuck = sorted(in_tree - visited)
+    cycles = []
+    seen = set()
+    for name in stuck:
+        path = []
+        on_path = set()
+        current = name
+        while current not in seen and current not in on_path:
+            path.append(current)
+            on_path.add(current)
+            current = parent_of[current]
+        if current in on_path:
+            cycle = path[path.index(current):]
+            start = cycle.index(min(cycle))
+            cycles.append(cycle[start:] + cycle[:start])
+        seen.update(path)
+    for name in stuck:
+        result.append(name_to_filament[name])
 
-def update_filament_library(vendor="OrcaFilamentLibrary"):
-    # change current working directory to the relative path(..\resources\profiles) compare to script location
-    os.chdir(os.path.join(os.path.dirname(__file__), '..', 'resources', 'profiles'))
+    return result, cycles, sorted(orphans)
 
-    # Collect current filament entries
-    current_filaments = []
-    base_dir = vendor
-    filament_dir = os.path.join(base_dir, 'filament')
-    
-    for root, dirs, files in os.walk(filament_dir):
-        for file in files:
+def report_broken_inheritance(vendor, profiles, library_filaments=()):
+    # Profiles whose parent is missing or whose inherits chain loops are not
+    # loadable by the slicer, and neither are their descendants. Parents may
+    # come from OrcaFilamentLibrary.
+    fallback = None
+    if library_filaments:
+        fallback = ProfileResolver({f['name']: f for f in library_filaments})
+    resolver = ProfileResolver(
+        {p['name']: p for p in profiles},
+        paths={p['name']: p['sub_path'] for p in profiles},
+        fallback=fallback,
+    )
+    for profile in profiles:
+        error = resolver.error(profile['name'])
+        if error is not None:
+            print(f"Warning: {vendor}: {profile['name']}: {error}")
+
+def collect_profiles(base_dir, profile_dir, skip_type=None):
+    # Collect the name, sub_path and inherits of every profile below base_dir/profile_dir
+    current_profiles = []
+
+    for root, dirs, files in os.walk(os.path.join(base_dir, profile_dir)):
+        # Sorted, so that the profile kept for a duplicate name does not depend on the file system
+        dirs.sort()
+        for file in sorted(files):
             if file.lower().endswith('.json'):
                 full_path = os.path.join(root, file)
                 
@@ -68,10 +130,12 @@ def update_filament_library(vendor="OrcaFilamentLibrary"):
                 
                 try:
                     with open(full_path, 'r', encoding='utf-8') as f:
-                        filament_data = json.load(f)
-                        name = filament_data.get('name')
-                        inherits = filament_data.get('inherits')
+                        profile_data = json.load(f)
+                        name = profile_data.get('name')
+                        inherits = profile_data.get('inherits')
                         
+                        if skip_type is not None and profile_data.get('type') == skip_type:
+                            continue
                         if name:
                             entry = {
                                 "name": name,
@@ -79,78 +143,262 @@ def update_filament_library(vendor="OrcaFilamentLibrary"):
                             }
                             if inherits:
                                 entry['inherits'] = inherits
-                            current_filaments.append(entry)
+                            current_profiles.append(entry)
                         else:
                             print(f"Warning: Missing 'name' in {full_path}")
                 except Exception as e:
                     print(f"Error reading {full_path}: {str(e)}")
                     continue
 
-    # Sort filaments based on inheritance
-    sorted_filaments = topological_sort(current_filaments)
-    
-    # Remove the inherits field as it's not needed in the final JSON
-    for filament in sorted_filaments:
-        filament.pop('inherits', None)
+    return current_profiles
+
+def collect_filaments(base_dir):
+    # Collect the name, sub_path and inherits of every filament profile of a vendor
+    return collect_profiles(base_dir, 'filament')
+
+def vendor_names(profiles_dir=PROFILES_DIR):
+    # Vendors are the directories with a <vendor>.json next to them
+    return sorted(
+        entry.name for entry in os.scandir(profiles_dir)
+        if entry.is_dir() and os.path.isfile(os.path.join(profiles_dir, entry.name + '.json'))
+    )
+
+def write_if_changed(path, data):
+    """
+    Atomically replace a file's content, unless it already has exactly this content.
+
+    Parameters:
+        path (str): File to write
+        data (bytes): New content
+
+    Returns:
+        bool: Whether the file was written; an unchanged file keeps its mtime
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def update_vendor_library(vendor, list_names=('filament_list',), library_filaments=(), profiles_dir=PROFILES_DIR):
+    """
+    Rebuild profile lists of <vendor>.json from the vendor's profile files.
+
+    Does not change the working directory, so vendors can be updated in parallel.
+    The file is only rewritten if one of the lists changed: other keys and the
+    formatting of an up to date file are left alone.
+
+    Parameters:
+        vendor (str): Vendor name
+        list_names (tuple): Lists to rebuild, keys of PROFILE_LISTS
+        library_filaments (list): The OrcaFilamentLibrary filaments as collected by
+            collect_filaments, which vendor filaments may inherit from
+        profiles_dir (str): The resources/profiles directory
+
+    Returns:
+        bool: Whether <vendor>.json was rewritten
+    """
+    base_dir = os.path.join(profiles_dir, vendor)
+    lib_path = base_dir + '.json'
+    with open(lib_path, 'r', encoding='utf-8') as f:
+        library = json.load(f)
+
+    modified = False
+    for list_name in list_names:
+        profile_dir, skip_type = PROFILE_LISTS[list_name]
+        current_profiles = collect_profiles(base_dir, profile_dir, skip_type)
+        if not current_profiles and list_name not in library:
+            continue
+
+        parents = library_filaments if list_name == 'filament_list' and vendor != LIBRARY_VENDOR else ()
+        report_broken_inheritance(vendor, current_profiles, parents)
+
+        # Sort profiles based on inheritance
+        sorted_profiles, _, _ = topological_sort(current_profiles, {f['name'] for f in parents})
+
+        # Remove the inherits field as it's not needed in the final JSON
+        for profile in sorted_profiles:
+            profile.pop('inherits', None)
+
+        if library.get(list_name) != sorted_profiles:
+            library[list_name] = sorted_profiles
+            modified = True
+
+    if not modified:
+        return False
+    return write_if_changed(lib_path, json.dumps(library, indent=4, ensure_ascii=False).encode('utf-8'))
+
+def _update_vendor_captured(vendor, list_names, library_filaments, profiles_dir):
+    # Worker of update_all_vendors: buffers the output so that it is printed in vendor order
+    output = io.StringIO()
+    written = False
+    with contextlib.redirect_stdout(output):
+        try:
+            written = update_vendor_library(vendor, list_names, library_filaments, profiles_dir)
+        except Exception as e:
+            print(f"Error updating library file of {vendor}: {str(e)}")
+    return output.getvalue(), written
+
+def update_all_vendors(list_names=('filament_list',), jobs=0, profiles_dir=PROFILES_DIR):
+    """
+    Rebuild profile lists of every <vendor>.json, vendors in parallel.
+
+    Parameters:
+        list_names (tuple): Lists to rebuild, keys of PROFILE_LISTS
+        jobs (int): Number of vendors updated in parallel, 0 to use all cores
+        profiles_dir (str): The resources/profiles directory
+
+    Returns:
+        list: Vendors whose <vendor>.json was rewritten
+    """
+    start = time.perf_counter()
+    vendors = vendor_names(profiles_dir)
+    library_filaments = collect_filaments(os.path.join(profiles_dir, LIBRARY_VENDOR))
+    jobs = min(jobs or os.cpu_count() or 1, len(vendors))
+
+    arguments = (vendors, [list_names] * len(vendors), [library_filaments] * len(vendors), [profiles_dir] * len(vendors))
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(_update_vendor_captured, *arguments))
+    else:
+        results = list(map(_update_vendor_captured, *arguments))
+
+    updated = []
+    for vendor, (output, written) in zip(vendors, results):
+        sys.stdout.write(output)
+        if written:
+            print(f"Updated {vendor}.json")
+            updated.append(vendor)
+
+    print(f"Updated {len(updated)} of {len(vendors)} vendor libraries in {time.perf_counter() - start:.2f}s "
+          f"with {jobs} job(s)", file=sys.stderr)
+    return updated
+
+def update_filament_library(vendor="OrcaFilamentLibrary"):
+    library_filaments = []
+    if vendor != LIBRARY_VENDOR:
+        library_filaments = collect_filaments(os.path.join(PROFILES_DIR, LIBRARY_VENDOR))
 
-    # Update library file
-    lib_path = f'{vendor}.json'
-    
     try:
-        with open(lib_path, 'r+', encoding='utf-8') as f:
-            library = json.load(f)
-            library['filament_list'] = sorted_filaments
-            f.seek(0)
-            json.dump(library, f, indent=4, ensure_ascii=False)
-            f.truncate()
-            
-        print(f"Filament library for {vendor} updated successfully!")
+        if update_vendor_library(vendor, ('filament_list',), library_filaments):
+            print(f"Filament library for {vendor} updated successfully!")
+        else:
+            print(f"Filament library for {vendor} is up to date")
     except Exception as e:
         print(f"Error updating library file: {str(e)}")
 
 
-# For each JSON file, it will:
-#    - Replace "BBL X1C" with "System" in the name field
-#    - Empty the compatible_printers array
-#    - Ensure setting_id starts with 'O'
-def rename_filament_system(vendor="OrcaFilamentLibrary"):
-    # change current working directory to the relative path
-    os.chdir(os.path.join(os.path.dirname(__file__), '..', 'resources', 'profiles'))
-    
-    base_dir = vendor
-    filament_dir = os.path.join(base_dir, 'filament')
-    
+def rename_bbl_x1c(data):
+    # Replace "BBL X1C" with "System" in the name field
+    if 'name' in data and "BBL X1C" in data['name']:
+        data['name'] = data['name'].replace("BBL X1C", "System")
+
+def empty_compatible_printers(data):
+    # Empty the compatible_printers array
+    if 'compatible_printers' in data:
+        data['compatible_printers'] = []
+
+def prefix_setting_id(data):
+    # Ensure setting_id starts with 'O'
+    if 'setting_id' in data and not data['setting_id'].startswith('O'):
+        data['setting_id'] = 'O' + data['setting_id']
+
+RENAME_TRANSFORMS = (rename_bbl_x1c, empty_compatible_printers, prefix_setting_id)
+
+def transform_profile(path, transforms):
+    """
+    Apply transforms to a copy of a profile.
+
+    Parameters:
+        path (str): Profile file
+        transforms (tuple): Functions modifying the parsed profile in place
+
+    Returns:
+        str: The current content of the file
+        str or None: The new content, None if the transforms did not change
+            the profile (e.g. compatible_printers was already empty)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    data = json.loads(text)
+    original = copy.deepcopy(data)
+    for transform in transforms:
+        transform(data)
+    if data == original:
+        return text, None
+    return text, json.dumps(data, indent=4, ensure_ascii=False)
+
+def _transform_file(path, transforms, dry_run, profiles_dir):
+    # Worker of transform_profiles, returns whether the file changed and the output for it
+    display_path = os.path.relpath(path, profiles_dir).replace('\\', '/')
+    try:
+        text, new_text = transform_profile(path, transforms)
+        if new_text is None:
+            return False, ''
+        if dry_run:
+            diff = difflib.unified_diff(
+                text.splitlines(), new_text.splitlines(), f'a/{display_path}', f'b/{display_path}', lineterm=''
+            )
+            return True, ''.join(line + '\n' for line in diff)
+        write_if_changed(path, new_text.encode('utf-8'))
+        return True, f"Updated {display_path}\n"
+    except Exception as e:
+        return False, f"Error processing {display_path}: {str(e)}\n"
+
+def transform_profiles(paths, transforms, dry_run=False, jobs=0, profiles_dir=PROFILES_DIR):
+    """
+    Apply transforms to profile files in a process pool and write the changed ones.
+
+    Only files whose parsed content changes are rewritten, atomically. The
+    output (written files, unified diffs for a dry run, errors) is printed in
+    the order of `paths`.
+
+    Parameters:
+        paths (list): Profile files
+        transforms (tuple): Module level functions modifying a parsed profile in place
+        dry_run (bool): Print unified diffs instead of writing
+        jobs (int): Number of worker processes, 0 to use all cores
+        profiles_dir (str): Directory the printed paths are relative to
+
+    Returns:
+        int: Number of changed files
+    """
+    jobs = min(jobs or os.cpu_count() or 1, max(len(paths), 1))
+    arguments = (paths, [transforms] * len(paths), [dry_run] * len(paths), [profiles_dir] * len(paths))
+    changed = 0
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            # Files are small, batches keep the inter-process overhead low
+            results = pool.map(_transform_file, *arguments, chunksize=max(1, len(paths) // (jobs * 8)))
+            for file_changed, output in results:
+                sys.stdout.write(output)
+                changed += file_changed
+    else:
+        for file_changed, output in map(_transform_file, *arguments):
+            sys.stdout.write(output)
+            changed += file_changed
+    return changed
+
+def rename_filament_system(vendor="OrcaFilamentLibrary", dry_run=False, jobs=0):
+    # For each filament JSON file of the vendor, apply RENAME_TRANSFORMS
+    filament_dir = os.path.join(PROFILES_DIR, vendor, 'filament')
+    paths = []
     for root, dirs, files in os.walk(filament_dir):
-        for file in files:
+        dirs.sort()
+        for file in sorted(files):
             if file.lower().endswith('.json'):
-                full_path = os.path.join(root, file)
-                try:
-                    with open(full_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        modified = False
-                        
-                        # Update name if it contains "BBL X1C"
-                        if 'name' in data and "BBL X1C" in data['name']:
-                            data['name'] = data['name'].replace("BBL X1C", "System")
-                            modified = True
-                            
-                        # Empty compatible_printers if exists
-                        if 'compatible_printers' in data:
-                            data['compatible_printers'] = []
-                            modified = True
-                            
-                        # Update setting_id if needed
-                        if 'setting_id' in data and not data['setting_id'].startswith('O'):
-                            data['setting_id'] = 'O' + data['setting_id']
-                            modified = True
-                        
-                        if modified:
-                            with open(full_path, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, indent=4, ensure_ascii=False)
-                            print(f"Updated {full_path}")
-                            
-                except Exception as e:
-                    print(f"Error processing {full_path}: {str(e)}")
+                paths.append(os.path.join(root, file))
+
+    changed = transform_profiles(paths, RENAME_TRANSFORMS, dry_run, jobs)
+    print(f"{changed} of {len(paths)} filament profiles of {vendor} {'would change' if dry_run else 'changed'}",
+          file=sys.stderr)
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Update filament library for specified vendor')
@@ -158,9 +406,20 @@ if __name__ == '__main__':
                       help='Vendor name (default: OrcaFilamentLibrary)')
     parser.add_argument('-m', '--mode', type=str, choices=['update', 'rename'],
                       default='update', help='Operation mode (default: update)')
+    parser.add_argument('-a', '--all-vendors', action='store_true',
+                      help='Update the lists of every vendor, only files whose lists changed are written (update mode)')
+    parser.add_argument('-l', '--lists', nargs='+', choices=['filament', 'machine', 'process'], default=['filament'],
+                      help='Lists to rebuild with --all-vendors (default: filament)')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                      help='Number of vendors (update --all-vendors) or files (rename) processed in parallel, '
+                           '0 to use all cores (default: 0)')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                      help='Print the changes as unified diffs instead of writing them (rename mode)')
     args = parser.parse_args()
     
-    if args.mode == 'update':
+    if args.mode == 'update' and args.all_vendors:
+        update_all_vendors(tuple(f'{name}_list' for name in args.lists), args.jobs)
+    elif args.mode == 'update':
         update_filament_library(args.vendor)
     else:
-        rename_filament_system(args.vendor)
\ No newline at end of file
+        rename_filament_system(args.vendor, args.dry_run, args.jobs)
\ No newline at end of file
@@ -0,0 +1,62 @@
+from collections import Counter, defaultdict
+
+
+class NgramIndex:
+    """
+    A set of names that also finds the closest names to an unknown one.
+
+    Membership is a plain set lookup. Suggestions come from an inverted
+    index of the character n-grams of the names: only names sharing at least
+    one n-gram with the query are scored, by the Dice coefficient of their
+    n-gram sets, so a lookup does not compare the query with every name.
+    """
+
+    def __init__(self, names, n=3):
+        """
+        Parameters:
+            names (iterable): Names to index
+            n (int): n-gram length
+        """
+        self.n = n
+        self.names = set(names)
+        self._sorted_names = sorted(self.names)
+        self._sizes = []
+        self._postings = defaultdict(list)
+        for name_id, name in enumerate(self._sorted_names):
+            grams = self._ngrams(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(name_id)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    def _ngrams(self, name):
+        # Case-insensitive; padding makes the start and end of a name count
+        padded = f" {name.lower()} "
+        return {padded[i:i + self.n] for i in range(max(len(padded) - self.n + 1, 1))}
+
+    def suggest(self, name, limit=1, threshold=0.5):
+        """
+        The indexed names closest to `name`.
+
+        Parameters:
+            name (str): Name to look up
+            limit (int): Maximum number of suggestions
+            threshold (float): Minimum Dice similarity (0 to 1) of a suggestion
+
+        Returns:
+            list: Names, most similar first (ties in name order)
+        """
+        grams = self._ngrams(name)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        scored = sorted(
+            (-2 * count / (len(grams) + self._sizes[name_id]), self._sorted_names[name_id])
+            for name_id, count in shared.items()
+        )
+        return [candidate for score, candidate in scored[:limit] if -score >= threshold]
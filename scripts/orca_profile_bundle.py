@@ -0,0 +1,547 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+from array import array
+
+from orca_profile_corpus import PROFILE_TYPES, ProfileCorpus
+from orca_profile_resolver import ProfileResolver
+
+BUNDLE_MAGIC = b'ORCAPRB\0'
+BUNDLE_VERSION = 1
+LIBRARY_VENDOR = "OrcaFilamentLibrary"
+
+# Sections of u32 words, except string_data. Each is 4-byte aligned.
+SECTIONS = ("string_offsets", "string_data", "values", "pairs", "profiles", "name_index", "setting_id_index")
+# u32 fields of a profile record. String fields hold string ids, parent a
+# profile index, the *_start fields word offsets into pairs.
+PROFILE_FIELDS = ("vendor", "type", "name", "setting_id", "path", "parent", "error",
+                  "own_start", "own_count", "resolved_start", "resolved_count")
+NONE = 0xFFFFFFFF
+_FIELD_OFFSETS = {field: offset for offset, field in enumerate(PROFILE_FIELDS)}
+
+# Value tags, in the low two bits of a value's first word; the other bits
+# hold the number of string ids that follow
+TAG_STRING = 0
+TAG_LIST = 1
+TAG_JSON = 2
+
+_HEADER = struct.Struct('<8sIII' + 'II' * len(SECTIONS))
+
+
+class BundleError(ValueError):
+    """
+    Raised for a file that is not a profile bundle of a supported version.
+    """
+
+
+def _relative_path(corpus, profile_file):
+    # Path below resources/profiles with forward slashes, as stored in the bundle
+    return str(profile_file.path)[len(str(corpus.profiles_dir)) + 1:].replace(os.sep, '/')
+
+
+def library_resolvers(corpus):
+    """
+    The resolvers of the OrcaFilamentLibrary profiles, the fallback of all vendors.
+
+    Parameters:
+        corpus (ProfileCorpus): Profiles to resolve
+
+    Returns:
+        dict: ProfileResolver by profile type
+    """
+    library = {}
+    for profile_type in PROFILE_TYPES:
+        files = [f for f in corpus.files(LIBRARY_VENDOR, profile_type) if f.name is not None]
+        library[profile_type] = ProfileResolver(
+            {f.name: f.data for f in files}, paths={f.name: _relative_path(corpus, f) for f in files}
+        )
+    return library
+
+
+def iter_resolved(corpus, vendors=None, library=None):
+    """
+    Yield every parseable machine, filament and process profile with its resolver.
+
+    Parents are looked up in the profile's vendor and type first, then in the
+    OrcaFilamentLibrary profiles of the same type, like the slicer does.
+
+    Parameters:
+        corpus (ProfileCorpus): Profiles to resolve
+        vendors (list, optional): Only yield the profiles of these vendors (default: all)
+        library (dict, optional): Library resolvers to reuse across calls, see library_resolvers
+
+    Yields:
+        tuple: (vendor, profile_type, ProfileFile, ProfileResolver)
+    """
+    if library is None:
+        library = library_resolvers(corpus)
+
+    for vendor in corpus.vendor_names() if vendors is None else vendors:
+        for profile_type in PROFILE_TYPES:
+            files = [f for f in corpus.files(vendor, profile_type) if f.name is not None]
+            if vendor == LIBRARY_VENDOR:
+                resolver = library[profile_type]
+            else:
+                resolver = ProfileResolver(
+                    {f.name: f.data for f in files}, paths={f.name: _relative_path(corpus, f) for f in files},
+                    fallback=library[profile_type],
+                )
+            for profile_file in files:
+                yield vendor, profile_type, profile_file, resolver
+
+
+class _BundleWriter:
+    # Interns strings and values while the profiles are added
+
+    def __init__(self):
+        self.strings = {}
+        self.values = array('I')
+        self.value_offsets = {}
+        self.pairs = array('I')
+        self.records = []
+
+    def string(self, text):
+        if text is None:
+            return NONE
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = self.strings[text] = len(self.strings)
+        return string_id
+
+    def value(self, value):
+        if isinstance(value, str):
+            key = (TAG_STRING, value)
+        elif isinstance(value, list) and all(isinstance(element, str) for element in value):
+            key = (TAG_LIST, tuple(value))
+        else:
+            key = (TAG_JSON, json.dumps(value, ensure_ascii=False))
+
+        offset = self.value_offsets.get(key)
+        if offset is None:
+            offset = self.value_offsets[key] = len(self.values)
+            tag, payload = key
+            payload = payload if tag == TAG_LIST else (payload,)
+            self.values.append(len(payload) << 2 | tag)
+            self.values.extend(self.string(text) for text in payload)
+        return offset
+
+    def settings(self, settings):
+        start = len(self.pairs)
+        for key, value in settings.items():
+            self.pairs.append(self.string(key))
+            self.pairs.append(self.value(value))
+        return start, len(settings)
+
+    def serialize(self):
+        encoded = [text.encode('UTF-8') for text in self.strings]
+        string_offsets = array('I', [0])
+        for data in encoded:
+            string_offsets.append(string_offsets[-1] + len(data))
+        string_data = b''.join(encoded)
+
+        profiles = array('I')
+        for record in self.records:
+            profiles.extend(record)
+        names = [text.encode('UTF-8') for text in self.strings]
+        name_index = array('I', sorted(range(len(self.records)), key=lambda i: names[self.records[i][2]]))
+        setting_id_index = array('I', sorted(
+            (i for i in range(len(self.records)) if self.records[i][3] != NONE),
+            key=lambda i: names[self.records[i][3]],
+        ))
+
+        sections = []
+        for section in (string_offsets, string_data, self.values, self.pairs, profiles, name_index, setting_id_index):
+            if isinstance(section, array):
+                if sys.byteorder != 'little':
+                    section = array('I', section)
+                    section.byteswap()
+                section = section.tobytes()
+            sections.append(section + b'\0' * (-len(section) % 4))
+
+        offset = _HEADER.size
+        layout = []
+        for section in sections:
+            layout.extend((offset, len(section)))
+            offset += len(section)
+        header = _HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(self.records), len(self.strings), *layout)
+        return header + b''.join(sections)
+
+
+def build_bundle(profiles_dir, output_path):
+    """
+    Compile all machine, filament and process profiles into one bundle file.
+
+    The bundle holds a string table (every key and string value once), the
+    deduplicated values, every profile's own settings and its settings with
+    inheritance resolved, and indexes by name and setting_id. Profiles that
+    cannot be parsed are left out.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        output_path (str): Bundle file, replaced atomically
+
+    Returns:
+        int: Number of profiles in the bundle
+        int: Size of the bundle in bytes
+    """
+    corpus = ProfileCorpus(profiles_dir)
+    writer = _BundleWriter()
+
+    profiles = list(iter_resolved(corpus))
+    index_of = {}
+    for index, (vendor, profile_type, profile_file, resolver) in enumerate(profiles):
+        index_of[(vendor, profile_type, profile_file.name)] = index
+
+    for vendor, profile_type, profile_file, resolver in profiles:
+        data = profile_file.data
+        parent = data.get('inherits')
+        parent_index = NONE
+        if parent:
+            parent_index = index_of.get((vendor, profile_type, parent),
+                                        index_of.get((LIBRARY_VENDOR, profile_type, parent), NONE))
+        error = resolver.error(profile_file.name)
+        setting_id = data.get('setting_id')
+        own_start, own_count = writer.settings(data)
+        resolved_start, resolved_count = writer.settings(resolver.resolve(profile_file.name))
+        writer.records.append((
+            writer.string(vendor), writer.string(profile_type), writer.string(profile_file.name),
+            writer.string(setting_id if isinstance(setting_id, str) else None),
+            writer.string(_relative_path(corpus, profile_file)),
+            parent_index, writer.string(None if error is None else str(error)),
+            own_start, own_count, resolved_start, resolved_count,
+        ))
+
+    data = writer.serialize()
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as fp:
+        fp.write(data)
+    os.replace(tmp_path, output_path)
+    return len(writer.records), len(data)
+
+
+class BundledProfile:
+    """
+    A profile in a ProfileBundle, decoded lazily on attribute access.
+    """
+
+    __slots__ = ("bundle", "index")
+
+    def __init__(self, bundle, index):
+        self.bundle = bundle
+        self.index = index
+
+    def _field(self, field):
+        return self.bundle._profiles[self.index * len(PROFILE_FIELDS) + _FIELD_OFFSETS[field]]
+
+    def _string_field(self, field):
+        string_id = self._field(field)
+        return None if string_id == NONE else self.bundle.string(string_id)
+
+    @property
+    def name(self):
+        return self._string_field('name')
+
+    @property
+    def vendor(self):
+        return self._string_field('vendor')
+
+    @property
+    def profile_type(self):
+        return self._string_field('type')
+
+    @property
+    def setting_id(self):
+        return self._string_field('setting_id')
+
+    @property
+    def path(self):
+        """
+        Path relative to resources/profiles, with forward slashes.
+        """
+        return self._string_field('path')
+
+    @property
+    def error(self):
+        """
+        Why the inherits chain is broken, or None if it is complete.
+        """
+        return self._string_field('error')
+
+    @property
+    def parent(self):
+        """
+        The BundledProfile this profile inherits from, or None.
+        """
+        parent = self._field('parent')
+        return None if parent == NONE else BundledProfile(self.bundle, parent)
+
+    @property
+    def settings(self):
+        """
+        The settings of the profile file itself, as a new dict.
+        """
+        return self.bundle._settings(self._field('own_start'), self._field('own_count'))
+
+    @property
+    def resolved(self):
+        """
+        The settings including all inherited ones, as a new dict.
+        """
+        return self.bundle._settings(self._field('resolved_start'), self._field('resolved_count'))
+
+    def __repr__(self):
+        return f"BundledProfile({self.path})"
+
+
+class ProfileBundle:
+    """
+    Read-only access to a bundle built by `build_bundle`.
+
+    The file is memory-mapped and nothing is decoded up front: strings and
+    values are decoded (and cached) when a profile's fields are accessed, and
+    name and setting_id lookups are binary searches over the sorted indexes.
+    Values are shared between profiles, do not modify them.
+    """
+
+    def __init__(self, path):
+        # The header is checked before mapping, so a bad file leaves nothing open
+        with open(path, 'rb') as fp:
+            header = fp.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise BundleError("File is too short for a profile bundle")
+            magic, version, self.profile_count, string_count, *layout = _HEADER.unpack(header)
+            if magic != BUNDLE_MAGIC:
+                raise BundleError("Not a profile bundle")
+            if version != BUNDLE_VERSION:
+                raise BundleError(f"Unsupported profile bundle version {version}, expected {BUNDLE_VERSION}")
+            file_size = os.fstat(fp.fileno()).st_size
+            for name, offset, size in zip(SECTIONS, layout[::2], layout[1::2]):
+                if offset + size > file_size:
+                    raise BundleError(f"Truncated profile bundle, section {name} is incomplete")
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        sections = {}
+        for name, offset, size in zip(SECTIONS, layout[::2], layout[1::2]):
+            section = buffer[offset:offset + size]
+            if name != 'string_data':
+                if sys.byteorder == 'little':
+                    section = section.cast('I')
+                else:
+                    section = array('I', section.tobytes())
+                    section.byteswap()
+            sections[name] = section
+
+        self._string_offsets = sections['string_offsets']
+        self._string_data = sections['string_data']
+        self._values = sections['values']
+        self._pairs = sections['pairs']
+        self._profiles = sections['profiles']
+        self._name_index = sections['name_index']
+        self._setting_id_index = sections['setting_id_index']
+        self._strings = [None] * string_count
+        self._decoded_values = {}
+
+    def close(self):
+        # Views into the mapping must be released before it can be closed
+        for view in (self._string_offsets, self._string_data, self._values, self._pairs,
+                     self._profiles, self._name_index, self._setting_id_index):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.profile_count
+
+    def __iter__(self):
+        return (BundledProfile(self, index) for index in range(self.profile_count))
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.profile_count:
+            raise IndexError(index)
+        return BundledProfile(self, index)
+
+    def string(self, string_id):
+        text = self._strings[string_id]
+        if text is None:
+            start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            text = self._strings[string_id] = str(self._string_data[start:end], 'UTF-8')
+        return text
+
+    def _value(self, offset):
+        value = self._decoded_values.get(offset)
+        if value is None:
+            header = self._values[offset]
+            tag = header & 3
+            if tag == TAG_LIST:
+                value = [self.string(s) for s in self._values[offset + 1:offset + 1 + (header >> 2)]]
+            elif tag == TAG_STRING:
+                value = self.string(self._values[offset + 1])
+            else:
+                value = json.loads(self.string(self._values[offset + 1]))
+            self._decoded_values[offset] = value
+        return value
+
+    def _settings(self, start, count):
+        words = self._pairs[start:start + 2 * count]
+        # Cache hits inline, this runs once per key of every accessed profile
+        strings, values = self._strings, self._decoded_values
+        string, value = self.string, self._value
+        return dict(zip(
+            [strings[key] or string(key) for key in words[::2]],
+            [values[offset] if offset in values else value(offset) for offset in words[1::2]],
+        ))
+
+    def _search(self, index, field, text):
+        # Profiles whose string field equals text, from an index sorted by that field
+        target = text.encode('UTF-8')
+        field_offset = _FIELD_OFFSETS[field]
+        width = len(PROFILE_FIELDS)
+
+        def key(position):
+            return self.string(self._profiles[index[position] * width + field_offset]).encode('UTF-8')
+
+        low, high = 0, len(index)
+        while low < high:
+            middle = (low + high) // 2
+            if key(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        found = []
+        while low < len(index) and key(low) == target:
+            found.append(BundledProfile(self, index[low]))
+            low += 1
+        return found
+
+    def find(self, name, vendor=None, profile_type=None):
+        """
+        Profiles with a name, optionally restricted to a vendor and profile type.
+
+        Returns:
+            list: BundledProfile objects, in bundle order
+        """
+        found = self._search(self._name_index, 'name', name)
+        return sorted(
+            (p for p in found
+             if (vendor is None or p.vendor == vendor) and (profile_type is None or p.profile_type == profile_type)),
+            key=lambda p: p.index,
+        )
+
+    def by_setting_id(self, setting_id):
+        """
+        Profiles with a setting_id, in bundle order.
+        """
+        return sorted(self._search(self._setting_id_index, 'setting_id', setting_id), key=lambda p: p.index)
+
+
+def verify_bundle(bundle_path, profiles_dir):
+    """
+    Compare a bundle with the source JSON files.
+
+    Every parseable profile must be in the bundle with identical own and
+    resolved settings, parent and inheritance error, and must be found by its
+    name and setting_id.
+
+    Returns:
+        list: Descriptions of all differences, empty if the bundle is up to date
+    """
+    corpus = ProfileCorpus(profiles_dir)
+    problems = []
+    with ProfileBundle(bundle_path) as bundle:
+        bundled = {profile.path: profile for profile in bundle}
+        seen = set()
+        for vendor, profile_type, profile_file, resolver in iter_resolved(corpus):
+            path = _relative_path(corpus, profile_file)
+            seen.add(path)
+            profile = bundled.get(path)
+            if profile is None:
+                problems.append(f"{path}: missing from the bundle")
+                continue
+            if profile.settings != profile_file.data:
+                problems.append(f"{path}: settings differ")
+            if profile.resolved != resolver.resolve(profile_file.name):
+                problems.append(f"{path}: resolved settings differ")
+            error = resolver.error(profile_file.name)
+            if profile.error != (None if error is None else str(error)):
+                problems.append(f"{path}: inheritance error differs")
+            # The parent carries the inherits name, unless it is missing (an inheritance error)
+            parent = profile.parent
+            inherits = profile_file.data.get('inherits') or None
+            if (parent.name if parent else None) != inherits and not (parent is None and error is not None):
+                problems.append(f"{path}: parent differs")
+            if profile.index not in [p.index for p in bundle.find(profile_file.name)]:
+                problems.append(f"{path}: not found by name")
+            setting_id = profile_file.data.get('setting_id')
+            if isinstance(setting_id, str) and profile.index not in [p.index for p in bundle.by_setting_id(setting_id)]:
+                problems.append(f"{path}: not found by setting_id")
+        problems.extend(f"{path}: no longer a profile" for path in sorted(bundled.keys() - seen))
+    return problems
+
+
+def main():
+    default_profiles_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+    parser = argparse.ArgumentParser(description='Build, verify and query precompiled profile bundles')
+    parser.add_argument('--profiles-dir', default=default_profiles_dir,
+                        help='Profiles to compile or verify against (default: resources/profiles)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='Compile all profiles into a bundle')
+    build_parser.add_argument('bundle', nargs='?', default='orca_profiles.bundle', help='Output file (default: orca_profiles.bundle)')
+    verify_parser = subparsers.add_parser('verify', help='Check a bundle against the profile JSON files')
+    verify_parser.add_argument('bundle', nargs='?', default='orca_profiles.bundle')
+    show_parser = subparsers.add_parser('show', help='Print the resolved settings of profiles')
+    show_parser.add_argument('name', help='Profile name, or setting_id with --setting-id')
+    show_parser.add_argument('--setting-id', action='store_true', help='Look up by setting_id instead of name')
+    show_parser.add_argument('--vendor', help='Only profiles of this vendor')
+    show_parser.add_argument('-b', '--bundle', default='orca_profiles.bundle')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        count, size = build_bundle(args.profiles_dir, args.bundle)
+        print(f"Compiled {count} profiles into {args.bundle} ({size / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'verify':
+        start = time.perf_counter()
+        with ProfileBundle(args.bundle) as bundle:
+            opened = time.perf_counter()
+            count = sum(len(profile.resolved) > 0 for profile in bundle)
+            loaded = time.perf_counter()
+        print(f"Opened in {(opened - start) * 1000:.1f} ms, resolved all {count} profiles in "
+              f"{(loaded - opened) * 1000:.1f} ms")
+        problems = verify_bundle(args.bundle, args.profiles_dir)
+        for problem in problems:
+            print(problem)
+        if problems:
+            print(f"{len(problems)} difference(s), rebuild the bundle")
+            sys.exit(-1)
+        print("Bundle matches the profiles")
+    else:
+        with ProfileBundle(args.bundle) as bundle:
+            if args.setting_id:
+                profiles = [p for p in bundle.by_setting_id(args.name) if args.vendor in (None, p.vendor)]
+            else:
+                profiles = bundle.find(args.name, args.vendor)
+            for profile in profiles:
+                print(json.dumps({'path': profile.path, 'error': profile.error, 'resolved': profile.resolved},
+                                 indent=4, ensure_ascii=False))
+            if not profiles:
+                print(f"No profile found for {args.name}")
+                sys.exit(-1)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except (OSError, BundleError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(-1)
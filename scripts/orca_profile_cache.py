@@ -0,0 +1,236 @@
+import os
+import json
+import pickle
+import hashlib
+from pathlib import Path
+
+CACHE_VERSION = 2
+LIBRARY_VENDOR = "OrcaFilamentLibrary"
+
+
+def file_digest(path):
+    with open(path, 'rb') as fp:
+        return hashlib.sha1(fp.read()).hexdigest()
+
+
+class ProfileCheckCache:
+    """
+    On-disk state of the previous profile check, for incremental runs.
+
+    The cache directory holds:
+        index-<key>.json: one index per cache key, with the size, mtime, content hash, name and
+            parent of every profile file, the reverse-inheritance dependents of
+            every file, and the output and error/warning counts of every
+            checked vendor
+        parsed/<vendor>.pickle: the parsed profile files of a vendor with their
+            content hashes, shared by all keys
+
+    A vendor is re-checked when one of its files changed, or when it contains a
+    (transitive) dependent of a changed file. All other vendors replay their
+    cached output, so the output is identical to a full run.
+    """
+
+    def __init__(self, cache_dir, key):
+        """
+        Parameters:
+            cache_dir (Path): Directory holding the cache
+            key (str): Hash of everything besides the profiles that the results
+                depend on (check options, checker sources). Each key has its own
+                index, so runs with different options do not invalidate each other.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.key = key
+        self.index_path = self.cache_dir / f"index-{key[:16]}.json"
+        self.files = {}
+        self.dependents = {}
+        self.vendors = {}
+        self.valid = False
+
+    def load(self):
+        """
+        Load the cache index.
+
+        Returns:
+            bool: False if the cache is missing, unreadable or was written with
+                another key, in which case everything has to be checked
+        """
+        try:
+            with open(self.index_path, 'r', encoding='UTF-8') as fp:
+                index = json.load(fp)
+        except (OSError, ValueError):
+            return False
+        if index.get('version') != CACHE_VERSION or index.get('key') != self.key:
+            return False
+
+        self.files = index['files']
+        self.dependents = index['dependents']
+        self.vendors = index['vendors']
+        self.valid = True
+        return True
+
+    def changed_files(self, corpus, vendor_names):
+        """
+        Find files that were added, removed or modified since the cache was written.
+
+        Files whose size and mtime are unchanged are not read. Files whose content
+        hash is unchanged (e.g. after a checkout) count as unchanged.
+
+        Parameters:
+            corpus (ProfileCorpus): Profiles to compare against the cache
+            vendor_names (list): All vendors of the corpus
+
+        Returns:
+            set: Paths (as strings) of changed files
+            dict: Current [size, mtime_ns, digest, name, inherits] of every file;
+                name and inherits are None for changed files until `save`
+        """
+        changed = set()
+        current = {}
+        for vendor in vendor_names:
+            index_path = corpus.index_path(vendor)
+            paths = corpus.paths(vendor)
+            if index_path.is_file():
+                paths.append(str(index_path))
+            for path in paths:
+                stat = os.stat(path)
+                cached = self.files.get(path)
+                if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+                    current[path] = cached
+                    continue
+                digest = file_digest(path)
+                if cached and cached[2] == digest:
+                    current[path] = [stat.st_size, stat.st_mtime_ns] + cached[2:]
+                else:
+                    current[path] = [stat.st_size, stat.st_mtime_ns, digest, None, None]
+                    changed.add(path)
+
+        changed.update(set(self.files) - set(current))
+        return changed, current
+
+    def affected_vendors(self, corpus, changed, library_dependents=False):
+        """
+        Vendors that have to be re-checked.
+
+        Parameters:
+            corpus (ProfileCorpus): Profiles being checked
+            changed (set): Paths of changed files
+            library_dependents (bool): Whether every vendor depends on the
+                OrcaFilamentLibrary profile names (--check-materials)
+
+        Returns:
+            set: Vendor names
+        """
+        affected_paths = set()
+        pending = list(changed)
+        while pending:
+            path = pending.pop()
+            if path in affected_paths:
+                continue
+            affected_paths.add(path)
+            pending.extend(self.dependents.get(path, ()))
+
+        vendors = {self.vendor_of(corpus, path) for path in affected_paths}
+        if library_dependents and LIBRARY_VENDOR in vendors:
+            vendors.update(corpus.vendor_names())
+        return vendors
+
+    @staticmethod
+    def relative_parts(corpus, path):
+        # String operations, pathlib is slow for thousands of paths
+        return path[len(str(corpus.profiles_dir)) + 1:].split(os.sep)
+
+    def vendor_of(self, corpus, path):
+        parts = self.relative_parts(corpus, path)
+        if len(parts) == 1:
+            return os.path.splitext(parts[0])[0]
+        return parts[0]
+
+    def load_parsed(self, vendor, files):
+        """
+        The cached parsed files of a vendor whose content is unchanged.
+
+        Parameters:
+            vendor (str): Vendor name
+            files (dict): Current file entries, from `changed_files`
+
+        Returns:
+            list: ProfileFile objects, empty if the vendor is not cached
+        """
+        try:
+            with open(self.cache_dir / "parsed" / f"{vendor}.pickle", 'rb') as fp:
+                version, parsed = pickle.load(fp)
+        except Exception:
+            return []
+        # Parsed files are shared by all keys, their format only changes with the version
+        if version != CACHE_VERSION:
+            return []
+        return [
+            profile_file for digest, profile_file in parsed
+            if files.get(str(profile_file.path), [None] * 3)[2] == digest
+        ]
+
+    def save(self, corpus, files, vendor_results, parsed_vendors):
+        """
+        Write the cache.
+
+        Parameters:
+            corpus (ProfileCorpus): Profiles that were checked
+            files (dict): Current entries of every file, from `changed_files`
+            vendor_results (dict): Output, errors and warnings of every checked vendor
+            parsed_vendors (list): Vendors whose parsed files and file entries are
+                re-written; must include the vendors of all changed files
+        """
+        (self.cache_dir / "parsed").mkdir(parents=True, exist_ok=True)
+        for vendor in parsed_vendors:
+            parsed = []
+            for profile_file in corpus.files(vendor):
+                entry = files.get(str(profile_file.path))
+                if entry is None:
+                    continue
+                if isinstance(profile_file.data, dict):
+                    entry[3:5] = [profile_file.name, profile_file.data.get('inherits')]
+                parsed.append((entry[2], profile_file))
+            self._write(
+                self.cache_dir / "parsed" / f"{vendor}.pickle",
+                pickle.dumps((CACHE_VERSION, parsed), protocol=pickle.HIGHEST_PROTOCOL),
+            )
+
+        index = {
+            'version': CACHE_VERSION,
+            'key': self.key,
+            'files': files,
+            'dependents': self._build_dependents(corpus, files),
+            'vendors': vendor_results,
+        }
+        self._write(self.index_path, json.dumps(index).encode('UTF-8'))
+
+    def _build_dependents(self, corpus, files):
+        """
+        Map every file to the files whose `inherits` names it.
+
+        A parent is looked up in the child's vendor and profile type first, then
+        in the OrcaFilamentLibrary profiles of the same type, like the slicer does.
+        """
+        names = {}
+        for path, (_, _, _, name, inherits) in files.items():
+            relative = self.relative_parts(corpus, path)
+            if name is not None and len(relative) > 2:
+                names[(relative[0], relative[1], name)] = (path, inherits)
+
+        dependents = {}
+        for (vendor, profile_type, _), (path, inherits) in names.items():
+            if not inherits:
+                continue
+            parent = names.get((vendor, profile_type, inherits)) or names.get(
+                (LIBRARY_VENDOR, profile_type, inherits)
+            )
+            if parent is not None:
+                dependents.setdefault(parent[0], []).append(path)
+        return dependents
+
+    @staticmethod
+    def _write(path, data):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,293 @@
+import os
+import re
+import json
+import time
+from pathlib import Path
+
+PROFILE_TYPES = ("machine", "filament", "process")
+
+# A string (group 1), followed by a colon if it is a key (group 2), or a bracket
+_TOKEN = re.compile(r'("(?:[^"\\]|\\.)*")(\s*:)?|[{}\[\]]')
+
+
+def find_duplicate_keys(text):
+    """
+    Locate keys that appear more than once in one JSON object.
+
+    The text is tokenized with a single regular expression, so the cost is one
+    Python step per string and bracket. Only meant for text that is known to
+    contain duplicates, see `load_profile`.
+
+    Parameters:
+        text (str): Valid JSON
+
+    Returns:
+        list: (key, line, column) of every repeated key, 1-based, in file order
+    """
+    duplicates = []
+    # Keys seen in every enclosing object, None for arrays
+    stack = []
+    for match in _TOKEN.finditer(text):
+        token = match.group()
+        if token == '{':
+            stack.append(set())
+        elif token == '[':
+            stack.append(None)
+        elif token in '}]':
+            stack.pop()
+        elif match.group(2) is not None:
+            key = json.loads(match.group(1))
+            if key in stack[-1]:
+                start = match.start()
+                line = text.count('\n', 0, start) + 1
+                column = start - text.rfind('\n', 0, start)
+                duplicates.append((key, line, column))
+            stack[-1].add(key)
+    return duplicates
+
+
+class _DuplicateDetector:
+    # A JSON decoder whose object hook notes whether an object had duplicate
+    # keys. One instance is reused: creating a decoder per file, as
+    # `json.loads(text, object_pairs_hook=...)` does, costs as much as the hook.
+
+    def __init__(self):
+        self.found = False
+        self.decoder = json.JSONDecoder(object_pairs_hook=self.detect)
+
+    def detect(self, pairs):
+        obj = dict(pairs)
+        if len(obj) != len(pairs):
+            self.found = True
+        return obj
+
+    def decode(self, text):
+        self.found = False
+        return self.decoder.decode(text), self.found
+
+
+_detector = _DuplicateDetector()
+
+
+def load_profile(text):
+    """
+    Parse a profile like `json.loads`, and find its duplicate keys.
+
+    Objects are built with `dict` in C, and the object hook only compares the
+    length of each object to its number of pairs, so files without duplicates
+    (almost all) cost little more than a plain `json.loads`. Files with
+    duplicates are tokenized again to locate them. Not thread-safe; the check
+    script parallelizes with processes.
+
+    Parameters:
+        text (str): Content of a profile file
+
+    Returns:
+        The parsed content, keeping the last value of duplicate keys
+        list: (key, line, column) of every repeated key, in file order
+    """
+    data, has_duplicates = _detector.decode(text)
+    return data, find_duplicate_keys(text) if has_duplicates else []
+
+
+class ProfileFile:
+    """
+    A parsed profile JSON file.
+
+    Attributes:
+        path (Path): Location of the file
+        vendor (str): Vendor directory the file belongs to
+        profile_type (str or None): First sub directory below the vendor
+            (machine, filament, process), or None for the <vendor>.json index
+        data (dict or None): Parsed content, None if the file could not be parsed
+        duplicate_keys (list): (key, line, column) of keys that appear more than
+            once in one JSON object, in file order. `data` keeps the last value,
+            like `json.load`.
+        error (Exception or None): Error raised while reading or parsing the file
+    """
+
+    __slots__ = ("path", "vendor", "profile_type", "data", "duplicate_keys", "error")
+
+    def __init__(self, path, vendor, profile_type):
+        self.path = path
+        self.vendor = vendor
+        self.profile_type = profile_type
+        self.data = None
+        self.duplicate_keys = []
+        self.error = None
+
+        try:
+            with open(path, 'r', encoding='UTF-8') as fp:
+                self.data, self.duplicate_keys = load_profile(fp.read())
+        except Exception as e:
+            self.error = e
+
+    @property
+    def name(self):
+        return self.data.get('name') if isinstance(self.data, dict) else None
+
+    def strict_error(self):
+        """
+        The error a strict parse (rejecting duplicate keys) would raise, or None.
+        """
+        if self.error is not None:
+            return self.error
+        if self.duplicate_keys:
+            key, line, column = self.duplicate_keys[0]
+            return ValueError(f"Duplicate key detected: {key} (line {line}, column {column})")
+        return None
+
+
+class ProfileCorpus:
+    """
+    All profile files below `resources/profiles`, parsed once and shared by all checks.
+
+    Loading is lazy: the first access to a vendor walks its directory, and the
+    first access to a profile type (or a single path) parses those files. Later
+    accesses reuse the parsed files.
+    """
+
+    def __init__(self, profiles_dir):
+        self.profiles_dir = Path(profiles_dir)
+        # vendor -> profile type -> sorted file paths (as strings)
+        self._paths = {}
+        self._vendor_of = {}
+        self._parsed = {}
+        self._indexes = {}
+        # (path, size, seconds) of every file parsed from then on, when set to a list
+        self.parse_log = None
+
+    def vendor_names(self):
+        """
+        Sorted names of all vendor directories.
+        """
+        return sorted(entry.name for entry in os.scandir(self.profiles_dir) if entry.is_dir())
+
+    def files(self, vendor, profile_type=None):
+        """
+        Parsed profile files of a vendor, sorted by path.
+
+        Parameters:
+            vendor (str): Vendor directory name
+            profile_type (str, optional): Only return files below this sub directory
+
+        Returns:
+            list: ProfileFile objects
+        """
+        if profile_type is None:
+            paths = self.paths(vendor)
+        else:
+            paths = self._walk_vendor(vendor).get(profile_type, [])
+        return [self._parse(path) for path in paths]
+
+    def paths(self, vendor):
+        """
+        Paths (as strings) of all profile files of a vendor, sorted, without parsing them.
+        """
+        return sorted(path for paths in self._walk_vendor(vendor).values() for path in paths)
+
+    def index_path(self, vendor):
+        """
+        Path of the <vendor>.json file, whether it exists or not.
+        """
+        return self.profiles_dir / (vendor + ".json")
+
+    def add(self, profile_file):
+        """
+        Use an already parsed file (e.g. from a cache) instead of parsing it again.
+        """
+        path = str(profile_file.path)
+        self._walk_vendor(profile_file.vendor)
+        if path in self._vendor_of:
+            self._parsed[path] = profile_file
+
+    def vendor_index(self, vendor):
+        """
+        The parsed <vendor>.json file, or None if it does not exist.
+        """
+        if vendor not in self._indexes:
+            index_path = self.index_path(vendor)
+            self._indexes[vendor] = self._load(index_path, vendor, None) if index_path.is_file() else None
+        return self._indexes[vendor]
+
+    def get(self, path):
+        """
+        The parsed profile at `path`, or None if it is not a profile file of the vendor
+        directory it is in.
+        """
+        path = str(path)
+        root = str(self.profiles_dir) + os.sep
+        if not path.startswith(root):
+            return None
+        vendor = path[len(root):].split(os.sep, 1)[0]
+        self._walk_vendor(vendor)
+        if path not in self._vendor_of:
+            return None
+        return self._parse(path)
+
+    def refresh(self, paths):
+        """
+        Forget changed files, so that they are parsed again on their next
+        access. A vendor is walked again if files were added to or removed from it.
+
+        Parameters:
+            paths (iterable): Paths of added, modified or removed files (or
+                directories moved away)
+        """
+        root = str(self.profiles_dir) + os.sep
+        for path in map(str, paths):
+            self._parsed.pop(path, None)
+            if not path.startswith(root):
+                continue
+            relative = path[len(root):]
+            if os.sep not in relative and relative.endswith('.json'):
+                self._indexes.pop(relative[:-len('.json')], None)
+                continue
+            # A file below a vendor directory, or the directory itself
+            vendor = relative.split(os.sep, 1)[0]
+            # Only a modified file keeps the vendor's file list valid
+            if vendor in self._paths and not (path in self._vendor_of and os.path.isfile(path)):
+                # Unchanged files stay parsed
+                for known_path in self.paths(vendor):
+                    self._vendor_of.pop(known_path, None)
+                del self._paths[vendor]
+
+    def names(self, vendor, profile_type):
+        """
+        Names of all parseable profiles of a vendor and type.
+        """
+        return {f.name for f in self.files(vendor, profile_type) if f.name is not None}
+
+    def _walk_vendor(self, vendor):
+        if vendor in self._paths:
+            return self._paths[vendor]
+
+        # Paths are kept as strings until parsed, pathlib is slow for ~7k files
+        vendor_dir = os.path.join(self.profiles_dir, vendor)
+        paths_by_type = {}
+        for root, dirs, filenames in os.walk(vendor_dir):
+            dirs.sort()
+            relative = os.path.relpath(root, vendor_dir)
+            profile_type = None if relative == os.curdir else relative.split(os.sep, 1)[0]
+            for filename in sorted(filenames):
+                if filename.endswith('.json'):
+                    path = os.path.join(root, filename)
+                    paths_by_type.setdefault(profile_type, []).append(path)
+                    self._vendor_of[path] = (vendor, profile_type)
+
+        self._paths[vendor] = paths_by_type
+        return paths_by_type
+
+    def _parse(self, path):
+        if path not in self._parsed:
+            vendor, profile_type = self._vendor_of[path]
+            self._parsed[path] = self._load(Path(path), vendor, profile_type)
+        return self._parsed[path]
+
+    def _load(self, path, vendor, profile_type):
+        if self.parse_log is None:
+            return ProfileFile(path, vendor, profile_type)
+        start = time.perf_counter()
+        profile_file = ProfileFile(path, vendor, profile_type)
+        self.parse_log.append((str(path), os.stat(path).st_size, time.perf_counter() - start))
+        return profile_file
@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from orca_profile_bundle import iter_resolved, library_resolvers
+from orca_profile_corpus import PROFILE_TYPES, ProfileCorpus
+
+# Columns of every record in front of the settings; no profile setting uses these keys
+RECORD_FIELDS = ("vendor", "path", "error")
+FORMATS = {"ndjson": ".ndjson", "parquet": ".parquet", "arrow": ".arrow"}
+
+
+def flatten_vendor(corpus, vendor, library=None):
+    """
+    The effective settings of every instantiable profile of a vendor.
+
+    A record holds the vendor, the file path relative to resources/profiles
+    (with forward slashes), the error of a broken `inherits` chain (or None)
+    and all settings with inheritance resolved, keys sorted. For a broken
+    chain, the settings of its reachable part are exported.
+
+    Parameters:
+        corpus (ProfileCorpus): Profiles to export
+        vendor (str): Vendor name
+        library (dict, optional): Library resolvers shared by the vendors, see library_resolvers
+
+    Returns:
+        dict: Records by profile type, in path order
+    """
+    records = {profile_type: [] for profile_type in PROFILE_TYPES}
+    root = str(corpus.profiles_dir) + os.sep
+    for vendor, profile_type, profile_file, resolver in iter_resolved(corpus, [vendor], library):
+        settings = resolver.resolve(profile_file.name)
+        if settings.get('instantiation') != 'true':
+            continue
+        error = resolver.error(profile_file.name)
+        record = {
+            'vendor': vendor,
+            'path': str(profile_file.path)[len(root):].replace(os.sep, '/'),
+            'error': None if error is None else str(error),
+        }
+        record.update(sorted(settings.items()))
+        records[profile_type].append(record)
+    return records
+
+
+# Per-process state of the --jobs worker pool; each worker resolves the
+# OrcaFilamentLibrary profiles once and reuses them for all its vendors
+_worker_corpus = None
+_worker_library = None
+
+def _init_worker(profiles_dir):
+    global _worker_corpus, _worker_library
+    _worker_corpus = ProfileCorpus(profiles_dir)
+    _worker_library = library_resolvers(_worker_corpus)
+
+def _flatten_in_worker(vendor):
+    return flatten_vendor(_worker_corpus, vendor, _worker_library)
+
+
+def export_records(profiles_dir, vendors=None, jobs=0):
+    """
+    Flatten the instantiable profiles of all vendors, in parallel.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendors (list, optional): Vendors to export (default: all)
+        jobs (int): Number of worker processes, 0 to use all cores
+
+    Returns:
+        dict: Records by profile type, sorted by vendor and path whatever the number of jobs
+    """
+    corpus = ProfileCorpus(profiles_dir)
+    if vendors is None:
+        vendors = corpus.vendor_names()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1:
+        with ProcessPoolExecutor(min(jobs, len(vendors)) or 1, initializer=_init_worker,
+                                 initargs=(profiles_dir,)) as pool:
+            results = list(pool.map(_flatten_in_worker, vendors))
+    else:
+        library = library_resolvers(corpus)
+        results = [flatten_vendor(corpus, vendor, library) for vendor in vendors]
+
+    records = {profile_type: [] for profile_type in PROFILE_TYPES}
+    for result in results:
+        for profile_type, type_records in result.items():
+            records[profile_type].extend(type_records)
+    return records
+
+
+def write_ndjson(records, path):
+    """
+    Write records as compact newline-delimited JSON, one profile per line.
+    Setting values are kept as they are in the profiles: strings or lists of strings.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='UTF-8', newline='\n') as fp:
+        for record in records:
+            fp.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+    os.replace(tmp_path, path)
+
+
+def _text(value):
+    # Profile values are strings; anything else is stored as its JSON text
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+def arrow_table(records):
+    """
+    Records as a pyarrow Table with one column per setting key.
+
+    Columns are the record fields followed by the sorted setting keys of all
+    records; a profile without a setting has a null there. A setting is a
+    list<string> column if any profile has a list value for it, with plain
+    values wrapped in one-element lists, and a string column otherwise.
+    """
+    import pyarrow
+
+    list_keys = set()
+    setting_keys = set()
+    for record in records:
+        for key, value in record.items():
+            setting_keys.add(key)
+            if isinstance(value, list):
+                list_keys.add(key)
+    columns = list(RECORD_FIELDS) + sorted(setting_keys.difference(RECORD_FIELDS))
+
+    arrays = []
+    fields = []
+    for key in columns:
+        values = [record.get(key) for record in records]
+        if key in list_keys:
+            data_type = pyarrow.list_(pyarrow.string())
+            values = [None if value is None else [_text(item) for item in value] if isinstance(value, list)
+                      else [_text(value)] for value in values]
+        else:
+            data_type = pyarrow.string()
+            values = [None if value is None else _text(value) for value in values]
+        fields.append(pyarrow.field(key, data_type))
+        arrays.append(pyarrow.array(values, type=data_type))
+    return pyarrow.Table.from_arrays(arrays, schema=pyarrow.schema(fields))
+
+
+def write_table(records, path, file_format):
+    """
+    Write records as a Parquet or Arrow IPC (Feather v2) file, see arrow_table.
+    """
+    table = arrow_table(records)
+    tmp_path = path + '.tmp'
+    if file_format == 'parquet':
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(table, tmp_path)
+    else:
+        import pyarrow.feather
+        pyarrow.feather.write_feather(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def main():
+    default_profiles_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+    parser = argparse.ArgumentParser(
+        description='Export the effective settings of every instantiable profile, one file per profile type'
+    )
+    parser.add_argument('output_dir', nargs='?', default='profile_export',
+                        help='Directory for machine, filament and process files (default: profile_export)')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson',
+                        help='ndjson (default), or parquet / arrow (need pyarrow)')
+    parser.add_argument('--profiles-dir', default=default_profiles_dir,
+                        help='Profiles to export (default: resources/profiles)')
+    parser.add_argument('-v', '--vendor', action='append', help='Only export this vendor (repeatable, default: all)')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes, 0 to use all cores (default: 0)')
+    args = parser.parse_args()
+
+    if args.format != 'ndjson':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print(f"Error: --format {args.format} needs pyarrow (pip install pyarrow)", file=sys.stderr)
+            sys.exit(-1)
+
+    vendors = ProfileCorpus(args.profiles_dir).vendor_names()
+    if args.vendor:
+        unknown = sorted(set(args.vendor) - set(vendors))
+        if unknown:
+            print(f"Error: Unknown vendor(s): {', '.join(unknown)}", file=sys.stderr)
+            sys.exit(-1)
+        vendors = [vendor for vendor in vendors if vendor in args.vendor]
+
+    start = time.perf_counter()
+    records = export_records(args.profiles_dir, vendors, args.jobs)
+    resolved = time.perf_counter()
+    os.makedirs(args.output_dir, exist_ok=True)
+    for profile_type, type_records in records.items():
+        path = os.path.join(args.output_dir, profile_type + FORMATS[args.format])
+        if args.format == 'ndjson':
+            write_ndjson(type_records, path)
+        else:
+            write_table(type_records, path, args.format)
+        print(f"{path}: {len(type_records)} profiles")
+    print(f"Resolved in {resolved - start:.2f}s, written in {time.perf_counter() - resolved:.2f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
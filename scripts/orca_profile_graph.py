@@ -0,0 +1,528 @@
+import os
+import sys
+import json
+import time
+import argparse
+from collections import deque
+from pathlib import Path
+
+from orca_profile_corpus import ProfileCorpus
+
+GRAPH_VERSION = 2
+LIBRARY_VENDOR = "OrcaFilamentLibrary"
+# Reference kinds, in the order they are collected
+REFERENCE_KINDS = ("inherits", "sub_path", "default_materials", "compatible_printers")
+INDEX_LISTS = ("machine_model_list", "machine_list", "filament_list", "process_list")
+
+
+def _split_names(value):
+    # default_materials and renamed_from are lists or ';' separated strings;
+    # an empty name in a list is kept, it is a reference to a missing profile
+    if isinstance(value, list):
+        return [name for name in value if isinstance(name, str)]
+    if isinstance(value, str):
+        return [name.strip() for name in value.split(';') if name.strip()]
+    return []
+
+
+def profile_aliases(data):
+    """
+    The `renamed_from` names of a parsed profile, which resolve to it like its own name.
+    """
+    return [alias for alias in _split_names(data.get('renamed_from')) if alias]
+
+
+def _discard(index, key, item):
+    # Remove an item from a list of a dict of lists, and the list once empty
+    items = index[key]
+    items.remove(item)
+    if not items:
+        del index[key]
+
+
+def _path_type(path):
+    # Profile type of a relative "<vendor>/<type>/..." path, None outside the type directories
+    parts = path.split('/')
+    return parts[1] if len(parts) > 2 else None
+
+
+class ReferenceGraph:
+    """
+    References between all profile files of all vendors.
+
+    Nodes are the profile files and the <vendor>.json indexes, identified by
+    their path relative to the profiles directory. Edges point from the
+    referencing file to the referenced one:
+
+        inherits: a profile to its parent, looked up in the profile's vendor
+            and type, then in the OrcaFilamentLibrary profiles of that type
+        sub_path: a vendor index to the files it lists
+        default_materials: a machine to its default filaments
+            (`default_materials`, or `default_filament_profile` without it),
+            looked up in the vendor's filaments, then in the OrcaFilamentLibrary
+        compatible_printers: a filament or process to the machines it lists,
+            looked up in the vendor's machines
+
+    Names listed in a profile's `renamed_from` resolve to that profile when no
+    profile has the name itself. References that do not resolve are kept with
+    a target of None, see `dangling`.
+
+    As references only resolve within a vendor and the OrcaFilamentLibrary, a
+    graph of some vendors and the OrcaFilamentLibrary (see `build`) has all of
+    their references, but `impact` and `descendants` do not see the other vendors.
+    """
+
+    def __init__(self, nodes, edges, files, profile_types=None):
+        """
+        Parameters:
+            nodes (list): Node dicts (path, vendor, type, name, aliases, error);
+                the position in the list is the node id, None for a removed node
+            edges (list): [source id, kind, target id or None, referenced name]
+            files (dict): [size, mtime_ns] by relative path, to detect changes;
+                None for a graph of some vendors or profile types
+            profile_types (tuple, optional): Profile types the graph is limited to
+        """
+        self.nodes = []
+        self.files = files
+        self.profile_types = profile_types
+        self.by_path = {}
+        self.by_vendor = {}
+        self.by_name = {}
+        self.outgoing = []
+        self.incoming = []
+        # (vendor, type) -> name -> node ids, and the same for renamed_from aliases
+        self._names = {}
+        self._aliases = {}
+        # Referenced name or path -> edges, to resolve them again when profiles change
+        self._references = {}
+        for node in nodes:
+            self._add_node(node)
+        for edge in edges:
+            self._link(edge)
+
+    @property
+    def edges(self):
+        """
+        All references, in node order.
+        """
+        return [edge for edges in self.outgoing for edge in edges]
+
+    @classmethod
+    def build(cls, corpus, vendors=None, profile_types=None):
+        """
+        Build the graph of all vendors of a corpus, or of some of them.
+
+        Only the files of the graph are parsed, so a graph of one vendor and
+        profile type is much cheaper than one of the whole corpus.
+
+        Parameters:
+            corpus (ProfileCorpus): Profiles to index
+            vendors (list, optional): Only index these vendors (default: all);
+                references to other vendors do not resolve, so include the
+                OrcaFilamentLibrary for all references of a vendor to resolve
+            profile_types (tuple, optional): Only index the <vendor>.json
+                indexes and the profiles of these types, and the references
+                between them (default: all files)
+
+        Returns:
+            ReferenceGraph
+        """
+        # Only a graph of the whole corpus can be persisted, see is_current
+        whole = vendors is None and profile_types is None
+        graph = cls([], [], {} if whole else None, profile_types)
+        graph._add_files(corpus, corpus.vendor_names() if vendors is None else sorted(vendors))
+        return graph
+
+    def update(self, corpus, vendors):
+        """
+        Index the files of some vendors again, after files of them were added,
+        modified or removed, or to add vendors to a graph of some vendors.
+
+        Only these vendors are parsed, and only the references to their files
+        are resolved again, so the cost does not grow with the corpus, unless
+        the OrcaFilamentLibrary, which every vendor can reference, is updated. Removed files keep their node id with a node of
+        None, the files of the vendors get new ids.
+
+        Parameters:
+            corpus (ProfileCorpus): Profiles, refreshed with the changes
+            vendors (iterable): Names of the vendor directories to index again
+        """
+        vendors = sorted(set(vendors))
+        removed = []
+        for vendor in vendors:
+            for node_id in self.by_vendor.pop(vendor, []):
+                removed.append(self._remove_node(node_id))
+        # Like in build, vendors are directories: the index of a removed one is not indexed
+        new_ids = self._add_files(corpus, [vendor for vendor in vendors
+                                           if os.path.isdir(os.path.join(corpus.profiles_dir, vendor))])
+
+        # The references of the vendors were resolved when adding them. Other
+        # vendors reference them by path, or by name if they are the
+        # OrcaFilamentLibrary; see _resolve.
+        keys = set()
+        for node in removed + [self.nodes[node_id] for node_id in new_ids]:
+            keys.add(node['path'])
+            if LIBRARY_VENDOR in vendors:
+                keys.update(self._node_names(node))
+        first_new = new_ids[0] if new_ids else len(self.nodes)
+        for key in keys:
+            for edge in self._references.get(key, ()):
+                source, kind, target, name = edge
+                if source >= first_new:
+                    continue
+                resolved = self._resolve(self.nodes[source], kind, name)
+                if resolved != target:
+                    if target is not None:
+                        self.incoming[target].remove(edge)
+                    edge[2] = resolved
+                    if resolved is not None:
+                        self.incoming[resolved].append(edge)
+
+    def _add_files(self, corpus, vendors):
+        # Add the files of vendors, then their references; returns the new node ids
+        root = str(corpus.profiles_dir) + os.sep
+        profiles = []
+        for vendor in vendors:
+            index = corpus.vendor_index(vendor)
+            if index is not None:
+                profiles.append(index)
+            if self.profile_types is None:
+                profiles.extend(corpus.files(vendor))
+            else:
+                profiles.extend(sorted((f for profile_type in self.profile_types
+                                        for f in corpus.files(vendor, profile_type)),
+                                       key=lambda f: str(f.path)))
+
+        new_ids = []
+        for profile_file in profiles:
+            path = str(profile_file.path)
+            relative_path = path[len(root):].replace(os.sep, '/')
+            if self.files is not None:
+                stat = os.stat(path)
+                self.files[relative_path] = [stat.st_size, stat.st_mtime_ns]
+            data = profile_file.data if isinstance(profile_file.data, dict) else {}
+            new_ids.append(self._add_node({
+                'path': relative_path,
+                'vendor': profile_file.vendor,
+                'type': profile_file.profile_type,
+                'name': profile_file.name if profile_file.profile_type is not None else None,
+                'aliases': profile_aliases(data) if profile_file.profile_type is not None else [],
+                'error': None if profile_file.error is None else str(profile_file.error),
+            }))
+
+        profile_types = self.profile_types
+        for node_id, profile_file in zip(new_ids, profiles):
+            node = self.nodes[node_id]
+            data = profile_file.data if isinstance(profile_file.data, dict) else {}
+            vendor, profile_type = node['vendor'], node['type']
+            references = []
+            if profile_type is None:
+                for key in INDEX_LISTS:
+                    for item in data.get(key, []):
+                        sub_path = item.get('sub_path') if isinstance(item, dict) else None
+                        if not isinstance(sub_path, str):
+                            continue
+                        target = os.path.normpath(os.path.join(vendor, sub_path)).replace(os.sep, '/')
+                        if profile_types is None or _path_type(target) in profile_types:
+                            references.append(('sub_path', target))
+            else:
+                parent = data.get('inherits')
+                if isinstance(parent, str) and parent:
+                    references.append(('inherits', parent))
+                if profile_type == 'machine' and (profile_types is None or 'filament' in profile_types):
+                    materials = data['default_materials'] if 'default_materials' in data \
+                        else data.get('default_filament_profile')
+                    references.extend(('default_materials', material) for material in _split_names(materials))
+                printers = data.get('compatible_printers')
+                if isinstance(printers, list) and (profile_types is None or 'machine' in profile_types):
+                    references.extend(('compatible_printers', printer) for printer in _split_names(printers))
+            for kind, name in references:
+                self._link([node_id, kind, self._resolve(node, kind, name), name])
+        return new_ids
+
+    @staticmethod
+    def _node_names(node):
+        return ([node['name']] if node['name'] is not None else []) + node['aliases']
+
+    def _add_node(self, node):
+        node_id = len(self.nodes)
+        self.nodes.append(node)
+        self.outgoing.append([])
+        self.incoming.append([])
+        if node is None:
+            return node_id
+        self.by_path[node['path']] = node_id
+        self.by_vendor.setdefault(node['vendor'], []).append(node_id)
+        for name in self._node_names(node):
+            self.by_name.setdefault(name, []).append(node_id)
+        scope = (node['vendor'], node['type'])
+        if node['name'] is not None:
+            self._names.setdefault(scope, {}).setdefault(node['name'], []).append(node_id)
+        for alias in node['aliases']:
+            self._aliases.setdefault(scope, {}).setdefault(alias, []).append(node_id)
+        return node_id
+
+    def _remove_node(self, node_id):
+        # Unindex a node and its references; references to it no longer resolve
+        node = self.nodes[node_id]
+        self.nodes[node_id] = None
+        del self.by_path[node['path']]
+        if self.files is not None:
+            self.files.pop(node['path'], None)
+        scope = (node['vendor'], node['type'])
+        for name in self._node_names(node):
+            _discard(self.by_name, name, node_id)
+        if node['name'] is not None:
+            _discard(self._names.get(scope, {}), node['name'], node_id)
+        for alias in node['aliases']:
+            _discard(self._aliases.get(scope, {}), alias, node_id)
+        for edge in self.outgoing[node_id]:
+            if edge[2] is not None:
+                self.incoming[edge[2]].remove(edge)
+            _discard(self._references, edge[3], edge)
+        for edge in self.incoming[node_id]:
+            edge[2] = None
+        self.outgoing[node_id] = []
+        self.incoming[node_id] = []
+        return node
+
+    def _link(self, edge):
+        source, kind, target, name = edge
+        self.outgoing[source].append(edge)
+        if target is not None:
+            self.incoming[target].append(edge)
+        self._references.setdefault(name, []).append(edge)
+
+    def _resolve(self, node, kind, name):
+        # The node a reference of `node` resolves to, or None; see the class docstring
+        if kind == 'sub_path':
+            return self.by_path.get(name)
+        vendor = node['vendor']
+        if kind == 'inherits':
+            scopes = ((vendor, node['type']), (LIBRARY_VENDOR, node['type']))
+        elif kind == 'default_materials':
+            scopes = ((vendor, 'filament'), (LIBRARY_VENDOR, 'filament'))
+        else:
+            scopes = ((vendor, 'machine'),)
+        # A profile's own name takes precedence over renamed_from aliases, and
+        # the first file by path over the others
+        for table in (self._names, self._aliases):
+            for scope in scopes:
+                node_ids = table.get(scope, {}).get(name)
+                if node_ids:
+                    return node_ids[0]
+        return None
+
+    @classmethod
+    def load(cls, index_path):
+        """
+        Load a persisted graph.
+
+        Returns:
+            ReferenceGraph, or None if the index is missing, unreadable or of another version
+        """
+        try:
+            with open(index_path, 'r', encoding='UTF-8') as fp:
+                index = json.load(fp)
+        except (OSError, ValueError):
+            return None
+        if index.get('version') != GRAPH_VERSION:
+            return None
+        return cls(index['nodes'], index['edges'], index['files'])
+
+    def save(self, index_path):
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='UTF-8') as fp:
+            json.dump({'version': GRAPH_VERSION, 'files': self.files, 'nodes': self.nodes, 'edges': self.edges},
+                      fp, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, index_path)
+
+    def is_current(self, corpus):
+        """
+        Whether no profile file was added, removed or modified (by size and
+        mtime) since the graph was built.
+        """
+        seen = 0
+        root_length = len(str(corpus.profiles_dir)) + 1
+        for vendor in corpus.vendor_names():
+            paths = corpus.paths(vendor)
+            index_path = corpus.index_path(vendor)
+            if index_path.is_file():
+                paths.append(str(index_path))
+            for path in paths:
+                entry = self.files.get(path[root_length:].replace(os.sep, '/'))
+                if entry is None:
+                    return False
+                stat = os.stat(path)
+                if entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+                    return False
+                seen += 1
+        return seen == len(self.files)
+
+    def find(self, profile, vendor=None, profile_type=None):
+        """
+        Node ids of a profile given by relative path or by name (or renamed_from alias).
+
+        Parameters:
+            profile (str): e.g. "BBL/filament/Bambu PLA Basic @base.json" or "Bambu PLA Basic @base"
+            vendor (str, optional): Only match nodes of this vendor
+            profile_type (str, optional): Only match nodes of this type
+
+        Returns:
+            list: Node ids, sorted
+        """
+        if profile in self.by_path:
+            candidates = [self.by_path[profile]]
+        else:
+            candidates = self.by_name.get(profile, [])
+        return sorted(
+            node_id for node_id in candidates
+            if (vendor is None or self.nodes[node_id]['vendor'] == vendor)
+            and (profile_type is None or self.nodes[node_id]['type'] == profile_type)
+        )
+
+    def vendor_nodes(self, vendor, profile_type=None):
+        """
+        Node ids of the files of a vendor, optionally of one profile type:
+        the <vendor>.json index first (its type is None), then the profiles by path.
+        """
+        return [node_id for node_id in self.by_vendor.get(vendor, [])
+                if profile_type is None or self.nodes[node_id]['type'] == profile_type]
+
+    def _walk_incoming(self, node_ids, kinds):
+        # Breadth first, so every node is reported with its shortest chain
+        found = {}
+        pending = deque(node_ids)
+        visited = set(node_ids)
+        while pending:
+            node_id = pending.popleft()
+            for source, kind, target, name in self.incoming[node_id]:
+                if kind in kinds and source not in visited:
+                    visited.add(source)
+                    found[source] = (kind, target)
+                    pending.append(source)
+        return found
+
+    def impact(self, node_ids):
+        """
+        What breaks if some files are deleted: every file that references
+        them, directly or through other broken files, by any kind of reference.
+
+        Returns:
+            dict: (kind, target id) of the reference that breaks each affected node, by node id
+        """
+        return self._walk_incoming(node_ids, REFERENCE_KINDS)
+
+    def descendants(self, node_ids):
+        """
+        All profiles inheriting from some profiles, directly or transitively.
+
+        Returns:
+            dict: (kind, parent id) by node id
+        """
+        return self._walk_incoming(node_ids, ("inherits",))
+
+    def dangling(self, kinds=REFERENCE_KINDS):
+        """
+        References that do not resolve to any file.
+
+        Returns:
+            list: [source id, kind, None, referenced name] edges, in node order
+        """
+        return [edge for edge in self.edges if edge[2] is None and edge[1] in kinds]
+
+
+def load_graph(corpus, index_path, rebuild=False):
+    """
+    The persisted graph if it is up to date with the profiles, otherwise a
+    freshly built one, which is persisted.
+
+    Returns:
+        ReferenceGraph
+        bool: Whether the graph was rebuilt
+    """
+    graph = None if rebuild else ReferenceGraph.load(index_path)
+    if graph is not None and graph.is_current(corpus):
+        return graph, False
+    graph = ReferenceGraph.build(corpus)
+    graph.save(index_path)
+    return graph, True
+
+
+def main():
+    script_dir = Path(__file__).resolve().parent
+    parser = argparse.ArgumentParser(
+        description='Query the references between profiles (inherits, sub_path, default_materials, '
+                    'compatible_printers, renamed_from) of all vendors'
+    )
+    parser.add_argument('--index', type=Path, default=script_dir / '.profile_check_cache' / 'reference_graph.json',
+                        help='Persisted graph, rebuilt when profiles change (default: %(default)s)')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the graph even if it is up to date')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help='Build (or refresh) the persisted graph')
+    for command, help_text in (
+        ('impact', 'Files that break if a profile is deleted'),
+        ('descendants', 'Profiles inheriting from a profile, transitively'),
+        ('references', 'References of a profile, and the profiles referencing it directly'),
+    ):
+        subparser = subparsers.add_parser(command, help=help_text)
+        subparser.add_argument('profile', help='Relative path (e.g. BBL/filament/x.json) or profile name')
+        subparser.add_argument('--vendor', help='Only match profiles of this vendor')
+        subparser.add_argument('--type', choices=('machine', 'filament', 'process'), help='Only match profiles of this type')
+    dangling_parser = subparsers.add_parser('dangling', help='References that do not resolve')
+    dangling_parser.add_argument('--kind', action='append', choices=REFERENCE_KINDS, help='Only this kind (repeatable)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    corpus = ProfileCorpus(script_dir.parent / 'resources' / 'profiles')
+    graph, rebuilt = load_graph(corpus, args.index, args.rebuild)
+    loaded = time.perf_counter()
+    nodes = graph.nodes
+
+    if args.command == 'build':
+        result = {'nodes': len(nodes), 'edges': len(graph.edges), 'dangling': len(graph.dangling())}
+        lines = [f"{len(nodes)} files, {len(graph.edges)} references, {result['dangling']} dangling"]
+    elif args.command == 'dangling':
+        edges = graph.dangling(tuple(args.kind) if args.kind else REFERENCE_KINDS)
+        result = [{'path': nodes[source]['path'], 'kind': kind, 'name': name} for source, kind, _, name in edges]
+        lines = [f"{item['path']}: {item['kind']} '{item['name']}' not found" for item in result]
+    else:
+        node_ids = graph.find(args.profile, args.vendor, args.type)
+        if not node_ids:
+            print(f"Error: No profile matches {args.profile}")
+            sys.exit(-1)
+        if args.command == 'references':
+            result = {
+                nodes[node_id]['path']: {
+                    'references': [{'kind': kind, 'name': name, 'path': None if target is None else nodes[target]['path']}
+                                   for _, kind, target, name in graph.outgoing[node_id]],
+                    'referenced_by': [{'kind': kind, 'path': nodes[source]['path']}
+                                      for source, kind, _, _ in graph.incoming[node_id]],
+                }
+                for node_id in node_ids
+            }
+            lines = []
+            for path, item in result.items():
+                lines.append(path)
+                lines.extend(f"  -> {ref['kind']} '{ref['name']}': {ref['path'] or 'not found'}" for ref in item['references'])
+                lines.extend(f"  <- {ref['kind']}: {ref['path']}" for ref in item['referenced_by'])
+        else:
+            found = graph.impact(node_ids) if args.command == 'impact' else graph.descendants(node_ids)
+            result = [{'path': nodes[node_id]['path'], 'kind': kind, 'via': nodes[target]['path']}
+                      for node_id, (kind, target) in found.items()]
+            lines = [f"{item['path']}: {item['kind']} {item['via']}" for item in result]
+            lines.append(f"{len(result)} file(s) from {', '.join(nodes[node_id]['path'] for node_id in node_ids)}")
+
+    if args.json:
+        print(json.dumps(result, indent=4, ensure_ascii=False))
+    else:
+        print('\n'.join(lines))
+    print(f"{'Built' if rebuilt else 'Loaded'} graph in {loaded - start:.3f}s, "
+          f"query in {(time.perf_counter() - loaded) * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from orca_zip import CompressedMember, ZipStreamWriter, ordered_map, reproducible_date_time
+
+MANIFEST_VERSION = 1
+# Files of a vendor directory that are not shipped in OTA packages
+EXCLUDED_EXTENSIONS = ('.jpg', '.stl', '.svg', '.png', '.py')
+# Archive member listing the files a delta package removes
+DELETED_FILES_NAME = 'ota_deleted_files.json'
+
+
+def collect_files(profiles_dir, vendors):
+    """
+    Files to package for some vendors: <vendor>.json and the vendor directory
+    without the excluded file types.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendors (list): Vendor names
+
+    Returns:
+        dict: Source path by archive name (profiles/...), in sorted order
+    """
+    files = {}
+    for vendor in vendors:
+        print(f"Processing vendor: {vendor}")
+        index_path = os.path.join(profiles_dir, vendor + '.json')
+        if os.path.isfile(index_path):
+            files[f'profiles/{vendor}.json'] = index_path
+        else:
+            print(f"Warning: {vendor}.json not found")
+
+        vendor_dir = os.path.join(profiles_dir, vendor)
+        if not os.path.isdir(vendor_dir):
+            print(f"Warning: {vendor} directory not found")
+            continue
+        for root, dirs, filenames in os.walk(vendor_dir):
+            for filename in filenames:
+                # Case-sensitive, like the find patterns of pack_profiles.sh
+                if filename.endswith(EXCLUDED_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                name = 'profiles/' + os.path.relpath(path, profiles_dir).replace(os.sep, '/')
+                files[name] = path
+    return dict(sorted(files.items()))
+
+
+class _Packer:
+    # Reads, hashes and compresses one file per call, from pool threads
+
+    def __init__(self, base_files):
+        self.base_files = base_files
+        # Contents already in the archive by content hash, so identical files are
+        # compressed once; only their location is kept, not the compressed data
+        self.written = {}
+
+    def __call__(self, item):
+        name, path = item
+        with open(path, 'rb') as fp:
+            content = fp.read()
+        digest = hashlib.sha256(content).hexdigest()
+        member = None
+        if self.base_files is None or self.base_files.get(name, {}).get('sha256') != digest:
+            # A race only costs a second compression of the same content
+            member = self.written.get(digest) or CompressedMember(content)
+        return name, digest, len(content), member
+
+
+class _WrittenMember:
+    # A member already written to the archive, read back for identical files
+
+    __slots__ = ("crc", "size", "method", "offset", "length")
+
+    def __init__(self, member, offset):
+        self.crc = member.crc
+        self.size = member.size
+        self.method = member.method
+        self.offset = offset
+        self.length = len(member.data)
+
+    def read(self, fp):
+        fp.seek(self.offset)
+        return CompressedMember.from_compressed(self.crc, self.size, self.method, fp.read(self.length))
+
+
+class _HashingFile:
+    # Hashes an archive while it is written instead of reading it back
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self.sha256.update(data)
+        return self.fp.write(data)
+
+
+def load_manifest(path):
+    """
+    Load a release manifest written by `package`.
+
+    Returns:
+        dict: With 'version' and 'files' ({archive name: {'sha256': ..., 'size': ...}})
+    """
+    with open(path, 'r', encoding='UTF-8') as fp:
+        manifest = json.load(fp)
+    if manifest.get('manifest_version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {path}")
+    return manifest
+
+
+def _remove(path):
+    # Remove a partly written output file, if it was created at all
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _vendor_of(name):
+    # profiles/<vendor>.json or profiles/<vendor>/...
+    return os.path.splitext(name.split('/')[1])[0]
+
+
+def package(profiles_dir, vendors, version, output_dir, base_manifest=None, jobs=0):
+    """
+    Build an OTA package and the manifest of its content hashes.
+
+    The archive is byte-reproducible: entries are in sorted order, with the
+    timestamp of `orca_zip.reproducible_date_time` and fixed permissions.
+    Files are read, hashed and compressed in a thread pool within a bounded
+    window, and streamed straight from the profiles directory into the
+    archive in order; each distinct content is compressed once, and identical
+    files copy its compressed data back from the archive, so memory use does
+    not grow with the package. Nothing is left behind if packaging fails.
+
+    With a base manifest the package is a delta: it only contains files that
+    are new or changed since the base release, plus a list of the files of
+    the packaged vendors that were removed since.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendors (list): Vendor names
+        version (str): Release version, e.g. 2.3.0.1
+        output_dir (str): Directory for the archive and the manifest
+        base_manifest (dict, optional): Manifest of the release to build a delta from
+        jobs (int): Number of threads, 0 to use all cores
+
+    Returns:
+        str: Path of the archive
+        dict: Statistics (files, packaged, deleted, duplicates, size, sha256)
+    """
+    files = collect_files(profiles_dir, vendors)
+    base_files = base_manifest['files'] if base_manifest is not None else None
+    deleted = []
+    if base_files is not None:
+        vendor_set = set(vendors)
+        deleted = sorted(name for name in base_files if name not in files and _vendor_of(name) in vendor_set)
+
+    date_time = reproducible_date_time()
+    manifest_files = {}
+    packaged = 0
+    packer = _Packer(base_files)
+    base_name = f"orcaslicer-profiles_ota_{version}"
+    if base_manifest is not None:
+        base_name += f"_delta_from_{base_manifest['version']}"
+    archive_path = os.path.join(output_dir, base_name + '.zip')
+    tmp_path = archive_path + '.tmp'
+    workers = jobs or os.cpu_count() or 1
+    try:
+        with ThreadPoolExecutor(workers) as pool, open(tmp_path, 'wb') as fp, open(tmp_path, 'rb') as archive:
+            sink = _HashingFile(fp)
+            with ZipStreamWriter(sink) as writer:
+                directories = set()
+                for name, digest, size, member in ordered_map(pool, packer, files.items(), workers * 4):
+                    manifest_files[name] = {'sha256': digest, 'size': size}
+                    if member is None:
+                        continue
+                    packaged += 1
+                    parts = name.split('/')[:-1]
+                    for depth in range(1, len(parts) + 1):
+                        directory = '/'.join(parts[:depth])
+                        if directory not in directories:
+                            directories.add(directory)
+                            writer.add_directory(directory, date_time)
+                    if isinstance(member, _WrittenMember):
+                        fp.flush()
+                        member = member.read(archive)
+                    writer.add(name, member, date_time)
+                    if digest not in packer.written:
+                        packer.written[digest] = _WrittenMember(member, writer.offset - len(member.data))
+                if base_manifest is not None:
+                    writer.add(DELETED_FILES_NAME, CompressedMember(json.dumps(deleted, indent=4).encode('UTF-8')),
+                               date_time)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    manifest = {
+        'manifest_version': MANIFEST_VERSION,
+        'version': version,
+        'files': manifest_files,
+    }
+    manifest_path = os.path.join(output_dir, f"orcaslicer-profiles_ota_{version}.manifest.json")
+    tmp_path = manifest_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='UTF-8') as fp:
+            json.dump(manifest, fp, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    stats = {
+        'files': len(files),
+        'packaged': packaged,
+        'deleted': len(deleted),
+        'duplicates': packaged - len(packer.written),
+        'size': os.path.getsize(archive_path),
+        'sha256': sink.sha256.hexdigest(),
+    }
+    return archive_path, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build an OTA profile package and its manifest, or a delta package against a previous manifest'
+    )
+    parser.add_argument('version', help='Version, e.g. 2.3.0')
+    parser.add_argument('number', help='Package number, appended to the version')
+    parser.add_argument('vendors', nargs='+', help='Vendors to package, e.g. OrcaFilamentLibrary BBL')
+    parser.add_argument('--base', help='Manifest of a previous release, to build a delta package against')
+    parser.add_argument('-o', '--output-dir', default=os.curdir, help='Output directory (default: current directory)')
+    parser.add_argument('-j', '--jobs', type=int, default=0, help='Number of threads, 0 to use all cores (default: 0)')
+    args = parser.parse_args()
+
+    profiles_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+    if not os.path.isdir(profiles_dir):
+        print(f"Error: Profiles directory not found at {profiles_dir}")
+        sys.exit(1)
+
+    base_manifest = None
+    if args.base:
+        try:
+            base_manifest = load_manifest(args.base)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read base manifest: {e}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    archive_path, stats = package(profiles_dir, args.vendors, f"{args.version}.{args.number}",
+                                  args.output_dir, base_manifest, args.jobs)
+    print(f"Created profiles package: {archive_path}")
+    print(f"Size: {stats['size'] / 1024:.0f}K, {stats['packaged']} of {stats['files']} files"
+          + (f", {stats['deleted']} deleted" if base_manifest is not None else "")
+          + f", {stats['duplicates']} duplicate(s) compressed once, in {time.perf_counter() - start:.2f}s")
+    print(f"SHA-256: {stats['sha256']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+class InheritanceError(ValueError):
+    """
+    Raised for a profile whose `inherits` chain is broken: a parent is missing
+    or the chain loops back on itself.
+    """
+
+
+class ProfileResolver:
+    """
+    Flattens profiles along their `inherits` chains.
+
+    Every profile is resolved at most once: a profile's flattened settings are
+    its parent's flattened settings overridden by its own, and are cached for
+    all of its children. Chains are walked iteratively, so resolving a whole
+    corpus is linear in its size and deep chains cannot hit the recursion limit.
+    """
+
+    def __init__(self, profiles, paths=None, fallback=None):
+        """
+        Parameters:
+            profiles (dict): Profile content by profile name
+            paths (dict, optional): File path by profile name, used in error messages
+            fallback (ProfileResolver, optional): Resolver for parents that are not in
+                `profiles`, e.g. the OrcaFilamentLibrary resolver for a vendor
+        """
+        self.profiles = profiles
+        self.paths = paths or {}
+        self.fallback = fallback
+        self._resolved = {}
+        self._errors = {}
+
+    def __contains__(self, name):
+        return name in self.profiles
+
+    def resolve(self, name):
+        """
+        The flattened settings of a profile.
+
+        If the chain is broken, the settings of the reachable part of the chain
+        are returned; use `error` to find out whether it is complete.
+
+        Parameters:
+            name (str): Profile name
+
+        Returns:
+            dict: Settings including all inherited ones. Do not modify, the dict
+                is shared with the cache.
+        """
+        if name not in self._resolved:
+            self._resolve_chain(name)
+        return self._resolved[name]
+
+    def error(self, name):
+        """
+        The InheritanceError of a profile's broken chain, or None if it is complete.
+        """
+        self.resolve(name)
+        return self._errors.get(name)
+
+    def get(self, name, key):
+        """
+        Look up a possibly inherited setting.
+
+        Parameters:
+            name (str): Profile name
+            key (str): Setting key
+
+        Returns:
+            The value of the setting, or None if no profile in the chain sets it.
+
+        Raises:
+            InheritanceError: If the key is not set before the chain breaks.
+        """
+        resolved = self.resolve(name)
+        if key in resolved:
+            return resolved[key]
+        error = self.error(name)
+        if error is not None:
+            raise error
+        return None
+
+    def _resolve_chain(self, name):
+        lineage = []
+        position = {}
+        base = {}
+        error = None
+
+        current = name
+        while True:
+            if current in self._resolved:
+                base = self._resolved[current]
+                error = self._errors.get(current)
+                break
+            if current in position:
+                cycle = lineage[position[current]:] + [current]
+                error = InheritanceError(f"Inheritance cycle: {' -> '.join(cycle)}")
+                break
+
+            position[current] = len(lineage)
+            lineage.append(current)
+            parent = self.profiles[current].get('inherits')
+            if not parent:
+                break
+            if parent not in self.profiles:
+                if self.fallback is not None and parent in self.fallback:
+                    base = self.fallback.resolve(parent)
+                    error = self.fallback.error(parent)
+                else:
+                    error = InheritanceError(
+                        f"Parent profile not found: {parent}, referrenced in {self.paths.get(current, current)}"
+                    )
+                break
+            current = parent
+
+        resolved = base
+        for member in reversed(lineage):
+            resolved = {**resolved, **self.profiles[member]}
+            self._resolved[member] = resolved
+            if error is not None:
+                self._errors[member] = error
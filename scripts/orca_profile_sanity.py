@@ -0,0 +1,360 @@
+import io
+import os
+import sys
+import time
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: orca_profile_sanity.py needs numpy (pip install numpy)", file=sys.stderr)
+    sys.exit(-1)
+
+from orca_check_findings import Finding, deduplicate, write_json, write_sarif
+from orca_profile_export import export_records
+
+# (profile type, key, lowest, highest): limits of the setting in PrintConfig.cpp,
+# the slicer does not accept other values. None is no limit.
+LIMITS = (
+    ("filament", "nozzle_temperature", 0, 1500),
+    ("filament", "nozzle_temperature_initial_layer", 0, 1500),
+    ("filament", "nozzle_temperature_range_low", 0, 1500),
+    ("filament", "nozzle_temperature_range_high", 0, 1500),
+    ("filament", "hot_plate_temp", 0, 300),
+    ("filament", "hot_plate_temp_initial_layer", 0, 300),
+    ("filament", "cool_plate_temp", 0, 300),
+    ("filament", "eng_plate_temp", 0, 300),
+    ("filament", "textured_plate_temp", 0, 300),
+    ("filament", "fan_min_speed", 0, 100),
+    ("filament", "fan_max_speed", 0, 100),
+    ("filament", "filament_flow_ratio", 0, 2),
+    ("filament", "filament_density", 0, None),
+    ("filament", "filament_diameter", 0, None),
+    ("machine", "nozzle_diameter", 0, 100),
+    ("process", "layer_height", 0, None),
+    ("process", "initial_layer_print_height", 0, None),
+)
+# Settings that must be greater than zero
+POSITIVE = (
+    ("filament", "filament_max_volumetric_speed"),
+    ("filament", "filament_diameter"),
+    ("machine", "nozzle_diameter"),
+    ("process", "layer_height"),
+)
+# (profile type, key, lowest, highest): accepted by the slicer, but not by any real printer or filament
+PLAUSIBLE = (
+    ("filament", "nozzle_temperature", 150, 450),
+    ("filament", "nozzle_temperature_initial_layer", 150, 450),
+    ("filament", "hot_plate_temp", 0, 150),
+    ("filament", "hot_plate_temp_initial_layer", 0, 150),
+    ("filament", "filament_flow_ratio", 0.5, 1.5),
+    ("filament", "filament_density", 0.5, 4),
+    ("filament", "filament_diameter", 1, 3.5),
+)
+# (profile type, lower key, higher key, level)
+ORDER = (
+    ("filament", "nozzle_temperature_range_low", "nozzle_temperature_range_high", "error"),
+    ("filament", "nozzle_temperature_range_low", "nozzle_temperature", "warning"),
+    ("filament", "nozzle_temperature", "nozzle_temperature_range_high", "warning"),
+    ("filament", "fan_min_speed", "fan_max_speed", "warning"),
+)
+# (profile type, key, initial layer key, largest difference)
+INITIAL_LAYER = (
+    ("filament", "nozzle_temperature", "nozzle_temperature_initial_layer", 30),
+    ("filament", "hot_plate_temp", "hot_plate_temp_initial_layer", 20),
+)
+# filament_max_volumetric_speed above this times the squared nozzle diameter
+# (mm³/s per mm²) is more than a high-flow hotend melts, about 48 mm³/s at 0.4 mm
+MAX_FLOW_PER_NOZZLE_AREA = 300
+# Filament settings compared with all filaments of the same filament_type
+OUTLIER_KEYS = ("nozzle_temperature", "hot_plate_temp", "filament_density")
+# A value is an outlier this many robust standard deviations (1.4826 MAD, at
+# least 10% of the median) away from the median of at least OUTLIER_GROUP_SIZE filaments
+OUTLIER_DEVIATIONS = 5
+OUTLIER_GROUP_SIZE = 20
+
+
+def parse_number(value):
+    """
+    The first number of a setting value: a string such as "0.2" or "15%",
+    or a list of such strings (one per extruder), of which the first is used.
+
+    Returns:
+        float: The number, NaN if the value is missing or not a number
+    """
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if not isinstance(value, str):
+        return np.nan
+    try:
+        return float(value[:-1] if value.endswith('%') else value)
+    except ValueError:
+        return np.nan
+
+
+class ProfileColumns:
+    """
+    The resolved settings of all profiles of one type as NumPy columns.
+
+    Every column is parsed once, on first access, into a float64 array with a
+    row per profile and NaN where a profile does not have a numeric value, so
+    that comparisons with missing values are false and rules skip them.
+    """
+
+    __slots__ = ("records", "vendors", "paths", "_columns")
+
+    def __init__(self, records):
+        """
+        Parameters:
+            records (list): Flattened profiles of one type, see orca_profile_export.flatten_vendor
+        """
+        self.records = records
+        self.vendors = [record['vendor'] for record in records]
+        self.paths = [record['path'] for record in records]
+        self._columns = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if key not in self._columns:
+            self._columns[key] = np.fromiter((parse_number(record.get(key)) for record in self.records),
+                                             dtype=np.float64, count=len(self.records))
+        return self._columns[key]
+
+    def text(self, key):
+        """
+        The first string value of a setting of every profile ('' if missing), as a NumPy array.
+        """
+        values = []
+        for record in self.records:
+            value = record.get(key)
+            if isinstance(value, list):
+                value = value[0] if value else None
+            values.append(value if isinstance(value, str) else '')
+        return np.array(values, dtype=object)
+
+
+def _number(value):
+    return f"{value:g}"
+
+
+def _findings(columns, mask, check, level, message):
+    # message(row) describes the finding of one flagged profile
+    return [Finding(columns.vendors[row], columns.paths[row], 0, check, level, message(row))
+            for row in np.flatnonzero(mask)]
+
+
+def smallest_nozzle(columns, machines):
+    """
+    The smallest nozzle_diameter of the compatible_printers of every profile,
+    looked up in the machines of the profile's vendor.
+
+    Returns:
+        numpy.ndarray: float64, NaN where no compatible printer is known
+    """
+    nozzle_of = dict(zip(zip(machines.vendors, machines.text('name')), machines['nozzle_diameter']))
+    smallest = np.full(len(columns), np.nan)
+    for row, record in enumerate(columns.records):
+        printers = record.get('compatible_printers') or []
+        if isinstance(printers, str):
+            printers = [printers]
+        diameters = [nozzle_of[key] for key in ((columns.vendors[row], name) for name in printers) if key in nozzle_of]
+        if diameters:
+            smallest[row] = min(diameters)
+    return smallest
+
+
+def check_limits(tables):
+    findings = []
+    for profile_type, key, lowest, highest in LIMITS:
+        columns = tables[profile_type]
+        values = columns[key]
+        mask = np.zeros(len(columns), dtype=bool)
+        if lowest is not None:
+            mask |= values < lowest
+        if highest is not None:
+            mask |= values > highest
+        bounds = f"at most {highest}" if lowest is None else f"at least {lowest}" if highest is None \
+            else f"between {lowest} and {highest}"
+        findings += _findings(columns, mask, "check_limits", "error",
+                              lambda row: f"{key} is {_number(values[row])}, the slicer accepts {bounds}")
+    for profile_type, key in POSITIVE:
+        columns = tables[profile_type]
+        values = columns[key]
+        findings += _findings(columns, values <= 0, "check_limits", "error",
+                              lambda row: f"{key} is {_number(values[row])}, it must be greater than 0")
+    return findings
+
+
+def check_plausible_ranges(tables):
+    findings = []
+    for profile_type, key, lowest, highest in PLAUSIBLE:
+        columns = tables[profile_type]
+        values = columns[key]
+        findings += _findings(columns, (values < lowest) | (values > highest), "check_plausible_ranges", "warning",
+                              lambda row: f"{key} is {_number(values[row])}, expected {lowest} to {highest}")
+    return findings
+
+
+def check_setting_order(tables):
+    findings = []
+    for profile_type, lower_key, higher_key, level in ORDER:
+        columns = tables[profile_type]
+        lower = columns[lower_key]
+        higher = columns[higher_key]
+        findings += _findings(columns, lower > higher, "check_setting_order", level,
+                              lambda row: f"{lower_key} ({_number(lower[row])}) is above "
+                                          f"{higher_key} ({_number(higher[row])})")
+    return findings
+
+
+def check_initial_layer(tables):
+    findings = []
+    for profile_type, key, initial_key, largest in INITIAL_LAYER:
+        columns = tables[profile_type]
+        values = columns[key]
+        initial = columns[initial_key]
+        findings += _findings(columns, np.abs(initial - values) > largest, "check_initial_layer", "warning",
+                              lambda row: f"{initial_key} ({_number(initial[row])}) differs from "
+                                          f"{key} ({_number(values[row])}) by more than {largest}")
+    return findings
+
+
+def check_nozzle_size(tables):
+    """
+    Layer heights and max volumetric speeds against the smallest nozzle of the compatible printers,
+    and the layer height limits of machines against their nozzle.
+    """
+    findings = []
+    machines = tables['machine']
+    nozzle = machines['nozzle_diameter']
+    # The slicer uses 0.75 times the nozzle diameter for a max_layer_height of 0
+    max_layer_height = np.where(machines['max_layer_height'] == 0, 0.75 * nozzle, machines['max_layer_height'])
+    min_layer_height = machines['min_layer_height']
+    findings += _findings(machines, max_layer_height > nozzle, "check_nozzle_size", "warning",
+                          lambda row: f"max_layer_height ({_number(max_layer_height[row])}) is above "
+                                      f"nozzle_diameter ({_number(nozzle[row])})")
+    findings += _findings(machines, min_layer_height > max_layer_height, "check_nozzle_size", "warning",
+                          lambda row: f"min_layer_height ({_number(min_layer_height[row])}) is above "
+                                      f"max_layer_height ({_number(max_layer_height[row])})")
+
+    processes = tables['process']
+    process_nozzle = smallest_nozzle(processes, machines)
+    for key in ("layer_height", "initial_layer_print_height"):
+        values = processes[key]
+        findings += _findings(processes, values > process_nozzle, "check_nozzle_size", "error",
+                              lambda row: f"{key} ({_number(values[row])}) exceeds the "
+                                          f"{_number(process_nozzle[row])} mm nozzle of a compatible printer")
+
+    filaments = tables['filament']
+    filament_nozzle = smallest_nozzle(filaments, machines)
+    speed = filaments['filament_max_volumetric_speed']
+    largest = MAX_FLOW_PER_NOZZLE_AREA * filament_nozzle ** 2
+    findings += _findings(filaments, speed > largest, "check_nozzle_size", "warning",
+                          lambda row: f"filament_max_volumetric_speed ({_number(speed[row])} mm³/s) is above "
+                                      f"{_number(round(largest[row], 1))} mm³/s for the "
+                                      f"{_number(filament_nozzle[row])} mm nozzle of a compatible printer")
+    return findings
+
+
+def check_outliers(tables):
+    """
+    Filament settings far from the median of all filaments of the same filament_type.
+    """
+    findings = []
+    filaments = tables['filament']
+    filament_types, group = np.unique(filaments.text('filament_type'), return_inverse=True)
+    group_sizes = np.bincount(group, minlength=len(filament_types))
+    for key in OUTLIER_KEYS:
+        values = filaments[key]
+        median = np.full(len(filament_types), np.nan)
+        scale = np.full(len(filament_types), np.nan)
+        for index in np.flatnonzero(group_sizes >= OUTLIER_GROUP_SIZE):
+            group_values = values[group == index]
+            group_values = group_values[~np.isnan(group_values)]
+            if len(group_values) < OUTLIER_GROUP_SIZE or not filament_types[index]:
+                continue
+            median[index] = np.median(group_values)
+            mad = np.median(np.abs(group_values - median[index]))
+            scale[index] = max(1.4826 * mad, 0.1 * abs(median[index]))
+        # Broadcast the group statistics to the rows; NaN for groups too small to judge
+        row_median = median[group]
+        deviations = np.abs(values - row_median) / scale[group]
+        findings += _findings(filaments, deviations > OUTLIER_DEVIATIONS, "check_outliers", "warning",
+                              lambda row: f"{key} ({_number(values[row])}) is far from the median of "
+                                          f"{group_sizes[group[row]]} {filament_types[group[row]]} filaments "
+                                          f"({_number(row_median[row])})")
+    return findings
+
+
+CHECKS = (check_limits, check_plausible_ranges, check_setting_order, check_initial_layer,
+          check_nozzle_size, check_outliers)
+
+
+def check_profiles(records):
+    """
+    Run all numeric checks over the flattened profiles of the whole corpus.
+
+    Parameters:
+        records (dict): Records by profile type, see orca_profile_export.export_records
+
+    Returns:
+        list: Finding objects
+    """
+    tables = {profile_type: ProfileColumns(type_records) for profile_type, type_records in records.items()}
+    findings = []
+    for check in CHECKS:
+        findings += check(tables)
+    return findings
+
+
+def main():
+    default_profiles_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources', 'profiles')
+    parser = argparse.ArgumentParser(
+        description='Check the numeric settings of all instantiable profiles for implausible values'
+    )
+    parser.add_argument('--profiles-dir', default=default_profiles_dir,
+                        help='Profiles to check (default: resources/profiles)')
+    parser.add_argument('-v', '--vendor', action='append',
+                        help='Only report findings of this vendor (repeatable, default: all); '
+                             'outliers are still judged against all vendors')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes resolving profiles, 0 to use all cores (default: 0)')
+    parser.add_argument('--format', choices=['text', 'json', 'sarif'], default='text', help='Output format')
+    parser.add_argument('--output', help='Write the json or sarif report to this file instead of stdout')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records = export_records(args.profiles_dir, jobs=args.jobs)
+    resolved = time.perf_counter()
+    findings = check_profiles(records)
+    checked = time.perf_counter()
+    if args.vendor:
+        findings = [finding for finding in findings if finding.vendor in args.vendor]
+
+    errors = sum(finding.level == 'error' for finding in findings)
+    warnings = len(findings) - errors
+    summary = {'profiles': sum(map(len, records.values())), 'errors': errors, 'warnings': warnings}
+    if args.format == 'text':
+        for finding, count in deduplicate(findings):
+            print(f"{finding.level.capitalize()}: {finding.path}: {finding.message}")
+        print(f"Checked {summary['profiles']} profiles: {errors} error(s), {warnings} warning(s)")
+    else:
+        report = io.StringIO()
+        if args.format == 'json':
+            write_json(findings, summary, report)
+        else:
+            write_sarif(findings, summary, report, tool="orca_profile_sanity")
+        if args.output:
+            with open(args.output, 'w', encoding='UTF-8') as fp:
+                fp.write(report.getvalue())
+        else:
+            sys.stdout.write(report.getvalue())
+    print(f"Resolved in {resolved - start:.2f}s, checked in {checked - resolved:.2f}s", file=sys.stderr)
+    if errors:
+        sys.exit(-1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,433 @@
+import os
+import re
+import sys
+import json
+import time
+import difflib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from orca_extra_profile_check import OBSOLETE_KEYS
+from orca_filament_lib import PROFILES_DIR, write_if_changed
+from orca_profile_corpus import PROFILE_TYPES, ProfileCorpus
+
+RULE_OPS = ("rename_key", "drop_key", "drop_obsolete_keys", "rewrite_value", "retarget_inherits")
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class RuleError(ValueError):
+    """
+    Raised for a rules file that does not describe valid rules.
+    """
+
+
+class Member:
+    """
+    A member of the top-level JSON object of a profile, with the positions of
+    its key and value in the file text.
+    """
+
+    __slots__ = ("key", "key_start", "key_end", "value", "value_start", "value_end", "elements")
+
+    def __init__(self, key, key_start, key_end, value, value_start, value_end, elements):
+        self.key = key
+        self.key_start = key_start
+        self.key_end = key_end
+        self.value = value
+        self.value_start = value_start
+        self.value_end = value_end
+        # (value, start, end) of every element if the value is an array
+        self.elements = elements
+
+
+def _skip_whitespace(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _expect(text, pos, chars):
+    if text[pos:pos + 1] not in chars:
+        raise ValueError(f"Expected {' or '.join(repr(c) for c in chars)} at offset {pos}")
+
+
+def _scan_elements(text, pos):
+    # Elements of the array starting at pos
+    elements = []
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos:pos + 1] == ']':
+        return elements
+    while True:
+        value, end = _decoder.raw_decode(text, pos)
+        elements.append((value, pos, end))
+        pos = _skip_whitespace(text, end)
+        _expect(text, pos, (',', ']'))
+        if text[pos] == ']':
+            return elements
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def scan_members(text):
+    """
+    Locate the members of a profile's top-level JSON object.
+
+    Values are decoded with the C accelerated scanner of the json module, only
+    the top-level object and its arrays are walked in Python.
+
+    Parameters:
+        text (str): Content of a profile file
+
+    Returns:
+        list: Member objects in file order, including duplicate keys
+        int: Offset of the opening brace
+        int: Offset of the closing brace
+
+    Raises:
+        ValueError: If the text is not a JSON object
+    """
+    start = _skip_whitespace(text, 0)
+    _expect(text, start, ('{',))
+    pos = _skip_whitespace(text, start + 1)
+    members = []
+    if text[pos:pos + 1] == '}':
+        return members, start, pos
+    while True:
+        _expect(text, pos, ('"',))
+        key_start = pos
+        key, key_end = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, key_end)
+        _expect(text, pos, (':',))
+        value_start = _skip_whitespace(text, pos + 1)
+        value, pos = _decoder.raw_decode(text, value_start)
+        elements = _scan_elements(text, value_start) if isinstance(value, list) else None
+        members.append(Member(key, key_start, key_end, value, value_start, pos, elements))
+        pos = _skip_whitespace(text, pos)
+        _expect(text, pos, (',', '}'))
+        if text[pos] == '}':
+            return members, start, pos
+        pos = _skip_whitespace(text, pos + 1)
+
+
+def load_rules(path):
+    """
+    Load and validate a rules file.
+
+    The file holds a JSON list of rules, applied in order. Every rule has an
+    "op" and may restrict itself to some vendors and profile types with
+    "vendor" and "type" (a string or a list of strings):
+
+        {"op": "rename_key", "from": "old_key", "to": "new_key"}
+        {"op": "drop_key", "key": "some_key"} or {"op": "drop_key", "keys": [...]}
+        {"op": "drop_obsolete_keys"}: drops the OBSOLETE_KEYS of orca_extra_profile_check.py
+        {"op": "rewrite_value", "key": "some_key", "from": old_value, "to": new_value}
+            Without "from" every value of the key is replaced. With a string
+            "from", matching elements of array values are replaced too.
+        {"op": "rewrite_value", "key": "some_key", "pattern": "regex", "replace": "replacement"}
+            re.sub on string values and string elements of array values
+        {"op": "retarget_inherits", "from": "old parent", "to": "new parent"}
+
+    Parameters:
+        path (str): Rules file
+
+    Returns:
+        list: Normalized rules
+
+    Raises:
+        RuleError: If a rule is malformed
+    """
+    with open(path, 'r', encoding='UTF-8') as fp:
+        raw_rules = json.load(fp)
+    if not isinstance(raw_rules, list):
+        raise RuleError("The rules file must contain a JSON list of rules")
+
+    rules = []
+    for index, raw in enumerate(raw_rules):
+        rule = dict(raw) if isinstance(raw, dict) else {}
+        op = rule.get('op')
+        if op not in RULE_OPS:
+            raise RuleError(f"Rule {index}: 'op' must be one of {', '.join(RULE_OPS)}")
+        for field in ('vendor', 'type'):
+            if isinstance(rule.get(field), str):
+                rule[field] = [rule[field]]
+
+        if op == 'retarget_inherits':
+            rule.update(op='rewrite_value', key='inherits')
+        if op == 'drop_obsolete_keys':
+            rule.update(op='drop_key', keys=sorted(OBSOLETE_KEYS))
+        elif op == 'drop_key' and 'keys' not in rule:
+            rule['keys'] = [rule.get('key')]
+
+        required = {
+            'rename_key': ('from', 'to'),
+            'drop_key': ('keys',),
+            'rewrite_value': ('key', 'replace') if 'pattern' in rule else ('key', 'to'),
+        }[rule['op']]
+        missing = [field for field in required if rule.get(field) is None]
+        if missing:
+            raise RuleError(f"Rule {index} ({op}): missing {', '.join(missing)}")
+        if 'pattern' in rule:
+            try:
+                rule['pattern'] = re.compile(rule['pattern'])
+            except re.error as e:
+                raise RuleError(f"Rule {index} ({op}): invalid pattern: {e}")
+        rule['index'] = index
+        rules.append(rule)
+    return rules
+
+
+def _rewrite(rule, value):
+    # The rewritten value, or value itself if the rule does not apply
+    if 'pattern' in rule:
+        return rule['pattern'].sub(rule['replace'], value) if isinstance(value, str) else value
+    if 'from' not in rule or value == rule['from']:
+        return rule['to']
+    return value
+
+
+def _render(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _rule_edits(rule, members, start, end):
+    """
+    Text edits and audit entries of one rule.
+
+    Returns:
+        list: (start, end, replacement) edits, not overlapping
+        list: (key, old value, new value) changes
+        str or None: Why the rule could not be applied
+    """
+    edits = []
+    changes = []
+
+    if rule['op'] == 'rename_key':
+        targets = [m for m in members if m.key == rule['from']]
+        if targets and any(m.key == rule['to'] for m in members):
+            return [], [], f"cannot rename '{rule['from']}' to '{rule['to']}', the key already exists"
+        for member in targets:
+            edits.append((member.key_start, member.key_end, _render(rule['to'])))
+            changes.append((rule['from'], rule['from'], rule['to']))
+
+    elif rule['op'] == 'drop_key':
+        keys = set(rule['keys'])
+        dropped = [m.key in keys for m in members]
+        if not any(dropped):
+            return [], [], None
+        if all(dropped):
+            edits.append((start + 1, end, ''))
+        else:
+            first_kept = dropped.index(False)
+            if first_kept > 0:
+                # Leading members: drop up to the key of the first kept one
+                edits.append((members[0].key_start, members[first_kept].key_start, ''))
+            for i in range(first_kept + 1, len(members)):
+                if dropped[i]:
+                    # Later members: drop from the end of the previous value, with the comma
+                    edits.append((members[i - 1].value_end, members[i].value_end, ''))
+        changes.extend((m.key, m.value, None) for m, drop in zip(members, dropped) if drop)
+
+    else:
+        for member in members:
+            if member.key != rule['key']:
+                continue
+            new_value = _rewrite(rule, member.value)
+            if new_value != member.value:
+                edits.append((member.value_start, member.value_end, _render(new_value)))
+                changes.append((member.key, member.value, new_value))
+            elif member.elements is not None and ('pattern' in rule or isinstance(rule.get('from'), str)):
+                # Rewrite matching elements in place, keeping the array's layout
+                new_elements = []
+                for element, element_start, element_end in member.elements:
+                    new_element = _rewrite(rule, element)
+                    if new_element != element:
+                        edits.append((element_start, element_end, _render(new_element)))
+                    new_elements.append(new_element)
+                if new_elements != member.value:
+                    changes.append((member.key, member.value, new_elements))
+
+    return edits, changes, None
+
+
+def _matches(rule, vendor, profile_type):
+    return (
+        ('vendor' not in rule or vendor in rule['vendor'])
+        and ('type' not in rule or profile_type in rule['type'])
+    )
+
+
+def apply_rules(text, rules, vendor, profile_type):
+    """
+    Apply rules to the text of a profile.
+
+    Only the keys and values a rule changes are rewritten: indentation,
+    key order and everything else keep their original bytes.
+
+    Parameters:
+        text (str): Content of the profile file
+        rules (list): Rules from `load_rules`
+        vendor (str): Vendor of the profile
+        profile_type (str): Profile type (sub directory) of the profile
+
+    Returns:
+        str: The new content, identical to `text` if no rule changed anything
+        list: Audit entries (dicts) of all changes
+        list: Messages of rules that could not be applied
+
+    Raises:
+        ValueError: If the text is not a JSON object
+    """
+    members, start, end = scan_members(text)
+    audit = []
+    problems = []
+    for rule in rules:
+        if not _matches(rule, vendor, profile_type):
+            continue
+        edits, changes, problem = _rule_edits(rule, members, start, end)
+        if problem is not None:
+            problems.append(f"Rule {rule['index']} ({rule['op']}): {problem}")
+        if not edits:
+            continue
+
+        for edit_start, edit_end, replacement in sorted(edits, reverse=True):
+            text = text[:edit_start] + replacement + text[edit_end:]
+        audit.extend(
+            {'rule': rule['index'], 'op': rule['op'], 'key': key, 'old': old, 'new': new}
+            for key, old, new in changes
+        )
+        # Positions moved, later rules work on the edited text
+        members, start, end = scan_members(text)
+
+    if audit:
+        # The edited text must still be a valid profile
+        json.loads(text)
+    return text, audit, problems
+
+
+def _transform_file(path, rules, dry_run, profiles_dir):
+    # Worker of transform_corpus: transforms and writes one file, returns what to report
+    relative = os.path.relpath(path, profiles_dir).replace('\\', '/')
+    vendor, profile_type = relative.split('/', 2)[:2]
+    try:
+        with open(path, 'r', encoding='UTF-8', newline='') as fp:
+            text = fp.read()
+        new_text, audit, problems = apply_rules(text, rules, vendor, profile_type)
+    except Exception as e:
+        return relative, [], [f"Error processing {relative}: {e}"], ''
+
+    problems = [f"{relative}: {problem}" for problem in problems]
+    diff = ''
+    if audit and dry_run:
+        diff = ''.join(line + '\n' for line in difflib.unified_diff(
+            text.splitlines(), new_text.splitlines(), f'a/{relative}', f'b/{relative}', lineterm=''
+        ))
+    elif audit:
+        write_if_changed(path, new_text.encode('UTF-8'))
+    return relative, audit, problems, diff
+
+
+def profile_paths(profiles_dir, vendors=None):
+    """
+    Paths (as strings) of all machine, filament and process profiles, sorted.
+
+    Parameters:
+        profiles_dir (str): The resources/profiles directory
+        vendors (list, optional): Only these vendors
+
+    Returns:
+        list: Profile paths
+    """
+    corpus = ProfileCorpus(profiles_dir)
+    paths = []
+    for vendor in vendors or corpus.vendor_names():
+        vendor_dir = os.path.join(str(corpus.profiles_dir), vendor) + os.sep
+        paths.extend(
+            path for path in corpus.paths(vendor)
+            if path[len(vendor_dir):].split(os.sep, 1)[0] in PROFILE_TYPES
+        )
+    return paths
+
+
+def transform_corpus(rules, paths, dry_run=False, jobs=0, audit_log=None, profiles_dir=PROFILES_DIR):
+    """
+    Apply rules to profile files in one pass over the files, in a process pool.
+
+    Each file is read once, all rules are applied to it in memory, and it is
+    written (atomically) only if a rule changed it. Output and audit log
+    entries are in the order of `paths`.
+
+    Parameters:
+        rules (list): Rules from `load_rules`
+        paths (list): Profile files
+        dry_run (bool): Print unified diffs instead of writing
+        jobs (int): Number of worker processes, 0 to use all cores
+        audit_log (file, optional): Receives one JSON line per change
+        profiles_dir (str): The resources/profiles directory
+
+    Returns:
+        int: Number of changed files
+        int: Number of files with errors or rules that could not be applied
+    """
+    jobs = min(jobs or os.cpu_count() or 1, max(len(paths), 1))
+    arguments = (paths, [rules] * len(paths), [dry_run] * len(paths), [profiles_dir] * len(paths))
+    changed_files = 0
+    problem_files = 0
+
+    def report(results):
+        nonlocal changed_files, problem_files
+        for relative, audit, problems, diff in results:
+            for problem in problems:
+                print(problem, file=sys.stderr)
+            problem_files += bool(problems)
+            if not audit:
+                continue
+            changed_files += 1
+            sys.stdout.write(diff or f"{'Would update' if dry_run else 'Updated'} {relative} "
+                                     f"({len(audit)} change(s))\n")
+            if audit_log is not None:
+                for entry in audit:
+                    audit_log.write(json.dumps({'file': relative, **entry}, ensure_ascii=False) + '\n')
+
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            # Files are small, batches keep the inter-process overhead low
+            report(pool.map(_transform_file, *arguments, chunksize=max(1, len(paths) // (jobs * 8))))
+    else:
+        report(map(_transform_file, *arguments))
+    return changed_files, problem_files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Apply declarative migration rules (rename_key, drop_key, drop_obsolete_keys, '
+                    'rewrite_value, retarget_inherits) to all profiles. See load_rules for the rule format.'
+    )
+    parser.add_argument('rules', help='JSON file with the list of rules')
+    parser.add_argument('-v', '--vendor', nargs='+', help='Only transform these vendors (default: all)')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='Print unified diffs instead of writing')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes, 0 to use all cores (default: 0)')
+    parser.add_argument('--audit-log', help='Append one JSON line per change to this file')
+    args = parser.parse_args()
+
+    try:
+        rules = load_rules(args.rules)
+    except (OSError, ValueError) as e:
+        print(f"Invalid rules file {args.rules}: {e}", file=sys.stderr)
+        sys.exit(-1)
+
+    start = time.perf_counter()
+    paths = profile_paths(PROFILES_DIR, args.vendor)
+    if args.audit_log:
+        with open(args.audit_log, 'a', encoding='UTF-8') as audit_log:
+            changed, problems = transform_corpus(rules, paths, args.dry_run, args.jobs, audit_log)
+    else:
+        changed, problems = transform_corpus(rules, paths, args.dry_run, args.jobs)
+
+    print(f"{changed} of {len(paths)} profiles {'would change' if args.dry_run else 'changed'}, "
+          f"{problems} with problems, in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    if problems:
+        sys.exit(-1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# Editors save in several steps (write, rename, chmod); events closer than this are one change
+DEBOUNCE_SECONDS = 0.05
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+# struct inotify_event: wd, mask, cookie, len, followed by the name
+_EVENT = struct.Struct('iIII')
+
+
+def _is_profile(path):
+    return path.endswith('.json')
+
+
+def _profile_paths(root):
+    for dirpath, dirs, files in os.walk(root):
+        for filename in files:
+            if _is_profile(filename):
+                yield os.path.join(dirpath, filename)
+
+
+class PollingWatcher:
+    """
+    Detects changed profile files by comparing the size and mtime of all
+    files at a fixed interval. Works everywhere, but costs a directory walk
+    per interval.
+    """
+
+    name = "polling"
+
+    def __init__(self, root, interval=0.5):
+        self.root = str(root)
+        self.interval = interval
+        self._state = self._snapshot()
+
+    def _snapshot(self):
+        state = {}
+        for path in _profile_paths(self.root):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[path] = (stat.st_size, stat.st_mtime_ns)
+        return state
+
+    def wait(self):
+        """
+        Block until profile files are added, modified or removed.
+
+        Returns:
+            set: Paths of the changed files
+        """
+        while True:
+            time.sleep(self.interval)
+            state = self._snapshot()
+            changed = {path for path in state.keys() | self._state.keys() if state.get(path) != self._state.get(path)}
+            self._state = state
+            if changed:
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detects changed profile files with Linux inotify, through libc and
+    ctypes. Every directory below the root is watched, including directories
+    created later.
+    """
+
+    name = "inotify"
+
+    def __init__(self, root):
+        """
+        Raises:
+            OSError: If inotify is not available or the watch limit is reached
+        """
+        self.root = str(root)
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories = {}
+        try:
+            for dirpath, dirs, files in os.walk(self.root):
+                self._watch(dirpath)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            raise OSError(error, f"Cannot watch {path}")
+        self._directories[wd] = path
+
+    def _read_events(self):
+        changed = set()
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Events were lost, treat everything as changed
+                changed.update(_profile_paths(self.root))
+                continue
+            if mask & _IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and os.path.isdir(path):
+                    # A new or moved-in directory: watch it and everything in it
+                    for dirpath, dirs, files in os.walk(path):
+                        self._watch(dirpath)
+                    changed.update(_profile_paths(path))
+                elif mask & _IN_MOVED_FROM:
+                    # Its files can no longer be listed; report the directory,
+                    # and stop watching it under its old name
+                    self._unwatch(path)
+                    changed.add(path)
+                continue
+            if _is_profile(path):
+                changed.add(path)
+        return changed
+
+    def _unwatch(self, path):
+        prefix = path + os.sep
+        for wd, directory in list(self._directories.items()):
+            if directory == path or directory.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._directories[wd]
+
+    def wait(self):
+        """
+        Block until profile files are added, modified or removed.
+
+        Returns:
+            set: Paths of the changed files, and of directories moved away
+        """
+        changed = set()
+        while not changed:
+            select.select([self.fd], [], [])
+            changed.update(self._read_events())
+            while select.select([self.fd], [], [], DEBOUNCE_SECONDS)[0]:
+                changed.update(self._read_events())
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(root, polling=False, interval=0.5):
+    """
+    An inotify watcher on Linux, or a polling watcher if inotify cannot be
+    used or `polling` is set.
+
+    Returns:
+        InotifyWatcher or PollingWatcher
+    """
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            print(f"inotify is not available ({e}), polling for changes", file=sys.stderr)
+    return PollingWatcher(root, interval)
@@ -0,0 +1,191 @@
+import os
+import time
+import zlib
+import struct
+from collections import deque
+
+_LOCAL_HEADER = struct.Struct('<4s5H3L2H')
+_CENTRAL_HEADER = struct.Struct('<4s6H3L5H2L')
+_END_OF_CENTRAL_DIRECTORY = struct.Struct('<4s4H2LH')
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+# Version 2.0: deflate and directories
+_VERSION = 20
+_MADE_BY_UNIX = 3 << 8 | _VERSION
+# Names are UTF-8
+_FLAG_UTF8 = 0x800
+_MAX_SIZE = 0xFFFFFFFF
+_MAX_ENTRIES = 0xFFFF
+
+FILE_MODE = 0o100644
+DIRECTORY_MODE = 0o040755
+# Earliest time a zip entry can hold
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+def reproducible_date_time():
+    """
+    Timestamp for every entry of a reproducible archive: SOURCE_DATE_EPOCH
+    (https://reproducible-builds.org/specs/source-date-epoch/) in UTC if set,
+    FIXED_DATE_TIME otherwise.
+
+    Returns:
+        tuple: (year, month, day, hour, minute, second)
+    """
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if not epoch:
+        return FIXED_DATE_TIME
+    return tuple(time.gmtime(int(epoch))[:6])
+
+
+def ordered_map(pool, function, iterable, window):
+    """
+    Like `pool.map`, but with at most `window` calls in flight, so results are
+    consumed (and can be written) while later ones are still computed, without
+    holding every result in memory.
+
+    Parameters:
+        pool (concurrent.futures.Executor): Pool to submit the calls to
+        function (callable): Function of one argument
+        iterable (iterable): Arguments
+        window (int): Maximum number of pending calls
+
+    Returns:
+        generator: The results, in the order of the arguments
+    """
+    pending = deque()
+    for argument in iterable:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(function, argument))
+    while pending:
+        yield pending.popleft().result()
+
+
+class CompressedMember:
+    """
+    Content of a zip member, compressed once and writable any number of times.
+
+    Attributes:
+        crc (int): CRC-32 of the uncompressed content
+        size (int): Uncompressed size
+        method (int): METHOD_DEFLATED, or METHOD_STORED if deflate did not help
+        data (bytes): Compressed content
+    """
+
+    __slots__ = ("crc", "size", "method", "data")
+
+    def __init__(self, content, level=9):
+        """
+        Parameters:
+            content (bytes): Uncompressed content
+            level (int): zlib compression level
+        """
+        # zlib releases the GIL, so members can be compressed in threads
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        data = compressor.compress(content) + compressor.flush()
+        self.crc = zlib.crc32(content)
+        self.size = len(content)
+        if len(data) < len(content):
+            self.method, self.data = METHOD_DEFLATED, data
+        else:
+            self.method, self.data = METHOD_STORED, content
+
+    @classmethod
+    def from_compressed(cls, crc, size, method, data):
+        """
+        A member from content compressed before, e.g. read back from an archive.
+        """
+        member = cls.__new__(cls)
+        member.crc, member.size, member.method, member.data = crc, size, method, data
+        return member
+
+
+def _dos_date_time(date_time):
+    year, month, day, hour, minute, second = date_time[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return hour << 11 | minute << 5 | second // 2, (year - 1980) << 9 | month << 5 | day
+
+
+class ZipStreamWriter:
+    """
+    Writes a zip archive front to back into a binary file object.
+
+    Members are written as soon as they are added, with their already
+    compressed content, and the central directory is written once by
+    `close`. Nothing is buffered besides the central directory entries, and
+    the file does not need to be seekable.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.offset = 0
+        self.entries = []
+        self.names = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+    def _write(self, data):
+        self.fp.write(data)
+        self.offset += len(data)
+
+    def add(self, name, member, date_time, mode=FILE_MODE):
+        """
+        Write a file member.
+
+        Parameters:
+            name (str): Path in the archive, with forward slashes
+            member (CompressedMember): Content
+            date_time (tuple): (year, month, day, hour, minute, second) stored in the entry
+            mode (int): Unix file type and permissions
+        """
+        self._add(name, member.crc, member.size, member.method, member.data, date_time, mode)
+
+    def add_directory(self, name, date_time, mode=DIRECTORY_MODE):
+        """
+        Write a directory entry; `name` gets a trailing slash if it has none.
+        """
+        if not name.endswith('/'):
+            name += '/'
+        # The low byte of the external attributes is the MS-DOS directory flag
+        self._add(name, 0, 0, METHOD_STORED, b'', date_time, mode, dos_attributes=0x10)
+
+    def _add(self, name, crc, size, method, data, date_time, mode, dos_attributes=0):
+        if name in self.names:
+            raise ValueError(f"Duplicate zip member: {name}")
+        if len(self.entries) >= _MAX_ENTRIES or max(size, len(data), self.offset) > _MAX_SIZE:
+            raise ValueError("Archive too large, ZIP64 is not supported")
+        self.names.add(name)
+
+        encoded_name = name.encode('UTF-8')
+        dos_time, dos_date = _dos_date_time(date_time)
+        local_offset = self.offset
+        self._write(_LOCAL_HEADER.pack(
+            b'PK\x03\x04', _VERSION, _FLAG_UTF8, method, dos_time, dos_date,
+            crc, len(data), size, len(encoded_name), 0,
+        ) + encoded_name)
+        self._write(data)
+        self.entries.append(_CENTRAL_HEADER.pack(
+            b'PK\x01\x02', _MADE_BY_UNIX, _VERSION, _FLAG_UTF8, method, dos_time, dos_date,
+            crc, len(data), size, len(encoded_name), 0, 0, 0, 0,
+            mode << 16 | dos_attributes, local_offset,
+        ) + encoded_name)
+
+    def close(self):
+        """
+        Write the central directory. The file object is not closed.
+        """
+        directory_offset = self.offset
+        for entry in self.entries:
+            self._write(entry)
+        self._write(_END_OF_CENTRAL_DIRECTORY.pack(
+            b'PK\x05\x06', 0, 0, len(self.entries), len(self.entries),
+            self.offset - directory_offset, directory_offset, 0,
+        ))